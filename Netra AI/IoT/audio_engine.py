@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+
+"""
+Resident audio output engine.
+
+The pygame mixer is opened once per process with a short device buffer and
+stays open. Clips are decoded from in-memory buffers into pygame Sounds
+(decoded TTS files are kept in a small LRU, so fixed prompts start
+instantly) and played on one reserved channel from a priority queue:
+
+- the next clip is handed to Channel.queue() while the current one plays,
+  so consecutive clips chain without a gap;
+- a clip with a higher priority than the one playing cuts it off;
+- every clip records the time from enqueue to its first sample.
+
+speak() plays text through the TTS cache; play() takes a file path, encoded
+bytes or a pygame Sound. Both return a Playback handle to wait on.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+import pygame
+
+from tts_cache import get_default_cache
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+FREQUENCY = 24000         # gTTS produces 24 kHz audio
+CHANNELS = 1
+DEVICE_BUFFER = 512       # Samples per device buffer (~21 ms at 24 kHz)
+POLL_INTERVAL = 0.005     # Seconds between channel checks while playing
+DECODED_CACHE_SIZE = 32   # Decoded Sounds kept for repeated prompts
+
+URGENT = 0
+NORMAL = 1
+LOW = 2
+
+
+class Playback:
+    """
+    Handle for one queued clip.
+    """
+
+    def __init__(self, source, priority, label=None):
+        self.source = source
+        self.priority = priority
+        self.label = label
+        self.sound = None
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.preempted = False
+        self.cancelled = False
+        self.error = None
+        self._started = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def latency(self):
+        """
+        Seconds from enqueue to first sample, or None if it never played.
+        """
+        return self.started_at - self.enqueued_at if self.started_at is not None else None
+
+    def wait_started(self, timeout=None):
+        return self._started.wait(timeout)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def done(self):
+        return self._done.is_set()
+
+    def _start(self):
+        self.started_at = time.monotonic()
+        self._started.set()
+
+    def _finish(self, preempted=False, error=None):
+        self.finished_at = time.monotonic()
+        self.preempted = preempted
+        self.error = error
+        self._started.set()
+        self._done.set()
+
+    def __repr__(self):
+        return f"Playback({self.label or self.source!r}, priority={self.priority})"
+
+
+class AudioEngine:
+    """
+    One mixer, one speech channel, one scheduling thread.
+    """
+
+    def __init__(self, frequency=FREQUENCY, channels=CHANNELS, device_buffer=DEVICE_BUFFER):
+        if pygame.mixer.get_init() is None:
+            pygame.mixer.pre_init(frequency, -16, channels, device_buffer)
+            pygame.mixer.init()
+        frequency = pygame.mixer.get_init()[0]
+        self.device_latency = device_buffer / frequency
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+        self.cond = threading.Condition()
+        self.heap = []
+        self.seq = itertools.count()
+        self.current = None
+        self.next = None                   # already handed to Channel.queue()
+        self.decoded = OrderedDict()       # path -> Sound, least recently used first
+        self.running = True
+        self.played = 0
+        self.chained = 0
+        self.preempted = 0
+        self.failed = 0
+        self.latencies = []
+        self.thread = threading.Thread(target=self._run, name="audio-engine", daemon=True)
+        self.thread.start()
+
+    ##################################
+    # PUBLIC API
+    ##################################
+    def play(self, source, priority=NORMAL, label=None):
+        """
+        Queue a clip: a file path, encoded audio bytes or a pygame Sound.
+        Returns its Playback handle without waiting.
+        """
+        playback = Playback(source, priority, label)
+        with self.cond:
+            heapq.heappush(self.heap, (priority, next(self.seq), playback))
+            self.cond.notify()
+        return playback
+
+    def speak(self, text, priority=NORMAL, wait=True):
+        """
+        Speak `text` through the TTS cache. Returns the Playback, or None if
+        no audio is available.
+        """
+        if not text:
+            return None
+        path = get_default_cache().get(text)
+        if not path:
+            print(f"TTS unavailable, could not speak: {text}")
+            return None
+        playback = self.play(path, priority, label=text)
+        if wait:
+            playback.wait()
+        return playback
+
+    def stop_current(self):
+        """
+        Cut off whatever is playing; queued clips carry on.
+        """
+        with self.cond:
+            if self.current is not None:
+                self._preempt()
+                self.cond.notify()
+
+    def cancel(self, playback):
+        """
+        Stop one clip, whether playing or still queued; other clips are untouched.
+        """
+        with self.cond:
+            if playback is self.current:
+                self._preempt()
+            elif playback is self.next:
+                # Channel.queue() cannot be undone: cut it off as soon as it starts
+                playback.cancelled = True
+            else:
+                for i, (_, _, queued) in enumerate(self.heap):
+                    if queued is playback:
+                        del self.heap[i]
+                        heapq.heapify(self.heap)
+                        playback._finish(preempted=True)
+                        break
+            self.cond.notify()
+
+    def idle(self):
+        with self.cond:
+            return self.current is None and not self.heap
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        return {
+            "played": self.played,
+            "chained_gapless": self.chained,
+            "preempted": self.preempted,
+            "failed": self.failed,
+            "queued": len(self.heap),
+            "p50_first_sample_ms": lat[len(lat) // 2] * 1000 if lat else 0.0,
+            "max_first_sample_ms": lat[-1] * 1000 if lat else 0.0,
+            "device_latency_ms": self.device_latency * 1000,
+        }
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            for _, _, playback in self.heap:
+                playback._finish(preempted=True)
+            self.heap = []
+            self.cond.notify_all()
+        self.thread.join(timeout=1.0)
+        self.channel.stop()
+
+    ##################################
+    # SCHEDULING
+    ##################################
+    def _decode(self, playback):
+        source = playback.source
+        if isinstance(source, pygame.mixer.Sound):
+            return source
+        if isinstance(source, (bytes, bytearray)):
+            return pygame.mixer.Sound(file=BytesIO(source))
+        sound = self.decoded.get(source)
+        if sound is None:
+            with open(source, "rb") as f:
+                sound = pygame.mixer.Sound(file=BytesIO(f.read()))
+            self.decoded[source] = sound
+            if len(self.decoded) > DECODED_CACHE_SIZE:
+                self.decoded.popitem(last=False)
+        else:
+            self.decoded.move_to_end(source)
+        return sound
+
+    def _pop_decoded(self):
+        # Called with the lock held; skips clips that fail to decode
+        while self.heap:
+            _, _, playback = heapq.heappop(self.heap)
+            try:
+                playback.sound = self._decode(playback)
+                return playback
+            except Exception as e:
+                self.failed += 1
+                print(f"Cannot play {playback}: {str(e)}")
+                playback._finish(error=e)
+        return None
+
+    def _started(self, playback):
+        playback._start()
+        self.played += 1
+        self.latencies.append(playback.latency + self.device_latency)
+        if len(self.latencies) > 500:
+            del self.latencies[0]
+
+    def _preempt(self):
+        # Called with the lock held: stop the channel, requeue the chained clip
+        self.channel.stop()
+        self.preempted += 1
+        self.current._finish(preempted=True)
+        self.current = None
+        if self.next is not None and self.next.cancelled:
+            self.next._finish(preempted=True)
+        elif self.next is not None:
+            heapq.heappush(self.heap, (self.next.priority, next(self.seq), self.next))
+        self.next = None
+
+    def _advance(self):
+        # Called with the lock held: notice clips that finished or started.
+        # get_queue() going back to None means the chained clip has started.
+        if self.current is None:
+            return
+        busy = self.channel.get_busy()
+        if self.next is not None and busy and self.channel.get_queue() is None:
+            self.current._finish()
+            self.current, self.next = self.next, None
+            self._started(self.current)
+            self.chained += 1
+        elif not busy:
+            self.current._finish()
+            self.current = None
+            if self.next is not None:
+                # Both ended between two polls
+                self._started(self.next)
+                self.next._finish()
+                self.next = None
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and self.current is None and not self.heap:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                self._advance()
+                if self.current is not None and (self.current.cancelled or
+                                                 (self.heap and self.heap[0][0] < self.current.priority)):
+                    self._preempt()
+                if self.current is None and self.heap:
+                    playback = self._pop_decoded()
+                    if playback is not None:
+                        self.channel.play(playback.sound)
+                        self.current = playback
+                        self._started(playback)
+                if (self.current is not None and self.next is None and self.heap
+                        and self.channel.get_queue() is None):
+                    playback = self._pop_decoded()
+                    if playback is not None:
+                        self.channel.queue(playback.sound)
+                        self.next = playback
+                if self.current is not None:
+                    self.cond.wait(POLL_INTERVAL)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    The process-wide AudioEngine, created (and the device opened) on first use.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AudioEngine()
+        return _engine
+
+
+def speak(text, priority=NORMAL, wait=True):
+    """
+    Shortcut for get_engine().speak().
+    """
+    return get_engine().speak(text, priority, wait)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Time from "speak this" to the first sample: the old per-call paths vs. the
+resident audio engine.
+
+  mixer-per-call: pygame.mixer.init() + music.load() + play() per utterance
+                  (the old play_tts), until play() returns
+  mpg123:         fork + exec of mpg123 until the process is running
+                  (a lower bound: decoding and device open come after)
+  engine:         AudioEngine.play() until the clip is on the channel,
+                  plus the device buffer latency
+
+Also reports the gap between chained clips on the engine.
+
+Usage: python benchmarks/bench_audio.py clip1.mp3 [clip2.mp3 ...] [--repeat 5]
+Set SDL_AUDIODRIVER=dummy to run without a sound card.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import pygame
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from audio_engine import AudioEngine  # noqa: E402
+
+
+def mixer_per_call(path):
+    start = time.perf_counter()
+    pygame.mixer.init()
+    pygame.mixer.music.load(path)
+    pygame.mixer.music.play()
+    elapsed = time.perf_counter() - start
+    pygame.mixer.music.stop()
+    pygame.mixer.quit()
+    return elapsed
+
+
+def mpg123(path):
+    start = time.perf_counter()
+    process = subprocess.Popen(["mpg123", "-q", path])
+    elapsed = time.perf_counter() - start
+    process.terminate()
+    process.wait()
+    return elapsed
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return f"p50 {samples[len(samples) // 2] * 1000:7.1f} ms  max {samples[-1] * 1000:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio time-to-first-sample benchmark")
+    parser.add_argument("clips", nargs="+", help="MP3 files, e.g. from tts_cache/")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [clip for clip in args.clips for _ in range(args.repeat)]
+    print(f"{'mixer-per-call':16} {summary([mixer_per_call(clip) for clip in runs])}")
+    try:
+        print(f"{'mpg123':16} {summary([mpg123(clip) for clip in runs])}")
+    except FileNotFoundError:
+        print(f"{'mpg123':16} not installed")
+
+    engine = AudioEngine()
+    latencies = []
+    for clip in runs:
+        playback = engine.play(clip)
+        playback.wait_started()
+        latencies.append(playback.latency + engine.device_latency)
+        engine.stop_current()
+        playback.wait()
+    print(f"{'engine':16} {summary(latencies)}")
+
+    # Chain every clip once and measure the gap between one ending and the next starting
+    playbacks = [engine.play(clip) for clip in args.clips]
+    playbacks[-1].wait()
+    gaps = [b.started_at - a.finished_at for a, b in zip(playbacks, playbacks[1:])]
+    if gaps:
+        print(f"{'chain gap':16} {summary([max(0.0, g) for g in gaps])}")
+    print("Engine stats:", engine.stats())
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Compare face detection throughput of the original per-call cascade
+(detect_faces as it used to be) with the persistent FaceDetector.
+
+Usage: python benchmarks/bench_detect.py clip1.mp4 [clip2.mp4 ...] [--max-frames N]
+Run from the IoT directory so the Haar cascade path resolves.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from face_rec import HAAR_CASCADE_PATH, FaceDetector  # noqa: E402
+
+
+def legacy_detect_faces(gray_img):
+    """
+    The original implementation: reload the cascade and scan the full frame.
+    """
+    face_cascade = cv2.CascadeClassifier(HAAR_CASCADE_PATH)
+    return face_cascade.detectMultiScale(gray_img, scaleFactor=1.3, minNeighbors=5)
+
+
+def load_clip(path, max_frames):
+    """
+    Decode a recorded clip into grayscale frames up front so decoding
+    is not part of the measurement.
+    """
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    cap.release()
+    return frames
+
+
+def run(detect, frames):
+    """
+    Returns (frames per second, total number of faces found).
+    """
+    total_faces = 0
+    start = time.perf_counter()
+    for gray in frames:
+        total_faces += len(detect(gray))
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed if elapsed > 0 else float("inf"), total_faces
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face detection FPS benchmark")
+    parser.add_argument("clips", nargs="+", help="Recorded video files")
+    parser.add_argument("--max-frames", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'clip':30} {'frames':>6} {'legacy fps':>10} {'new fps':>10} {'speedup':>8} {'faces old/new':>14}")
+    for clip in args.clips:
+        frames = load_clip(clip, args.max_frames)
+        if not frames:
+            print(f"{clip}: no frames decoded, skipping")
+            continue
+        legacy_fps, legacy_faces = run(legacy_detect_faces, frames)
+        detector = FaceDetector()
+        new_fps, new_faces = run(detector.detect, frames)
+        print(f"{os.path.basename(clip):30} {len(frames):>6} {legacy_fps:>10.1f} {new_fps:>10.1f} "
+              f"{new_fps / legacy_fps:>7.1f}x {legacy_faces:>6}/{new_faces:<7}")
+
+
+if __name__ == "__main__":
+    main()
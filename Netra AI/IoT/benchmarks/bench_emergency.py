@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Press-to-delivery time of an emergency alert: the old path (speak, then one
+POST with a 5 s timeout) vs. the dispatcher (outbox write and POST first,
+speech in parallel, background retries), against the local stand-in
+endpoint (mock_emergency_server.py) with an injected outage.
+
+Speech is a stand-in that sleeps for the gTTS round trip plus playback.
+Also checks that an alert raised while the endpoint is down survives a
+dispatcher restart, and that repeated presses are deduplicated.
+
+Usage: python benchmarks/bench_emergency.py [--speech 1.5] [--outage 0 2 6] [--delay 0.1]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from emergency import EmergencyDispatcher  # noqa: E402
+from mock_emergency_server import Faults, start_background  # noqa: E402
+
+DELIVERY_TIMEOUT = 60
+
+
+def old_path(endpoint, speech):
+    pressed = time.monotonic()
+    time.sleep(speech)      # speak_google("Emergency alert triggered")
+    try:
+        response = requests.post(endpoint, timeout=5)
+        if response.status_code == 200:
+            return (time.monotonic() - pressed) * 1000
+    except requests.RequestException:
+        pass
+    return None
+
+
+def dispatcher_path(endpoint, speech, outbox):
+    dispatcher = EmergencyDispatcher(endpoint, outbox_dir=outbox).start()
+    try:
+        alert, _ = dispatcher.trigger()
+        speaker = threading.Thread(target=time.sleep, args=(speech,))
+        speaker.start()
+        delivered = alert.wait(DELIVERY_TIMEOUT)
+        speaker.join()
+        return alert.delivery_ms if delivered else None
+    finally:
+        dispatcher.close()
+
+
+def restart_and_dedup(outbox, delay):
+    # Endpoint down: the alert stays in the outbox across a restart
+    dispatcher = EmergencyDispatcher("http://127.0.0.1:9/unreachable", outbox_dir=outbox).start()
+    alert, _ = dispatcher.trigger()
+    _, new = dispatcher.trigger()
+    dispatcher.close()
+    print(f"second press within the window raised a new alert: {new}")
+    print(f"outbox after shutdown: {sorted(os.listdir(outbox))}")
+
+    server = start_background(Faults(delay=delay))
+    try:
+        dispatcher = EmergencyDispatcher(server.base_url + "/data", outbox_dir=outbox).start()
+        deadline = time.monotonic() + DELIVERY_TIMEOUT
+        while dispatcher.pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+        dispatcher.close()
+        print(f"after restart: {dispatcher.stats()['delivered']} delivered, "
+              f"{alert.id in server.alerts and 'same id' or 'id missing'}, outbox {sorted(os.listdir(outbox))}")
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emergency alert delivery benchmark")
+    parser.add_argument("--speech", type=float, default=1.5, help="gTTS round trip + playback, s")
+    parser.add_argument("--outage", type=float, nargs="+", default=[0, 2, 6], help="Endpoint outage, s")
+    parser.add_argument("--delay", type=float, default=0.1, help="Endpoint response time, s")
+    args = parser.parse_args()
+
+    outbox = tempfile.mkdtemp(prefix="netra_outbox_")
+    print(f"{'outage':>7} {'old ms':>9} {'dispatcher ms':>14}")
+    try:
+        for outage in args.outage:
+            results = []
+            for run in (lambda url: old_path(url, args.speech),
+                        lambda url: dispatcher_path(url, args.speech, outbox)):
+                server = start_background(Faults(delay=args.delay), outage=outage)
+                try:
+                    results.append(run(server.base_url + "/data"))
+                finally:
+                    server.shutdown()
+            old, new = (f"{r:.0f}" if r is not None else "lost" for r in results)
+            print(f"{outage:>6.0f}s {old:>9} {new:>14}")
+        restart_and_dedup(outbox, args.delay)
+    finally:
+        shutil.rmtree(outbox, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
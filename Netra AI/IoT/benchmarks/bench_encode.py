@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare the original upload encoding (cv2.imwrite to /tmp, read back,
+base64) with the in-memory, budgeted encode_jpeg() used now.
+
+Reports encode time, JPEG size and base64 payload size per byte budget,
+plus the estimated upload time at a given link speed.
+
+Usage: python benchmarks/bench_encode.py image.jpg [more.jpg ...] [--budgets 120000 60000 30000]
+                                        [--uplink-kbps 256] [--repeat 20]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from image_encoder import encode_jpeg  # noqa: E402
+
+TEMP_PATH = "/tmp/webcam_capture.jpg"
+
+
+def legacy_encode(frame):
+    """
+    The original capture_image() path.
+    """
+    cv2.imwrite(TEMP_PATH, frame)
+    with open(TEMP_PATH, "rb") as img_file:
+        return base64.b64encode(img_file.read()).decode("utf-8")
+
+
+def upload_ms(payload_size, uplink_kbps):
+    return payload_size * 8 / uplink_kbps if uplink_kbps else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload encoding benchmark")
+    parser.add_argument("images", nargs="+", help="Camera frames saved as image files")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[120000, 60000, 30000])
+    parser.add_argument("--uplink-kbps", type=float, default=256.0, help="Link speed for the upload estimate")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'image':24} {'method':>14} {'size':>5} {'q':>3} {'jpeg B':>8} {'b64 B':>8} "
+          f"{'encode ms':>9} {'upload ms':>9}")
+    for path in args.images:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"{path}: cannot read, skipping")
+            continue
+        name = os.path.basename(path)[:24]
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            payload = legacy_encode(frame)
+        encode_ms = (time.perf_counter() - start) * 1000 / args.repeat
+        h, w = frame.shape[:2]
+        print(f"{name:24} {'tempfile':>14} {w:>5} {95:>3} {len(payload) * 3 // 4:>8} {len(payload):>8} "
+              f"{encode_ms:>9.1f} {upload_ms(len(payload), args.uplink_kbps):>9.0f}")
+
+        for budget in args.budgets:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                image = encode_jpeg(frame, budget)
+                image.base64()
+            encode_ms = (time.perf_counter() - start) * 1000 / args.repeat
+            print(f"{name:24} {'mem ' + str(budget):>14} {image.width:>5} {image.quality:>3} {image.size:>8} "
+                  f"{image.payload_size:>8} {encode_ms:>9.1f} "
+                  f"{upload_ms(image.payload_size, args.uplink_kbps):>9.0f}")
+
+    if os.path.exists(TEMP_PATH):
+        os.remove(TEMP_PATH)
+
+
+if __name__ == "__main__":
+    main()
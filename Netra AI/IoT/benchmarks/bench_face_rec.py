@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the face_rec pipeline at several dataset scales, with
+no camera or people needed.
+
+For each backend, number of identities and samples per identity:
+  - a face store is built from synthetic faces (or a subset of a real
+    store given with --store) in a temporary directory;
+  - train_model(full=True) is timed and the bundle size recorded;
+  - load_model() is timed (bundle read + recognizer load);
+  - per-face recognition latency and accuracy are measured on fresh
+    held-out samples, one predict_faces() call per face;
+  - recorded (--video) or synthetic frames with drawn faces are replayed
+    headlessly through RecognitionPipeline.process_frame, so detection,
+    tracking and recognition of the crops are all timed.
+
+Results can be saved as a JSON baseline and compared against one later;
+the exit status is 1 if any metric regressed by more than --tolerance.
+
+Usage: python benchmarks/bench_face_rec.py [--identities 5 20 50] [--samples 10 20]
+                                           [--backends lbph numpy] [--video clip.mp4] [--frames 200]
+                                           [--store face_store] [--save baseline.json]
+                                           [--compare baseline.json] [--tolerance 0.2]
+Run from the IoT directory so the Haar cascade path resolves.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import face_rec  # noqa: E402
+from bench_matcher import synthetic_faces  # noqa: E402
+from camera_service import SyntheticSource  # noqa: E402
+from face_store import FaceStore  # noqa: E402
+from feature_matcher import predict_faces  # noqa: E402
+
+QUERIES_PER_IDENTITY = 2
+REPLAY_FACES = 2          # Faces drawn into each synthetic replay frame
+# Metric -> True if higher is better
+METRICS = {
+    "train_ms": False,
+    "model_bytes": False,
+    "load_ms": False,
+    "predict_ms_per_face": False,
+    "accuracy": True,
+    "replay_fps": True,
+    "detect_ms_per_frame": False,
+    "faces_per_frame": True,
+}
+
+
+def dataset(n_identities, samples, source_store, seed=0):
+    """
+    (faces, labels, held-out queries, their labels) for `n_identities`.
+    Synthetic unless a real store is given; then its first identities are used.
+    """
+    if source_store is None:
+        rng = np.random.default_rng(seed)
+        faces, labels = synthetic_faces(n_identities, samples + QUERIES_PER_IDENTITY, rng)
+        faces = np.array(faces)
+    else:
+        faces, labels = FaceStore(source_store).load()
+        keep = np.isin(labels, np.unique(labels)[:n_identities])
+        faces, labels = faces[keep], labels[keep]
+    enrolled, queries = [], []
+    for label in np.unique(labels):
+        idx = np.flatnonzero(labels == label)
+        # Hold out the last samples of each identity (only if enough remain)
+        held = QUERIES_PER_IDENTITY if len(idx) > QUERIES_PER_IDENTITY + 1 else 0
+        enrolled.extend(idx[:len(idx) - held])
+        queries.extend(idx[len(idx) - held:])
+    return faces[enrolled], labels[enrolled], faces[queries], labels[queries]
+
+
+def replay_frames(video, count):
+    """
+    Decoded frames from a recorded clip, or synthetic ones with REPLAY_FACES
+    faces, held in memory so decoding is not part of the measurement.
+    """
+    frames = []
+    if video:
+        cap = cv2.VideoCapture(video)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    else:
+        source = SyntheticSource(fps=0, faces=REPLAY_FACES)
+        frames = [source.read() for _ in range(count)]
+    return frames
+
+
+def run_scale(backend, n_identities, samples, args, frames, work_dir):
+    faces, labels, queries, truth = dataset(n_identities, samples, args.store)
+    store_dir = os.path.join(work_dir, f"store_{backend}_{n_identities}_{samples}")
+    store = FaceStore(store_dir)
+    for label in np.unique(labels):
+        store.append(list(faces[labels == label]), f"person_{label}")
+    # Map the source labels to the store's labels for scoring
+    store_truth = [store.names[f"person_{label}"] for label in truth]
+
+    # train_model() and load_model() take their paths and backend from face_rec's settings
+    face_rec.STORE_DIR = store_dir
+    face_rec.MODEL_PATH = os.path.join(work_dir, f"model_{backend}_{n_identities}_{samples}.bundle")
+    face_rec.RECOGNIZER_BACKEND = backend
+    face_rec.DATASET_DIR = os.path.join(work_dir, "no_legacy_dataset")
+
+    start = time.perf_counter()
+    face_rec.train_model(full=True)
+    train_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    model = face_rec.load_model()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    predictions = []
+    start = time.perf_counter()
+    for query in queries:
+        predictions.extend(predict_faces(model.recognizer, [query]))
+    predict_ms = (time.perf_counter() - start) * 1000 / max(1, len(queries))
+    correct = sum(int(label) == t for (label, _), t in zip(predictions, store_truth))
+
+    pipeline = face_rec.RecognitionPipeline(model)
+    detected = 0
+    start = time.perf_counter()
+    for frame in frames:
+        detected += len(pipeline.process_frame(frame))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "identities": n_identities,
+        "samples": len(faces),
+        "train_ms": train_ms,
+        "model_bytes": os.path.getsize(face_rec.MODEL_PATH),
+        "load_ms": load_ms,
+        "predict_ms_per_face": predict_ms,
+        "accuracy": correct / len(queries) if len(queries) else None,
+        "replay_fps": len(frames) / elapsed if elapsed > 0 else None,
+        "detect_ms_per_frame": pipeline.stats()["detect_ms_per_frame"],
+        "faces_per_frame": detected / len(frames) if frames else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Print metrics worse than the baseline by more than `tolerance` (a fraction).
+    Returns the number of regressions.
+    """
+    previous = {(r["backend"], r["identities"], r["samples"]): r for r in baseline["results"]}
+    regressions = 0
+    for result in results:
+        old = previous.get((result["backend"], result["identities"], result["samples"]))
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            new_value, old_value = result.get(metric), old.get(metric)
+            if not new_value or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            if (-change if higher_is_better else change) > tolerance:
+                regressions += 1
+                print(f"REGRESSION {result['backend']} x{result['identities']}: {metric} "
+                      f"{old_value:.2f} -> {new_value:.2f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline face_rec benchmark")
+    parser.add_argument("--identities", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--samples", type=int, nargs="+", default=[20],
+                        help="Enrolled samples per identity (synthetic)")
+    parser.add_argument("--backends", nargs="+", default=["lbph", "numpy"])
+    parser.add_argument("--video", help="Recorded clip to replay (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=200, help="Frames replayed per run")
+    parser.add_argument("--store", help="Use identities from this face store instead of synthetic faces")
+    parser.add_argument("--save", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression (fraction)")
+    args = parser.parse_args()
+
+    frames = replay_frames(args.video, args.frames)
+    work_dir = tempfile.mkdtemp(prefix="netra_bench_")
+    results = []
+    print(f"{'backend':>7} {'ids':>5} {'samples':>7} {'train ms':>9} {'model KB':>9} {'load ms':>8} "
+          f"{'ms/face':>8} {'acc':>5} {'fps':>7} {'faces':>5}")
+    try:
+        for backend in args.backends:
+            for n_identities in args.identities:
+                for samples in args.samples:
+                    r = run_scale(backend, n_identities, samples, args, frames, work_dir)
+                    results.append(r)
+                    accuracy = f"{r['accuracy']:.2f}" if r["accuracy"] is not None else "-"
+                    print(f"{backend:>7} {n_identities:>5} {r['samples']:>7} {r['train_ms']:>9.0f} "
+                          f"{r['model_bytes'] / 1024:>9.0f} {r['load_ms']:>8.1f} "
+                          f"{r['predict_ms_per_face']:>8.2f} {accuracy:>5} {r['replay_fps'] or 0:>7.1f} "
+                          f"{r['faces_per_frame'] or 0:>5.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "video": args.video or "synthetic",
+        "frames": len(frames),
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1)
+        print("Baseline saved to", args.save)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        print(f"{regressions} regression(s) against {args.compare}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
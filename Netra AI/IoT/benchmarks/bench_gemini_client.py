@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Exercise gemini_client.GeminiClient against the local stand-in server
+(mock_gemini_server.py) and report latency:
+
+  1. a fresh connection per request (the old bare requests.post) vs. the
+     pooled client, over a simulated round-trip delay
+  2. recovery from injected 503/429 responses with jittered backoff
+  3. a stalled server cut off by the read timeout
+  4. a missing API key failing fast
+
+Usage: python benchmarks/bench_gemini_client.py [--requests 20] [--delay 0.05]
+The same behaviour is asserted in tests/test_gemini_client.py.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gemini_client import GeminiClient, GeminiError  # noqa: E402
+from mock_gemini_server import Faults, start_background  # noqa: E402
+
+PAYLOAD = "A" * 40000    # ~30 KB of base64, about one budgeted JPEG
+
+
+def unpooled(url, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        requests.post(url, json={"contents": [{"parts": [
+            {"text": "Describe this image in short"},
+            {"inlineData": {"mimeType": "image/jpeg", "data": PAYLOAD}}]}]},
+            headers={"x-goog-api-key": "test", "Connection": "close"})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def pooled(client, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        client.describe("Describe this image in short", "image/jpeg", PAYLOAD)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summary(latencies):
+    lat = sorted(latencies)
+    return f"p50 {lat[len(lat) // 2]:7.1f} ms  max {lat[-1]:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini client benchmark against a local stand-in")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.05, help="Server delay per response, seconds")
+    args = parser.parse_args()
+
+    server = start_background(Faults(delay=args.delay))
+    client = GeminiClient(api_key="test", base_url=server.base_url)
+    try:
+        print("1) Connection reuse")
+        before = server.faults.connections
+        print(f"   new connection each: {summary(unpooled(client.url(), args.requests))}  "
+              f"connections {server.faults.connections - before}")
+        before = server.faults.connections
+        print(f"   pooled client:       {summary(pooled(client, args.requests))}  "
+              f"connections {server.faults.connections - before}")
+
+        print("2) Retry on 503 / 429")
+        for status in (503, 429):
+            server.faults.requests = 0
+            server.faults.fail_first, server.faults.fail_status = 2, status
+            start = time.perf_counter()
+            text = client.describe("Describe this image in short", "image/jpeg", PAYLOAD)
+            print(f"   {status} x2 -> recovered in {(time.perf_counter() - start) * 1000:.0f} ms: {text[:40]}...")
+        server.faults.fail_first = 0
+
+        print("3) Read timeout")
+        server.faults.delay = 2.0
+        impatient = GeminiClient(api_key="test", base_url=server.base_url, read_timeout=0.3, max_retries=1)
+        start = time.perf_counter()
+        try:
+            impatient.describe("Describe this image in short", "image/jpeg", PAYLOAD)
+            sys.exit("   read timeout did not fire")
+        except GeminiError as e:
+            print(f"   gave up after {(time.perf_counter() - start) * 1000:.0f} ms: {str(e)[:60]}...")
+        impatient.close()
+        server.faults.delay = args.delay
+
+        print("4) Missing key")
+        os.environ.pop("GEMINI_API_KEY", None)
+        try:
+            GeminiClient(api_key="", base_url=server.base_url).describe("x", "image/jpeg", PAYLOAD)
+            sys.exit("   request without an API key succeeded")
+        except GeminiError as e:
+            print(f"   {e}")
+
+        print("Client stats:", client.stats())
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
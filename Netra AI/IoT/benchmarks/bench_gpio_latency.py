@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Press-to-action latency of the button input layer, on any Linux box.
+
+Replays a scripted press sequence (with contact bounce) through sim_gpio and
+compares the edge-driven ButtonInput with the old 100 ms polling loop, whose
+handlers block for the action time plus the old 1 s debounce sleep.
+Reports latency from the press being complete (release for short presses,
+hold threshold for long ones) to the action starting, and how many presses
+each approach handled.
+
+Usage: python benchmarks/bench_gpio_latency.py [--presses 20] [--action-time 0.5]
+       python benchmarks/bench_gpio_latency.py --script presses.json
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sim_gpio as GPIO  # noqa: E402
+from button_input import ButtonInput  # noqa: E402
+
+PINS = [17, 18, 22, 23]
+LONG_PRESS = 3.0
+
+
+def make_script(n_presses, seed=0):
+    """
+    Random presses on the four buttons; one in five on pin 23 is a long press.
+    Returns (steps, expected) where expected is [(pin, kind, complete_offset)].
+    """
+    rng = random.Random(seed)
+    steps, expected = [], []
+    t = 0.2
+    for _ in range(n_presses):
+        pin = rng.choice(PINS)
+        long_press = pin == 23 and rng.random() < 0.2
+        duration = LONG_PRESS + 0.3 if long_press else rng.uniform(0.08, 0.4)
+        steps += GPIO.press(pin, t, duration)
+        expected.append((pin, "long" if long_press else "short",
+                         t + (LONG_PRESS if long_press else duration)))
+        t += duration + rng.uniform(0.1, 0.8)
+    return steps, expected, t + 1.0
+
+
+def setup_pins():
+    GPIO.setmode(GPIO.BCM)
+    for pin in PINS:
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else float("nan")
+
+
+def run_event_driven(steps, expected, total, action_time):
+    setup_pins()
+    started = []
+
+    def action(event):
+        started.append((event.pin, event.kind, time.monotonic()))
+        time.sleep(action_time)
+
+    buttons = ButtonInput(GPIO, long_press=LONG_PRESS)
+    for pin in PINS:
+        buttons.add_button(pin, action, on_long=action if pin == 23 else None)
+    buttons.start()
+    t0 = time.monotonic()
+    GPIO.replay(steps)
+    time.sleep(total + action_time * len(expected))
+    buttons.stop()
+    GPIO.cleanup()
+    return t0, started, buttons.stats()
+
+
+def run_polling(steps, expected, total, action_time, debounce=1.0, poll=0.1):
+    """
+    The original final.py loop: poll every 100 ms, block in the handler.
+    """
+    setup_pins()
+    started = []
+    stop = threading.Event()
+
+    def loop():
+        d_pressed, d_start = False, 0.0
+        while not stop.is_set():
+            for pin in (17, 18, 22):
+                if GPIO.input(pin) == GPIO.LOW:
+                    started.append((pin, "short", time.monotonic()))
+                    time.sleep(action_time + debounce)
+            if GPIO.input(23) == GPIO.LOW:
+                if not d_pressed:
+                    d_pressed, d_start = True, time.monotonic()
+            elif d_pressed:
+                d_pressed = False
+                kind = "long" if time.monotonic() - d_start >= LONG_PRESS else "short"
+                started.append((23, kind, time.monotonic()))
+                time.sleep(action_time + debounce)
+            time.sleep(poll)
+
+    t0 = time.monotonic()
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    GPIO.replay(steps)
+    time.sleep(total + (action_time + debounce) * 2)
+    stop.set()
+    thread.join()
+    GPIO.cleanup()
+    return t0, started, {}
+
+
+def match(t0, expected, started):
+    """
+    Pair each expected press with the first unused action for that pin and
+    kind that started after it completed. Returns latencies in ms.
+    """
+    used = set()
+    latencies = []
+    for pin, kind, offset in expected:
+        complete = t0 + offset
+        for i, (spin, skind, at) in enumerate(started):
+            if i not in used and spin == pin and skind == kind and at >= complete - 0.01:
+                used.add(i)
+                latencies.append((at - complete) * 1000)
+                break
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Button press-to-action latency")
+    parser.add_argument("--presses", type=int, default=20)
+    parser.add_argument("--action-time", type=float, default=0.5, help="Seconds each action runs")
+    parser.add_argument("--script", help="JSON press script (see sim_gpio.load_script)")
+    args = parser.parse_args()
+
+    if args.script:
+        steps = GPIO.load_script(args.script)
+        # Expected presses are reconstructed from the settled edges
+        expected, down = [], {}
+        for offset, pin, level in sorted(steps, key=lambda s: s[0]):
+            if level == GPIO.LOW and pin not in down:
+                down[pin] = offset
+            elif level == GPIO.HIGH and pin in down:
+                start = down.pop(pin)
+                held = offset - start
+                if pin == 23 and held >= LONG_PRESS:
+                    expected.append((pin, "long", start + LONG_PRESS))
+                elif held > 0.01:
+                    expected.append((pin, "short", offset))
+        total = max(s[0] for s in steps) + 1.0
+    else:
+        steps, expected, total = make_script(args.presses)
+
+    for name, runner in (("event-driven", run_event_driven), ("polling", run_polling)):
+        t0, started, stats = runner(steps, expected, total, args.action_time)
+        lat = match(t0, expected, started)
+        print(f"{name:13} handled {len(lat):>3}/{len(expected)} presses  "
+              f"p50 {percentile(lat, 50):7.1f} ms  p95 {percentile(lat, 95):7.1f} ms  "
+              f"max {max(lat) if lat else float('nan'):7.1f} ms {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Recognition loop FPS with and without the GUI:
+
+  gui:              process_frame + draw + imshow + waitKey (the old loop)
+  headless:         process_frame only
+  headless+preview: headless, with one client watching the MJPEG preview
+                    (annotated copies at most PREVIEW_FPS per second)
+
+Frames come from a recorded clip (--video) or camera_service.SyntheticSource
+and are decoded up front. The model is face_model.bundle if present,
+otherwise a small synthetic NumPy model. The GUI row is skipped when no
+display is available.
+
+Usage: python benchmarks/bench_headless.py [--video clip.mp4] [--frames 300]
+Run from the IoT directory so the Haar cascade path resolves.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import face_rec  # noqa: E402
+import model_bundle  # noqa: E402
+from bench_face_rec import replay_frames  # noqa: E402
+from bench_matcher import synthetic_faces  # noqa: E402
+from preview_server import PreviewServer  # noqa: E402
+
+
+def synthetic_model(identities=10, samples=10):
+    faces, labels = synthetic_faces(identities, samples, np.random.default_rng(0))
+    recognizer = model_bundle.create_recognizer("numpy")
+    recognizer.train(faces, labels)
+    return model_bundle.ModelBundle(recognizer, {i: f"person_{i}" for i in range(identities)}, "numpy", 0, {})
+
+
+def gui(pipeline, frame, results, preview):
+    frame = frame.copy()
+    face_rec.draw_results(frame, results)
+    cv2.imshow("Recognizing...", frame)
+    cv2.waitKey(1)
+
+
+def headless(pipeline, frame, results, preview):
+    if preview is not None and preview.due():
+        annotated = frame.copy()
+        face_rec.draw_results(annotated, results)
+        preview.publish(annotated)
+
+
+def watch(url, stop):
+    # One preview client reading the stream until told to stop
+    with urllib.request.urlopen(url + "stream", timeout=5) as response:
+        while not stop.is_set() and response.read(65536):
+            pass
+
+
+def run(model, frames, mode, preview=None):
+    pipeline = face_rec.RecognitionPipeline(model)
+    start = time.perf_counter()
+    for frame in frames:
+        mode(pipeline, frame, pipeline.process_frame(frame), preview)
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed if elapsed > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless vs. GUI recognition FPS")
+    parser.add_argument("--video", help="Recorded clip to replay (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    frames = replay_frames(args.video, args.frames)
+    model = face_rec.load_model() or synthetic_model()
+    print(f"{len(frames)} frames, model {model}")
+
+    results = {}
+    try:
+        results["gui"] = run(model, frames, gui)
+        cv2.destroyAllWindows()
+    except cv2.error as e:
+        print(f"GUI mode unavailable ({str(e).strip().splitlines()[-1]})")
+    results["headless"] = run(model, frames, headless)
+
+    preview = PreviewServer(port=0, max_fps=face_rec.PREVIEW_FPS).start()
+    stop = threading.Event()
+    client = threading.Thread(target=watch, args=(preview.url, stop), daemon=True)
+    client.start()
+    while preview.clients == 0 and client.is_alive():
+        time.sleep(0.01)
+    try:
+        results["headless+preview"] = run(model, frames, headless, preview)
+    finally:
+        stop.set()
+        preview.close()
+    print("Preview stats:", preview.stats())
+
+    for mode, fps in results.items():
+        gain = f"  ({fps / results['gui']:.2f}x GUI)" if "gui" in results else ""
+        print(f"{mode:18} {fps:7.1f} fps{gain}")
+
+
+if __name__ == "__main__":
+    main()
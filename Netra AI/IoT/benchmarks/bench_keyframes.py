@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Compare the MP4 upload path of gemini_video_describer with --keyframes
+mode on recorded clips.
+
+For each clip, the first --duration seconds are processed both ways:
+  mp4:       VideoWriter to /tmp, read back, base64 (as capture_video does)
+  keyframes: KeyframeSelector + in-memory budgeted JPEGs
+Both payloads are then sent to the local stand-in Gemini server. End to end
+is local processing + measured request time + the upload time the payload
+would take at --uplink-kbps (the recording time itself is the same for both).
+
+Usage: python benchmarks/bench_keyframes.py clip1.mp4 [clip2.mp4 ...] [--duration 5] [--uplink-kbps 256]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gemini_client import GeminiClient, inline_part  # noqa: E402
+from gemini_video_describer import KEYFRAME_MAX_BYTES, KEYFRAME_PROMPT, MAX_KEYFRAMES, PROMPT  # noqa: E402
+from image_encoder import encode_jpeg  # noqa: E402
+from keyframes import KeyframeSelector  # noqa: E402
+from mock_gemini_server import start_background  # noqa: E402
+
+TEMP_PATH = "/tmp/bench_capture.mp4"
+
+
+def load_clip(path, duration):
+    """
+    Decode up to `duration` seconds as (timestamp, frame) pairs.
+    """
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 20.0
+    frames = []
+    while len(frames) < duration * fps:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append((len(frames) / fps, cv2.resize(frame, (640, 480))))
+    cap.release()
+    return frames
+
+
+def mp4_parts(frames):
+    out = cv2.VideoWriter(TEMP_PATH, cv2.VideoWriter_fourcc(*"mp4v"), 20.0, (640, 480))
+    for _, frame in frames:
+        out.write(frame)
+    out.release()
+    with open(TEMP_PATH, "rb") as f:
+        data = base64.b64encode(f.read()).decode("utf-8")
+    return PROMPT, [inline_part("video/mp4", data)], len(data), 1
+
+
+def keyframe_parts(frames):
+    selector = KeyframeSelector(MAX_KEYFRAMES)
+    for timestamp, frame in frames:
+        selector.add(frame, timestamp)
+    images = [encode_jpeg(k.frame, KEYFRAME_MAX_BYTES) for k in selector.keyframes()]
+    parts = [inline_part("image/jpeg", image.base64()) for image in images]
+    return KEYFRAME_PROMPT, parts, sum(image.payload_size for image in images), len(images)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MP4 vs keyframe upload benchmark")
+    parser.add_argument("clips", nargs="+", help="Recorded video files")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--uplink-kbps", type=float, default=256.0)
+    args = parser.parse_args()
+
+    server = start_background()
+    client = GeminiClient(api_key="test", base_url=server.base_url)
+    print(f"{'clip':24} {'mode':>9} {'images':>6} {'bytes':>9} {'local ms':>8} {'request ms':>10} "
+          f"{'upload ms':>9} {'e2e ms':>8}")
+    try:
+        for clip in args.clips:
+            frames = load_clip(clip, args.duration)
+            if not frames:
+                print(f"{clip}: no frames decoded, skipping")
+                continue
+            results = {}
+            for mode, build in (("mp4", mp4_parts), ("keyframes", keyframe_parts)):
+                start = time.perf_counter()
+                prompt, parts, size, images = build(frames)
+                local_ms = (time.perf_counter() - start) * 1000
+                start = time.perf_counter()
+                client.describe_parts(prompt, parts)
+                request_ms = (time.perf_counter() - start) * 1000
+                upload_ms = size * 8 / args.uplink_kbps
+                results[mode] = (size, local_ms + request_ms + upload_ms)
+                print(f"{os.path.basename(clip)[:24]:24} {mode:>9} {images:>6} {size:>9} {local_ms:>8.0f} "
+                      f"{request_ms:>10.0f} {upload_ms:>9.0f} {results[mode][1]:>8.0f}")
+            saved = results["mp4"][0] - results["keyframes"][0]
+            print(f"{'':24} {'saved':>9} {'':>6} {saved:>9} ({saved / results['mp4'][0]:.0%}), "
+                  f"{results['mp4'][1] - results['keyframes'][1]:.0f} ms faster end to end")
+    finally:
+        client.close()
+        server.shutdown()
+        if os.path.exists(TEMP_PATH):
+            os.remove(TEMP_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy feature matcher against cv2.face LBPH at 10, 100 and
+1,000 enrolled identities using synthetic faces.
+
+Usage: python benchmarks/bench_matcher.py [--identities 10 100 1000]
+                                          [--samples 20] [--batch 5] [--lbph-max 100]
+LBPH training at 1,000 identities takes very long on a Pi, so it is only
+run up to --lbph-max identities.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_matcher import FACE_SIZE, NumpyFaceRecognizer  # noqa: E402
+
+
+def synthetic_faces(n_identities, samples, rng):
+    """
+    One smooth random "face" per identity, with noisy, slightly shifted samples.
+    """
+    width, height = FACE_SIZE
+    faces = []
+    labels = []
+    for label in range(n_identities):
+        base = cv2.GaussianBlur(rng.integers(0, 256, (height, width)).astype(np.uint8), (9, 9), 0)
+        for _ in range(samples):
+            dx, dy = rng.integers(-3, 4, 2)
+            shifted = np.roll(np.roll(base, dy, axis=0), dx, axis=1).astype(np.int16)
+            noisy = shifted + rng.normal(0, 8, shifted.shape)
+            faces.append(np.clip(noisy, 0, 255).astype(np.uint8))
+            labels.append(label)
+    return faces, np.array(labels, dtype=np.int32)
+
+
+def time_predictions(predict, queries, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for q in queries:
+            predict(q)
+    return (time.perf_counter() - start) / (repeats * len(queries)) * 1000
+
+
+def accuracy(predict, queries, truth):
+    return float(np.mean([predict(q)[0] == t for q, t in zip(queries, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face matcher benchmark")
+    parser.add_argument("--identities", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--samples", type=int, default=20, help="Enrolled samples per identity")
+    parser.add_argument("--batch", type=int, default=5, help="Faces per frame for batch scoring")
+    parser.add_argument("--lbph-max", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'ids':>5} {'backend':>7} {'train s':>8} {'ms/face':>8} {'ms/batch':>9} {'top1':>5}")
+    for n in args.identities:
+        faces, labels = synthetic_faces(n, args.samples + 1, rng)
+        # Hold out the last sample of each identity as the query
+        query_idx = np.arange(args.samples, len(faces), args.samples + 1)
+        train_mask = np.ones(len(faces), bool)
+        train_mask[query_idx] = False
+        train_faces = [f for f, keep in zip(faces, train_mask) if keep]
+        train_labels = labels[train_mask]
+        queries = [faces[i] for i in query_idx[:50]]
+        truth = labels[query_idx[:50]]
+
+        matcher = NumpyFaceRecognizer()
+        start = time.perf_counter()
+        matcher.train(train_faces, train_labels)
+        train_s = time.perf_counter() - start
+        single_ms = time_predictions(matcher.predict, queries, args.repeats)
+        batch = queries[:args.batch]
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            matcher.predict_batch(batch, k=3)
+        batch_ms = (time.perf_counter() - start) / args.repeats * 1000
+        print(f"{n:>5} {'numpy':>7} {train_s:>8.2f} {single_ms:>8.2f} {batch_ms:>9.2f} "
+              f"{accuracy(matcher.predict, queries, truth):>5.2f}")
+
+        if n <= args.lbph_max and hasattr(cv2, "face"):
+            lbph = cv2.face.LBPHFaceRecognizer_create()
+            start = time.perf_counter()
+            lbph.train(train_faces, train_labels)
+            train_s = time.perf_counter() - start
+            single_ms = time_predictions(lbph.predict, queries, args.repeats)
+            print(f"{n:>5} {'lbph':>7} {train_s:>8.2f} {single_ms:>8.2f} "
+                  f"{single_ms * len(batch):>9.2f} {accuracy(lbph.predict, queries, truth):>5.2f}")
+
+
+if __name__ == "__main__":
+    main()
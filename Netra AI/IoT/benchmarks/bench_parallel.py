@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Recognition throughput and end-to-end latency, serial vs. worker pools.
+
+A capture process publishes frames into its own shared-memory ring
+(camera_service.serve with synthetic frames holding two drawn faces, or a
+recorded clip). The default --fps is well above what any configuration
+reaches, so the capture rate does not cap the comparison; 0 publishes as
+fast as possible. Each configuration then recognizes for --seconds:
+
+  serial:     RecognitionPipeline.process_frame on the newest frame, in
+              this process (the recognize_loop path)
+  N workers:  parallel_recognition with N processes, results in frame order
+
+Latency is from capture (the ring's timestamp) to the recognized result.
+The model is face_model.bundle if present, otherwise the small synthetic
+NumPy model of bench_headless.
+
+Usage: python benchmarks/bench_parallel.py [--workers 1 2 4] [--video clip.mp4]
+                                           [--fps 120] [--seconds 10]
+Run from the IoT directory so the Haar cascade path resolves.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import face_rec  # noqa: E402
+import model_bundle  # noqa: E402
+import parallel_recognition  # noqa: E402
+from bench_headless import synthetic_model  # noqa: E402
+
+SHM_NAME = "netra_bench_camera"   # Separate from a camera service that may be running
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+def run_serial(model, subscriber, seconds):
+    pipeline = face_rec.RecognitionPipeline(model)
+    latencies = []
+    start = time.monotonic()
+    while time.monotonic() - start < seconds:
+        ret, frame = subscriber.read()
+        if not ret:
+            break
+        age = subscriber.last_frame_age
+        began = time.monotonic()
+        pipeline.process_frame(frame)
+        latencies.append(age + time.monotonic() - began)
+    elapsed = time.monotonic() - start
+    return {
+        "fps": len(latencies) / elapsed,
+        "p50_latency_ms": percentile(latencies, 0.5),
+        "p95_latency_ms": percentile(latencies, 0.95),
+        "dropped": 0,
+    }
+
+
+class _Deadline:
+    # Stands in for the stop Event: set once `seconds` have passed
+    def __init__(self, seconds):
+        self.end = time.monotonic() + seconds
+
+    def is_set(self):
+        return time.monotonic() >= self.end
+
+
+def run_parallel(model_path, subscriber, workers, seconds):
+    recognizer = parallel_recognition.ParallelRecognizer(workers, model_path, SHM_NAME).start()
+    stop = _Deadline(seconds)
+    try:
+        parallel_recognition.run(recognizer, subscriber, stop)
+        return recognizer.stats()
+    finally:
+        recognizer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs. multi-process recognition")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--video", help="Recorded clip to publish (default: synthetic frames with faces)")
+    parser.add_argument("--fps", type=float, default=120, help="Capture frame rate (0: unpaced)")
+    parser.add_argument("--seconds", type=float, default=10, help="Run time per configuration")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="netra_bench_")
+    model_path = face_rec.MODEL_PATH
+    model = face_rec.load_model()
+    if model is None or not os.path.exists(model_path):
+        # Workers load the model from disk, so the synthetic one is saved first
+        model = synthetic_model()
+        model_path = os.path.join(work_dir, "model.bundle")
+        model_bundle.save_bundle(model.recognizer, model.backend, model.labels, path=model_path)
+    rate = f"{args.fps:g} fps" if args.fps else "unpaced"
+    print(f"Model {model}, {os.cpu_count()} cores, capture {rate}")
+
+    subscriber, capture = parallel_recognition.start_capture(args.video or "faces", args.fps, SHM_NAME)
+    results = {}
+    try:
+        results["serial"] = run_serial(model, subscriber, args.seconds)
+        for workers in args.workers:
+            results[f"{workers} workers"] = run_parallel(model_path, subscriber, workers, args.seconds)
+    finally:
+        parallel_recognition.stop_capture(subscriber, capture)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'mode':>10} {'fps':>7} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'dropped':>8}")
+    for mode, r in results.items():
+        speedup = r["fps"] / results["serial"]["fps"] if results["serial"]["fps"] else 0.0
+        print(f"{mode:>10} {r['fps']:>7.1f} {speedup:>7.2f}x {r['p50_latency_ms']:>8.1f} "
+              f"{r['p95_latency_ms']:>8.1f} {r['dropped']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Time to first audio: blocking describe + whole-text TTS vs. streamed
+description spoken sentence by sentence (speech_pipeline).
+
+Runs against the local stand-in server (mock_gemini_server.py) with
+simulated model latency, and stand-in synthesis/playback whose cost grows
+with text length, so no key, network or audio device is needed.
+
+Usage: python benchmarks/bench_streaming.py [--first-byte 1.5] [--chunk-delay 0.15]
+                                            [--synth-base 0.4] [--synth-per-char 0.004]
+                                            [--words-per-second 2.5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gemini_client import GeminiClient  # noqa: E402
+from mock_gemini_server import Faults, start_background  # noqa: E402
+from speech_pipeline import speak_stream  # noqa: E402
+
+PAYLOAD = "A" * 40000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming speech benchmark")
+    parser.add_argument("--first-byte", type=float, default=1.5, help="Model latency before the first token, s")
+    parser.add_argument("--chunk-delay", type=float, default=0.15, help="Seconds between streamed events")
+    parser.add_argument("--synth-base", type=float, default=0.4, help="TTS round trip per request, s")
+    parser.add_argument("--synth-per-char", type=float, default=0.004, help="TTS cost per character, s")
+    parser.add_argument("--words-per-second", type=float, default=2.5, help="Playback speed")
+    args = parser.parse_args()
+
+    def synthesize(text):
+        time.sleep(args.synth_base + args.synth_per_char * len(text))
+        return text
+
+    def play(text):
+        time.sleep(len(text.split()) / args.words_per_second)
+
+    server = start_background(Faults(delay=args.first_byte, chunk_delay=args.chunk_delay))
+    client = GeminiClient(api_key="test", base_url=server.base_url)
+    try:
+        # Blocking: the whole description, then the whole synthesis, then playback
+        start = time.monotonic()
+        text = "".join(client.describe_stream("Describe this image in short", "image/jpeg", PAYLOAD))
+        audio = synthesize(text)
+        first_audio = time.monotonic() - start
+        play(audio)
+        total = time.monotonic() - start
+        print(f"blocking:  first audio {first_audio * 1000:7.0f} ms   total {total * 1000:7.0f} ms")
+
+        # Streaming: sentences synthesized while earlier ones play
+        text, stats = speak_stream(client.describe_stream("Describe this image in short", "image/jpeg", PAYLOAD),
+                                   synthesize=synthesize, play=play)
+        print(f"streaming: first audio {stats['first_audio_ms']:7.0f} ms   total {stats['total_ms']:7.0f} ms   "
+              f"({stats['sentences_spoken']} sentences)")
+        print(f"first audio {first_audio * 1000 / stats['first_audio_ms']:.1f}x sooner")
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Time to first audio and total wall time for speaking a long description:
+
+  whole text:   one TTS request for everything, then playback (the old path)
+  1 worker:     chunked, one chunk synthesized at a time
+  N workers:    chunked, N chunks synthesized concurrently, played in order
+  N + fallback: as above, with a fast local engine for chunks the remote
+                backend does not deliver within the deadline
+
+Synthesis and playback are stand-ins: the remote TTS costs a round trip plus
+a per-character time and is occasionally much slower; playback sleeps for
+the length of the text at speaking pace. No network or audio device needed.
+
+Usage: python benchmarks/bench_tts.py [--workers 3] [--synth-base 0.4] [--synth-per-char 0.004]
+                                      [--slow-rate 0.2] [--slow-delay 3] [--deadline 1.5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from speech_pipeline import speak_text  # noqa: E402
+from tts_backends import FallbackSynthesizer  # noqa: E402
+
+TEXT = ("The room in front of you is a small kitchen. A wooden table stands in the middle, "
+        "with two chairs pushed underneath it, a bowl of fruit, and a folded newspaper on top. "
+        "To your left there is a counter with a kettle, a toaster and a chopping board; "
+        "the sink is under the window. The floor is clear, but a bag has been left near the door "
+        "on your right. Someone is standing by the fridge, facing away from you.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked parallel TTS benchmark")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--synth-base", type=float, default=0.4, help="Remote TTS round trip, s")
+    parser.add_argument("--synth-per-char", type=float, default=0.004, help="Remote TTS cost per character, s")
+    parser.add_argument("--slow-rate", type=float, default=0.2, help="Fraction of remote calls that stall")
+    parser.add_argument("--slow-delay", type=float, default=3.0, help="Extra seconds for a stalled call")
+    parser.add_argument("--local-per-char", type=float, default=0.0005, help="Local TTS cost per character, s")
+    parser.add_argument("--deadline", type=float, default=1.5, help="Fallback deadline, s")
+    parser.add_argument("--words-per-second", type=float, default=2.5, help="Playback speed")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    def remote(text):
+        delay = args.synth_base + args.synth_per_char * len(text)
+        if rng.random() < args.slow_rate:
+            delay += args.slow_delay
+        time.sleep(delay)
+        return text
+
+    def local(text):
+        time.sleep(args.local_per_char * len(text))
+        return text
+
+    def play(text):
+        time.sleep(len(text.split()) / args.words_per_second)
+
+    # Whole text in one request, then playback
+    rng = random.Random(args.seed)
+    start = time.monotonic()
+    audio = remote(TEXT)
+    first_audio = (time.monotonic() - start) * 1000
+    play(audio)
+    total = (time.monotonic() - start) * 1000
+    print(f"{'whole text':14} first audio {first_audio:7.0f} ms   total {total:7.0f} ms")
+
+    runs = (
+        ("1 worker", remote, 1),
+        (f"{args.workers} workers", remote, args.workers),
+        (f"{args.workers} + fallback", FallbackSynthesizer(remote, local, deadline=args.deadline), args.workers),
+    )
+    for name, synthesize, workers in runs:
+        rng = random.Random(args.seed)   # same stalls for every run
+        stats = speak_text(TEXT, synthesize=synthesize, play=play, workers=workers)
+        print(f"{name:14} first audio {stats['first_audio_ms']:7.0f} ms   total {stats['total_ms']:7.0f} ms   "
+              f"({stats['sentences_spoken']} chunks)")
+        if isinstance(synthesize, FallbackSynthesizer):
+            print(f"{'':14} {synthesize.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Peak memory and post-recording latency of the inline MP4 path vs. the
+streaming File API upload (video_upload.py), for growing clip lengths.
+
+Frames come from camera_service.SyntheticSource at real-time pace, uploads go
+to the local stand-in server (mock_gemini_server.py). Peak memory is the
+tracemalloc peak of Python/NumPy allocations during capture + upload.
+
+The streaming path also reports when its first chunk went out and how many
+chunks were sent while still recording. The exit status is 1 if a clip
+longer than one chunk sent nothing before recording ended, i.e. upload did
+not overlap capture.
+
+Usage: python benchmarks/bench_video_upload.py [--durations 5 15 30] [--fps 20]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from camera_service import SyntheticSource  # noqa: E402
+from gemini_client import GeminiClient, file_part, inline_part  # noqa: E402
+from mock_gemini_server import start_background  # noqa: E402
+from video_upload import record_and_upload  # noqa: E402
+
+TEMP_PATH = "/tmp/bench_upload.mp4"
+
+
+class SyntheticCamera:
+    """
+    SyntheticSource behind the (ret, frame) read() interface of the cameras.
+    """
+
+    def __init__(self, fps):
+        self.source = SyntheticSource(640, 480, fps)
+
+    def read(self):
+        return True, self.source.read()
+
+
+def inline(camera, duration, fps, client):
+    out = cv2.VideoWriter(TEMP_PATH, cv2.VideoWriter_fourcc(*"mp4v"), float(fps), (640, 480))
+    start = time.monotonic()
+    while time.monotonic() - start < duration:
+        out.write(camera.read()[1])
+    out.release()
+    recorded_at = time.monotonic()
+    with open(TEMP_PATH, "rb") as f:
+        data = base64.b64encode(f.read()).decode("utf-8")
+    client.describe_parts("Describe this video in short", [inline_part("video/mp4", data)])
+    return len(data), (time.monotonic() - recorded_at) * 1000, None
+
+
+def streamed(camera, duration, fps, client):
+    resource, stats = record_and_upload(camera, duration, client, fps=fps)
+    client.describe_parts("Describe this video in short", [file_part("video/mp4", resource["uri"])])
+    return stats["bytes"], stats["ready_ms"], stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline vs. streaming video upload benchmark")
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 15, 30])
+    parser.add_argument("--fps", type=int, default=20)
+    args = parser.parse_args()
+
+    server = start_background(processing_time=0.5)
+    client = GeminiClient(api_key="test", base_url=server.base_url)
+    print(f"{'duration':>8} {'mode':>8} {'bytes':>10} {'peak MB':>8} {'after rec ms':>12} "
+          f"{'1st chunk ms':>12} {'chunks in rec':>13}")
+    no_overlap = 0
+    try:
+        for duration in args.durations:
+            for mode, run in (("inline", inline), ("stream", streamed)):
+                tracemalloc.start()
+                size, after_ms, stats = run(SyntheticCamera(args.fps), duration, args.fps, client)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                overlap = ""
+                if stats is not None:
+                    first = stats["first_chunk_ms"]
+                    first = f"{first:.0f}" if first is not None else "-"
+                    overlap = f" {first:>12} {stats['chunks_while_recording']:>13}"
+                    if size > stats["chunk_size"] and not stats["chunks_while_recording"]:
+                        no_overlap += 1
+                        overlap += "  NO OVERLAP"
+                print(f"{duration:>7.0f}s {mode:>8} {size:>10} {peak / 1e6:>8.1f} {after_ms:>12.0f}{overlap}")
+    finally:
+        client.close()
+        server.shutdown()
+        if os.path.exists(TEMP_PATH):
+            os.remove(TEMP_PATH)
+    sys.exit(1 if no_overlap else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+"""
+Event-driven button input for final.py.
+
+Edges arrive through GPIO.add_event_detect callbacks instead of polling.
+The callback only timestamps the edge, debounces it in software, and
+classifies short and long presses. An edge swallowed by the debounce
+window is not trusted blindly: the pin is sampled again when the window
+ends, and once more before a long press fires. The actions run on worker threads, so the
+input side never blocks and presses made during a running action are
+queued rather than lost. Long presses (the emergency path) have their own
+worker and fire as soon as the hold time is reached.
+
+Works with RPi.GPIO or with sim_gpio, the scripted stand-in for machines
+without GPIO.
+"""
+
+import queue
+import threading
+import time
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+DEBOUNCE_TIME = 0.05      # Seconds an edge must be apart from the last accepted one
+LONG_PRESS_TIME = 3.0     # Seconds of hold that make a long press
+MAX_PENDING = 4           # Queued actions per worker; more presses are dropped
+
+
+class ButtonEvent:
+    """
+    One classified press, with monotonic timestamps.
+    """
+
+    def __init__(self, pin, kind, pressed_at, fired_at):
+        self.pin = pin
+        self.kind = kind              # "short" or "long"
+        self.pressed_at = pressed_at
+        self.fired_at = fired_at      # release (short) or hold threshold (long)
+        self.started_at = None        # when the action began running
+
+    @property
+    def duration(self):
+        return self.fired_at - self.pressed_at
+
+    def __repr__(self):
+        return f"ButtonEvent(pin={self.pin}, {self.kind}, {self.duration:.3f}s)"
+
+
+class _Button:
+    def __init__(self, pin, on_short, on_long):
+        self.pin = pin
+        self.on_short = on_short
+        self.on_long = on_long
+        self.pressed = False
+        self.pressed_at = 0.0
+        self.last_edge = -1.0
+        self.long_timer = None
+        self.long_fired = False
+        self.settle_timer = None      # re-samples the pin after a swallowed edge
+
+
+class ButtonInput:
+    """
+    Debounced, edge-driven buttons (active low, as wired in final.py).
+
+    add_button(pin, on_short, on_long) registers actions; each action is
+    called with the ButtonEvent. Call start() after all buttons are added.
+    """
+
+    def __init__(self, gpio, debounce=DEBOUNCE_TIME, long_press=LONG_PRESS_TIME,
+                 max_pending=MAX_PENDING):
+        self.gpio = gpio
+        self.debounce = debounce
+        self.long_press = long_press
+        self.buttons = {}
+        self.lock = threading.Lock()
+        self.queues = {"normal": queue.Queue(max_pending), "urgent": queue.Queue(max_pending)}
+        self.pending = set()          # (pin, kind) already waiting in a queue
+        self.workers = []
+        self.running = False
+        self.bounces = 0
+        self.glitches = 0
+        self.dropped = 0
+        self.actions = 0
+        self.latencies = []           # press classified -> action start, seconds (recent)
+
+    def add_button(self, pin, on_short, on_long=None):
+        self.buttons[pin] = _Button(pin, on_short, on_long)
+
+    def start(self):
+        self.running = True
+        for name, q in self.queues.items():
+            worker = threading.Thread(target=self._worker, args=(q,), name=f"button-{name}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        for pin in self.buttons:
+            self.gpio.add_event_detect(pin, self.gpio.BOTH, callback=self._on_edge)
+        return self
+
+    def _on_edge(self, pin):
+        now = time.monotonic()
+        button = self.buttons.get(pin)
+        if button is None:
+            return
+        level_pressed = self.gpio.input(pin) == self.gpio.LOW
+        with self.lock:
+            if level_pressed == button.pressed or now - button.last_edge < self.debounce:
+                self.bounces += 1
+                # The pin may settle on the level this edge reported: look again when the window ends
+                if button.settle_timer is None:
+                    wait = max(0.0, button.last_edge + self.debounce - now) + 0.001
+                    button.settle_timer = threading.Timer(wait, self._settle, args=(button,))
+                    button.settle_timer.daemon = True
+                    button.settle_timer.start()
+                return
+            button.last_edge = now
+            button.pressed = level_pressed
+            if level_pressed:
+                button.pressed_at = now
+                button.long_fired = False
+                if button.on_long is not None:
+                    button.long_timer = threading.Timer(self.long_press, self._on_long, args=(button,))
+                    button.long_timer.daemon = True
+                    button.long_timer.start()
+                return
+            if button.long_timer is not None:
+                button.long_timer.cancel()
+                button.long_timer = None
+            if button.long_fired:
+                return
+            event = ButtonEvent(pin, "short", button.pressed_at, now)
+        self._dispatch(event, button.on_short, self.queues["normal"])
+
+    def _settle(self, button):
+        level_pressed = self.gpio.input(button.pin) == self.gpio.LOW
+        with self.lock:
+            button.settle_timer = None
+            if level_pressed == button.pressed:
+                return
+            if button.pressed:
+                # Released within the debounce window of the press: a glitch, not a press
+                self.glitches += 1
+                button.pressed = False
+                button.last_edge = time.monotonic()
+                if button.long_timer is not None:
+                    button.long_timer.cancel()
+                    button.long_timer = None
+                return
+        # A press whose edge fell inside the window of the previous release
+        self._on_edge(button.pin)
+
+    def _on_long(self, button):
+        # The emergency path: trust the pin, not the last accepted edge
+        level_pressed = self.gpio.input(button.pin) == self.gpio.LOW
+        with self.lock:
+            button.long_timer = None
+            if not level_pressed:
+                if button.pressed:
+                    self.glitches += 1
+                    button.pressed = False
+                return
+            if not button.pressed or button.long_fired:
+                return
+            button.long_fired = True
+            event = ButtonEvent(button.pin, "long", button.pressed_at, time.monotonic())
+        self._dispatch(event, button.on_long, self.queues["urgent"])
+
+    def _dispatch(self, event, action, target):
+        key = (event.pin, event.kind)
+        with self.lock:
+            # A press whose action is already waiting adds nothing
+            if key in self.pending:
+                self.dropped += 1
+                return
+            try:
+                target.put_nowait((event, action))
+            except queue.Full:
+                self.dropped += 1
+                return
+            self.pending.add(key)
+
+    def _worker(self, q):
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            event, action = item
+            with self.lock:
+                self.pending.discard((event.pin, event.kind))
+            event.started_at = time.monotonic()
+            self.actions += 1
+            self.latencies.append(event.started_at - event.fired_at)
+            if len(self.latencies) > 500:
+                del self.latencies[0]
+            try:
+                action(event)
+            except Exception as e:
+                print(f"Error handling {event}: {str(e)}")
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        return {
+            "actions": self.actions,
+            "bounces_ignored": self.bounces,
+            "glitches_ignored": self.glitches,
+            "dropped": self.dropped,
+            "p50_latency": lat[len(lat) // 2] if lat else 0.0,
+            "max_latency": lat[-1] if lat else 0.0,
+        }
+
+    def stop(self):
+        self.running = False
+        for pin, button in self.buttons.items():
+            self.gpio.remove_event_detect(pin)
+            for timer in (button.long_timer, button.settle_timer):
+                if timer is not None:
+                    timer.cancel()
+        for q in self.queues.values():
+            q.put(None)
+        for worker in self.workers:
+            worker.join(timeout=1.0)
+        self.workers = []
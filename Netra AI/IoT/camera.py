@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+"""
+Threaded camera capture shared by the Netra scripts.
+
+When the shared camera service is running, open_camera() returns a
+subscriber to it instead, so several scripts can use the camera at once.
+Otherwise a dedicated grabber thread keeps reading from the device into a
+small ring buffer and overwrites frames nobody consumed, so a slow consumer
+(speech, network calls) always gets the newest frame instead of a stale
+V4L2 backlog.
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+import tracing
+from camera_service import subscribe
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+CAMERA_INDEX = 0          # USB camera device index
+BUFFER_SIZE = 2           # Frames kept in the ring buffer
+READ_TIMEOUT = 2.0        # Seconds read() waits for a new frame
+
+
+class ThreadedCamera:
+    """
+    cv2.VideoCapture wrapper with a background grabber thread.
+
+    read() returns (ret, frame) like cv2.VideoCapture.read(), but always hands
+    out the newest frame and never the same frame twice. Frames overwritten
+    before anyone read them are counted as dropped.
+    """
+
+    def __init__(self, source=CAMERA_INDEX, api_preference=None, width=None, height=None,
+                 buffer_size=BUFFER_SIZE):
+        self.source = source
+        self.api_preference = api_preference
+        self.width = width
+        self.height = height
+        self.buffer = deque(maxlen=max(1, buffer_size))
+        self.cond = threading.Condition()
+        self.cap = None
+        self.thread = None
+        self.running = False
+        self.last_seq = 0          # sequence number of the last frame handed out
+        self.seq = 0               # sequence number of the last frame grabbed
+        self.frames_grabbed = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self.last_frame_age = 0.0
+        self.max_frame_age = 0.0
+        self.total_frame_age = 0.0
+
+    def start(self):
+        """
+        Open the device and start the grabber thread. Returns True on success.
+        """
+        if self.api_preference is None:
+            self.cap = cv2.VideoCapture(self.source)
+        else:
+            self.cap = cv2.VideoCapture(self.source, self.api_preference)
+        if not self.cap.isOpened():
+            return False
+        if self.width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        # Keep the driver-side queue as short as the backend allows
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self.running = True
+        self.thread = threading.Thread(target=self._grab_loop, name="camera-grabber", daemon=True)
+        self.thread.start()
+        return True
+
+    def isOpened(self):
+        return self.running
+
+    def _grab_loop(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+            with self.cond:
+                self.seq += 1
+                self.frames_grabbed += 1
+                if len(self.buffer) == self.buffer.maxlen:
+                    oldest_seq = self.buffer[0][0]
+                    if oldest_seq > self.last_seq:
+                        self.frames_dropped += 1
+                self.buffer.append((self.seq, time.monotonic(), frame))
+                self.cond.notify_all()
+
+    def read(self, timeout=READ_TIMEOUT):
+        """
+        Wait for a frame newer than the last one returned and return it.
+        Returns (False, None) if the camera stopped or no frame arrived in time.
+        """
+        newest = self._wait_newer(self.last_seq, timeout)
+        if newest is None:
+            return False, None
+        seq, grabbed_at, frame = newest
+        with self.cond:
+            # Anything older than this and not yet delivered is skipped
+            self.frames_dropped += sum(1 for s, _, _ in self.buffer if self.last_seq < s < seq)
+            self.last_seq = seq
+        self._delivered(grabbed_at)
+        return True, frame
+
+    def _wait_newer(self, after_seq, timeout):
+        # Newest (seq, grabbed_at, frame) with seq > after_seq, or None on timeout/stop
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while self.running and (not self.buffer or self.buffer[-1][0] <= after_seq):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.cond.wait(remaining)
+            if not self.buffer or self.buffer[-1][0] <= after_seq:
+                return None
+            return self.buffer[-1]
+
+    def _delivered(self, grabbed_at):
+        age = time.monotonic() - grabbed_at
+        self.frames_delivered += 1
+        self.last_frame_age = age
+        self.max_frame_age = max(self.max_frame_age, age)
+        self.total_frame_age += age
+
+    def reader(self):
+        """
+        A separate consumer of this camera with its own position: it gets
+        every new frame regardless of what other readers (or read()) took.
+        """
+        return CameraReader(self)
+
+    def stats(self):
+        """
+        Counters for dropped frames and the age of delivered frames (seconds).
+        """
+        delivered = self.frames_delivered
+        return {
+            "grabbed": self.frames_grabbed,
+            "delivered": delivered,
+            "dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+            "last_frame_age": self.last_frame_age,
+            "max_frame_age": self.max_frame_age,
+            "mean_frame_age": self.total_frame_age / delivered if delivered else 0.0,
+        }
+
+    def release(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class CameraReader:
+    """
+    One consumer's view of a shared ThreadedCamera, with the same
+    read()/isOpened()/release()/stats() interface. Frames are private
+    copies, so a consumer drawing on its frame cannot affect another.
+    release() leaves the camera running for its owner.
+    """
+
+    def __init__(self, camera):
+        self.camera = camera
+        self.last_seq = camera.seq   # Start from the next frame, not a stale one
+        self.open = True
+
+    def isOpened(self):
+        return self.open and self.camera.isOpened()
+
+    def read(self, timeout=READ_TIMEOUT):
+        newest = self.camera._wait_newer(self.last_seq, timeout) if self.open else None
+        if newest is None:
+            return False, None
+        seq, grabbed_at, frame = newest
+        self.last_seq = seq
+        self.camera._delivered(grabbed_at)
+        return True, frame.copy()
+
+    def stats(self):
+        return self.camera.stats()
+
+    def release(self):
+        self.open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def open_camera(source=CAMERA_INDEX, api_preference=None, width=None, height=None,
+                buffer_size=BUFFER_SIZE, fps=None):
+    """
+    Attach to the shared camera service (camera_service.py) if it is running,
+    otherwise create and start a ThreadedCamera on the device.
+    `fps` limits how often read() returns a frame when using the service.
+    Returns None if the device cannot be opened.
+    """
+    with tracing.span("camera_open") as attrs:
+        if source == CAMERA_INDEX:
+            size = (width, height) if width and height else None
+            subscriber = subscribe(fps=fps, size=size)
+            if subscriber is not None:
+                attrs["shared"] = True
+                return subscriber
+
+        camera = ThreadedCamera(source, api_preference, width, height, buffer_size)
+        if not camera.start():
+            camera.release()
+            attrs["failed"] = True
+            return None
+        return camera
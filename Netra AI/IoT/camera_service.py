@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+
+"""
+Shared camera service.
+
+One owner process opens the camera and publishes every frame into a ring
+of slots in POSIX shared memory. Any number of consumers (recognition,
+image description, clip recording) attach with CameraSubscriber and read
+the newest frame as a private copy (or, for consumers that re-validate,
+a zero-copy view), each at its own rate and, if asked, its own resolution. The device is opened and settled once, and it is
+never "busy" for a second script.
+
+Shared memory layout:
+    header   magic, version, width, height, channels, slots, write_seq,
+             heartbeat (wall time of the last publish), source fps
+    slots    per slot: seq (0 while being written) and monotonic capture time
+    frames   slots x height x width x channels uint8
+
+Usage: python camera_service.py [--source 0 | clip.mp4 | synthetic | faces]
+                                [--width 640] [--height 480] [--fps 30] [--slots 8]
+"""
+
+import argparse
+import os
+import signal
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+SHM_NAME = "netra_camera"     # Shared memory block published by the service
+SLOTS = 8                     # Frames kept in the ring
+STALE_AFTER = 2.0             # Seconds without a publish before the service counts as gone
+POLL_INTERVAL = 0.002         # Subscriber wait granularity (seconds)
+READ_TIMEOUT = 2.0
+SYNTHETIC_FACES = 2           # Faces drawn by the "faces" test source
+
+MAGIC = 0x4E455452            # "NETR"
+LAYOUT_VERSION = 1
+HEADER_DTYPE = np.dtype([
+    ("magic", np.uint32), ("version", np.uint32), ("width", np.uint32), ("height", np.uint32),
+    ("channels", np.uint32), ("slots", np.uint32), ("write_seq", np.uint64),
+    ("heartbeat", np.float64), ("fps", np.float64),
+])
+SLOT_DTYPE = np.dtype([("seq", np.uint64), ("timestamp", np.float64)])
+
+
+def _layout(width, height, channels, slots):
+    header_size = HEADER_DTYPE.itemsize
+    table_size = SLOT_DTYPE.itemsize * slots
+    frame_size = width * height * channels
+    return header_size, table_size, frame_size, header_size + table_size + frame_size * slots
+
+
+def _views(buf, width, height, channels, slots):
+    header_size, table_size, frame_size, _ = _layout(width, height, channels, slots)
+    header = np.ndarray((), HEADER_DTYPE, buffer=buf, offset=0)
+    table = np.ndarray((slots,), SLOT_DTYPE, buffer=buf, offset=header_size)
+    frames = np.ndarray((slots, height, width, channels), np.uint8, buffer=buf,
+                        offset=header_size + table_size)
+    return header, table, frames
+
+
+##################################
+# FRAME SOURCES
+##################################
+class DeviceSource:
+    """
+    A V4L2/USB camera.
+    """
+
+    def __init__(self, index=0, width=640, height=480, fps=30):
+        self.cap = cv2.VideoCapture(index, cv2.CAP_V4L2)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open camera {index}")
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fps = fps
+
+    def read(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+class FileSource:
+    """
+    A recorded clip, looped and paced to its own frame rate.
+    """
+
+    def __init__(self, path, loop=True):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.next_at = time.monotonic()
+
+    def read(self):
+        delay = self.next_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_at = max(self.next_at + 1.0 / self.fps, time.monotonic())
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+class SyntheticSource:
+    """
+    Generated frames (moving box over a gradient, frame number drawn in),
+    for tests and benchmarks without a camera. With `faces`, that many
+    drawn faces (each with its own skin texture, found by the Haar frontal
+    cascade) drift along the bottom of the frame. `fps` 0 is unpaced.
+    """
+
+    def __init__(self, width=640, height=480, fps=30, faces=0, seed=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.count = 0
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self.background = np.repeat(np.tile(gradient, (height, 1))[:, :, None], 3, axis=2)
+        rng = np.random.default_rng(seed)
+        self.face_size = min(width // max(1, faces), height) * 2 // 3
+        self.faces = [draw_face(self.face_size, rng) for _ in range(faces)]
+        self.next_at = time.monotonic()
+
+    def read(self):
+        if self.fps:
+            delay = self.next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_at = max(self.next_at + 1.0 / self.fps, time.monotonic())
+        frame = self.background.copy()
+        size = min(self.width, self.height) // 4
+        x = (self.count * 4) % max(1, self.width - size)
+        y = (self.height - size) // 2
+        if self.faces:
+            y = (self.height - size - self.face_size) // 3
+        cv2.rectangle(frame, (x, y), (x + size, y + size), (0, 0, 255), -1)
+        for i, face in enumerate(self.faces):
+            # Each face sways within its own column
+            column = self.width // len(self.faces)
+            room = column - self.face_size
+            fx = i * column + abs(self.count % (2 * room) - room) if room > 0 else i * column
+            fy = self.height - self.face_size - (self.height - self.face_size) // 6
+            frame[fy:fy + self.face_size, fx:fx + self.face_size] = face
+        cv2.putText(frame, str(self.count), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.count += 1
+        return frame
+
+    def release(self):
+        pass
+
+
+def draw_face(size, rng):
+    """
+    A size x size BGR cartoon face: the dark eyes and brows, light nose
+    bridge and dark mouth the Haar cascade keys on, over a random smooth
+    texture so that faces differ.
+    """
+    img = np.full((size, size), 90, np.float32)
+    c = size // 2
+    cv2.ellipse(img, (c, c), (int(size * .36), int(size * .46)), 0, 0, 360, 200, -1)
+    texture = cv2.resize(rng.normal(0, 1, (8, 8)).astype(np.float32), (size, size),
+                         interpolation=cv2.INTER_CUBIC)
+    img += np.where(img > 100, 20 * texture, 0)
+    for side in (-1, 1):
+        ex = c + side * int(size * .16)
+        cv2.ellipse(img, (ex, int(size * .40)), (int(size * .09), int(size * .045)), 0, 0, 360, 40, -1)
+        cv2.ellipse(img, (ex, int(size * .32)), (int(size * .11), int(size * .02)), 0, 0, 360, 60, -1)
+    cv2.ellipse(img, (c, int(size * .58)), (int(size * .05), int(size * .08)), 0, 0, 360, 160, -1)
+    cv2.ellipse(img, (c, int(size * .74)), (int(size * .14), int(size * .035)), 0, 0, 360, 70, -1)
+    gray = cv2.GaussianBlur(np.clip(img, 0, 255).astype(np.uint8), (7, 7), 0)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def open_source(source, width=640, height=480, fps=30):
+    """
+    "synthetic", "faces" (synthetic with SYNTHETIC_FACES faces), a video
+    file path, or a device index ("0").
+    """
+    if source == "synthetic":
+        return SyntheticSource(width, height, fps)
+    if source == "faces":
+        return SyntheticSource(width, height, fps, faces=SYNTHETIC_FACES)
+    if str(source).isdigit():
+        return DeviceSource(int(source), width, height, fps)
+    return FileSource(source)
+
+
+##################################
+# PUBLISHER (camera owner)
+##################################
+class CameraPublisher:
+    """
+    Owns the shared memory block and writes frames into the slot ring.
+    """
+
+    def __init__(self, width, height, channels=3, slots=SLOTS, name=SHM_NAME, fps=0.0):
+        self.width, self.height, self.channels, self.slots = width, height, channels, slots
+        _, _, _, total = _layout(width, height, channels, slots)
+        try:
+            # A previous owner that crashed leaves the block behind
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=total)
+        self.header, self.table, self.frames = _views(self.shm.buf, width, height, channels, slots)
+        self.table["seq"] = 0
+        self.header["width"], self.header["height"] = width, height
+        self.header["channels"], self.header["slots"] = channels, slots
+        self.header["write_seq"] = 0
+        self.header["fps"] = fps
+        self.header["version"] = LAYOUT_VERSION
+        self.header["magic"] = MAGIC
+        self.seq = 0
+
+    def publish(self, frame):
+        if frame.shape[:2] != (self.height, self.width):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        self.seq += 1
+        slot = self.seq % self.slots
+        # Seqlock: readers treat seq 0 as "being written" and re-check after copying
+        self.table["seq"][slot] = 0
+        self.frames[slot] = frame.reshape(self.frames.shape[1:])
+        self.table["timestamp"][slot] = time.monotonic()
+        self.table["seq"][slot] = self.seq
+        self.header["write_seq"] = self.seq
+        self.header["heartbeat"] = time.time()
+
+    def close(self):
+        self.header["magic"] = 0
+        del self.header, self.table, self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+
+def serve(source="0", width=640, height=480, fps=30, slots=SLOTS, name=SHM_NAME):
+    src = open_source(source, width, height, fps)
+    frame = src.read()
+    if frame is None:
+        raise IOError(f"Source {source} produced no frames")
+    height, width = frame.shape[:2]
+    publisher = CameraPublisher(width, height, frame.shape[2] if frame.ndim == 3 else 1,
+                                slots, name, getattr(src, "fps", fps))
+    running = [True]
+
+    def stop(signum, _frame):
+        running[0] = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Camera service publishing {width}x{height} from {source} as '{name}'")
+    try:
+        while running[0]:
+            if frame is not None:
+                publisher.publish(frame)
+            else:
+                time.sleep(0.01)   # device hiccup; keep the heartbeat honest
+            frame = src.read()
+            if frame is None and isinstance(src, FileSource) and not src.loop:
+                break
+    finally:
+        publisher.close()
+        src.release()
+        print("Camera service stopped")
+
+
+##################################
+# SUBSCRIBER (consumers)
+##################################
+class CameraSubscriber:
+    """
+    Reads frames published by the camera service.
+
+    Same read()/isOpened()/release()/stats() interface as camera.ThreadedCamera.
+    read() returns the newest frame not yet seen, throttled to `fps` if given,
+    as a private copy (resized if `size` (width, height) is given) that was
+    checked against the seqlock after copying. With `zero_copy` (and no
+    `size`) it is a read-only view into shared memory instead, which the
+    ring overwrites SLOTS frames later: call still_valid() after using it
+    and discard the result if it returns False.
+    """
+
+    def __init__(self, fps=None, size=None, name=SHM_NAME, zero_copy=False):
+        self.name = name
+        self.zero_copy = zero_copy
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Python < 3.13 would unlink the block when this process exits
+        try:
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        except Exception:
+            pass
+        header = np.ndarray((), HEADER_DTYPE, buffer=self.shm.buf, offset=0)
+        if int(header["magic"]) != MAGIC or int(header["version"]) != LAYOUT_VERSION:
+            self.shm.close()
+            raise FileNotFoundError(f"No camera service published at '{name}'")
+        self.width, self.height = int(header["width"]), int(header["height"])
+        self.channels, self.slots = int(header["channels"]), int(header["slots"])
+        self.header, self.table, self.frames = _views(self.shm.buf, self.width, self.height,
+                                                      self.channels, self.slots)
+        # Frames are shared with every other consumer: hand them out read-only
+        self.frames.flags.writeable = False
+        self.interval = 1.0 / fps if fps else 0.0
+        self.size = tuple(size) if size and tuple(size) != (self.width, self.height) else None
+        self.last_seq = 0
+        self.last_delivery = 0.0
+        self.open = True
+        self.frames_delivered = 0
+        self.frames_skipped = 0
+        self.torn_reads = 0
+        self.last_frame_age = 0.0
+        self.max_frame_age = 0.0
+        self.total_frame_age = 0.0
+
+    def isOpened(self):
+        return self.open and self.alive()
+
+    def alive(self):
+        return int(self.header["magic"]) == MAGIC and time.time() - float(self.header["heartbeat"]) < STALE_AFTER
+
+    def read(self, timeout=READ_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        if self.interval:
+            # Honour this consumer's own rate
+            wait = self.last_delivery + self.interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        while self.open:
+            seq = int(self.header["write_seq"])
+            if seq > self.last_seq:
+                slot = seq % self.slots
+                frame = self.frames[slot]
+                timestamp = float(self.table["timestamp"][slot])
+                if self.size is not None:
+                    frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+                elif not self.zero_copy:
+                    frame = frame.copy()
+                if int(self.table["seq"][slot]) != seq:
+                    # Overwritten under us; the writer is mid-frame, so give it time
+                    self.torn_reads += 1
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                if self.last_seq:
+                    self.frames_skipped += seq - self.last_seq - 1
+                self.last_seq = seq
+                now = time.monotonic()
+                self.last_delivery = now
+                age = now - timestamp
+                self.frames_delivered += 1
+                self.last_frame_age = age
+                self.max_frame_age = max(self.max_frame_age, age)
+                self.total_frame_age += age
+                return True, frame
+            if time.monotonic() >= deadline or not self.alive():
+                return False, None
+            time.sleep(POLL_INTERVAL)
+        return False, None
+
+    def read_seq(self, seq):
+        """
+        A private copy of frame `seq` and its capture time, or (None, None)
+        if the ring has already overwritten it. Lets several processes share
+        out frames by sequence number without sending pixels.
+        """
+        slot = seq % self.slots
+        if int(self.table["seq"][slot]) != seq:
+            return None, None
+        frame = self.frames[slot].copy()
+        timestamp = float(self.table["timestamp"][slot])
+        if int(self.table["seq"][slot]) != seq:
+            self.torn_reads += 1
+            return None, None
+        return frame, timestamp
+
+    def reader(self):
+        """
+        Another subscriber to the same ring with the same size and rate, for
+        a second consumer in this process; each keeps its own position.
+        """
+        return CameraSubscriber(1.0 / self.interval if self.interval else None, self.size, self.name,
+                                self.zero_copy)
+
+    def still_valid(self):
+        """
+        True while the last frame returned by read() has not been overwritten.
+        """
+        slot = self.last_seq % self.slots
+        return int(self.table["seq"][slot]) == self.last_seq
+
+    def stats(self):
+        delivered = self.frames_delivered
+        return {
+            "delivered": delivered,
+            "dropped": self.frames_skipped,
+            "torn_reads": self.torn_reads,
+            "last_frame_age": self.last_frame_age,
+            "max_frame_age": self.max_frame_age,
+            "mean_frame_age": self.total_frame_age / delivered if delivered else 0.0,
+        }
+
+    def release(self):
+        if not self.open:
+            return
+        self.open = False
+        del self.header, self.table, self.frames
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def subscribe(fps=None, size=None, name=SHM_NAME, zero_copy=False):
+    """
+    CameraSubscriber if the service is running, else None.
+    """
+    try:
+        subscriber = CameraSubscriber(fps, size, name, zero_copy)
+    except FileNotFoundError:
+        return None
+    if not subscriber.alive():
+        subscriber.release()
+        return None
+    return subscriber
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Netra shared camera service")
+    parser.add_argument("--source", default=os.environ.get("NETRA_CAMERA_SOURCE", "0"),
+                        help="Device index, video file, or 'synthetic'")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--slots", type=int, default=SLOTS)
+    args = parser.parse_args()
+    serve(args.source, args.width, args.height, args.fps, args.slots)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+"""
+Cache of scene descriptions keyed by a perceptual hash of the frame.
+
+Pressing the image button again in an unchanged scene should not cost a
+Gemini round trip. Each frame gets a 64-bit DCT perceptual hash. A lookup
+returns the stored description of the closest earlier frame if it is within
+`threshold` differing bits and younger than `ttl` seconds. Entries are
+evicted least recently used first, and the cache is saved to a JSON file
+whenever a description is stored so the short-lived describer processes
+share it. A full or read-only disk only costs the file; the in-memory cache
+keeps working.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+CACHE_PATH = "description_cache.json"
+HASH_THRESHOLD = 6        # Max differing bits (of 64) that still count as the same scene
+TTL = 120.0               # Seconds a description stays valid
+MAX_ENTRIES = 64
+
+
+def phash(frame):
+    """
+    64-bit perceptual hash: sign of the low-frequency DCT coefficients of
+    a 32x32 grayscale thumbnail, compared against their median.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])     # the DC term only tracks brightness
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class DescriptionCache:
+    """
+    Perceptual-hash cache of descriptions with TTL and LRU eviction.
+    """
+
+    def __init__(self, path=CACHE_PATH, threshold=HASH_THRESHOLD, ttl=TTL, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()   # hash -> {"text", "created", "latency_ms"}, LRU first
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self.save_failed = False       # Logged once, then saving fails quietly
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable description cache: {str(e)}")
+            return
+        for key, entry in stored:
+            self.entries[int(key, 16)] = entry
+        self._expire(time.time())
+
+    def _save(self):
+        # Called with the lock held
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump([[f"{key:016x}", entry] for key, entry in self.entries.items()], f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            if not self.save_failed:
+                print(f"Description cache not saved, keeping it in memory: {str(e)}")
+                self.save_failed = True
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self.save_failed = False
+
+    def _expire(self, now):
+        for key in [k for k, e in self.entries.items() if now - e["created"] > self.ttl]:
+            del self.entries[key]
+
+    def lookup(self, key, prompt=None):
+        """
+        The cached description for a frame hash `key`, or None.
+        """
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            best, best_distance = None, self.threshold + 1
+            for candidate, entry in self.entries.items():
+                if prompt is not None and entry.get("prompt") != prompt:
+                    continue
+                distance = hamming(key, candidate)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+            if best is None:
+                self.misses += 1
+                return None
+            entry = self.entries[best]
+            self.entries.move_to_end(best)
+            self.hits += 1
+            self.saved_ms += entry.get("latency_ms", 0.0)
+            # LRU order is only kept in memory; a hit does not rewrite the file
+            return entry["text"]
+
+    def store(self, key, text, latency_ms=0.0, prompt=None):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = {"text": text, "created": time.time(),
+                                 "latency_ms": latency_ms, "prompt": prompt}
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._save()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_ms": self.saved_ms,
+        }
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """
+    Shared DescriptionCache for the current process.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DescriptionCache()
+    return _default_cache
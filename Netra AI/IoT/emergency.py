@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+
+"""
+Emergency alert dispatcher with a durable outbox.
+
+trigger() writes the alert to the outbox directory (one JSON file per
+alert, written to a temporary file, fsynced and renamed into place) and
+wakes the sender thread, which POSTs it straight away. Speech and
+anything else the caller does happen in parallel with delivery, never
+before it. Failed sends are retried in the background with jittered
+exponential backoff until the endpoint accepts the alert; alerts still in
+the outbox after a crash or reboot are resent when the dispatcher starts,
+unless older than MAX_REPLAY_AGE. If the outbox cannot be written (SD card
+full or read-only) the alert is still sent, just not durably.
+
+Repeated long presses within DEDUP_WINDOW return the alert already in
+flight instead of raising a new one. Every alert carries its id as an
+Idempotency-Key, and the SOS server (SOS_System/index.js) sends one SMS
+per key, so a retry after a slow answer does not text the contact twice.
+The time from the press to the endpoint's 2xx is recorded per alert.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+import requests
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+OUTBOX_DIR = "emergency_outbox"
+CONNECT_TIMEOUT = 2       # Seconds to establish the connection
+READ_TIMEOUT = 30         # Seconds to wait for the endpoint's answer (a cold start plus the SMS send)
+BACKOFF_BASE = 0.5        # First retry delay (seconds), doubled per attempt
+BACKOFF_MAX = 30.0        # Upper bound on a single retry delay
+DEDUP_WINDOW = 60.0       # Presses this soon after the last alert reuse it
+MAX_REPLAY_AGE = 3600.0   # Outbox alerts older than this (seconds) are dropped at startup, not sent
+
+
+class Alert:
+    """
+    One emergency alert. `pressed_at` is monotonic and only meaningful in the
+    process that raised the alert; `created` is wall-clock and survives restarts.
+    """
+
+    def __init__(self, alert_id=None, created=None, pressed_at=None, attempts=0, payload=None):
+        self.id = alert_id or uuid.uuid4().hex
+        self.created = created if created is not None else time.time()
+        self.pressed_at = pressed_at
+        self.attempts = attempts
+        self.payload = payload or {}
+        self.next_attempt = 0.0           # monotonic
+        self.delivered_at = None
+        self.durable = True               # False if the outbox write failed
+        self.presses = 1
+        self._delivered = threading.Event()
+
+    @property
+    def delivery_ms(self):
+        """
+        Press-to-delivery time, or None while undelivered.
+        """
+        if self.delivered_at is None:
+            return None
+        if self.pressed_at is not None:
+            return (self.delivered_at - self.pressed_at) * 1000
+        # Raised before a restart: only the wall clock spans both
+        return (time.time() - self.created) * 1000
+
+    def wait(self, timeout=None):
+        """
+        Block until the alert is delivered. Returns False on timeout.
+        """
+        return self._delivered.wait(timeout)
+
+    def body(self):
+        return dict(self.payload, id=self.id, created=self.created, attempt=self.attempts)
+
+    def to_json(self):
+        return {"id": self.id, "created": self.created, "attempts": self.attempts, "payload": self.payload}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["id"], data["created"], None, data.get("attempts", 0), data.get("payload"))
+
+    def __repr__(self):
+        return f"Alert({self.id[:8]}, attempts={self.attempts})"
+
+
+class EmergencyDispatcher:
+    """
+    Owns the outbox and the sender thread. `on_delivered(alert)` runs on the
+    sender thread after each delivery; keep it short.
+    """
+
+    def __init__(self, endpoint, outbox_dir=OUTBOX_DIR, dedup_window=DEDUP_WINDOW, on_delivered=None,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_replay_age=MAX_REPLAY_AGE):
+        self.endpoint = endpoint
+        self.outbox_dir = outbox_dir
+        self.dedup_window = dedup_window
+        self.max_replay_age = max_replay_age
+        self.on_delivered = on_delivered
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.cond = threading.Condition()
+        self.pending = {}                 # id -> Alert
+        self.last_alert = None
+        self.running = False
+        self.thread = None
+        self.triggered = 0
+        self.deduplicated = 0
+        self.delivered = 0
+        self.failures = 0
+        self.not_durable = 0
+        self.expired = 0
+        self.latencies = []               # press-to-delivery, ms
+        try:
+            os.makedirs(outbox_dir, exist_ok=True)
+            self._load_outbox()
+        except OSError as e:
+            print(f"Emergency outbox unavailable, alerts will not survive a restart: {str(e)}")
+
+    ##################################
+    # PUBLIC API
+    ##################################
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="emergency-sender", daemon=True)
+        self.thread.start()
+        return self
+
+    def trigger(self, pressed_at=None, **payload):
+        """
+        Raise an alert (or return the one raised within the dedup window).
+        The alert is on disk and the send under way when this returns; if the
+        outbox cannot be written it is sent anyway, with alert.durable False.
+        Returns (alert, new).
+        """
+        pressed_at = pressed_at if pressed_at is not None else time.monotonic()
+        with self.cond:
+            last = self.last_alert
+            if last is not None and last.pressed_at is not None and pressed_at - last.pressed_at < self.dedup_window:
+                last.presses += 1
+                self.deduplicated += 1
+                return last, False
+            alert = Alert(pressed_at=pressed_at, payload=payload)
+            try:
+                self._write(alert)
+            except OSError as e:
+                # Never let a full or read-only SD card stop the alert itself
+                alert.durable = False
+                self.not_durable += 1
+                print(f"Emergency alert {alert.id[:8]} not saved to the outbox, sending anyway: {str(e)}")
+            self.pending[alert.id] = alert
+            self.last_alert = alert
+            self.triggered += 1
+            self.cond.notify()
+        return alert, True
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        return {
+            "triggered": self.triggered,
+            "deduplicated": self.deduplicated,
+            "delivered": self.delivered,
+            "failures": self.failures,
+            "not_durable": self.not_durable,
+            "expired": self.expired,
+            "pending": len(self.pending),
+            "p50_delivery_ms": lat[len(lat) // 2] if lat else 0.0,
+            "max_delivery_ms": lat[-1] if lat else 0.0,
+        }
+
+    def close(self, timeout=1.0):
+        """
+        Stop the sender. Undelivered alerts stay in the outbox for next time.
+        """
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        self.session.close()
+
+    ##################################
+    # OUTBOX
+    ##################################
+    def _path(self, alert):
+        return os.path.join(self.outbox_dir, f"{alert.id}.json")
+
+    def _sync_dir(self):
+        # Make the rename/unlink itself durable, not just the file contents
+        fd = os.open(self.outbox_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _write(self, alert):
+        path = self._path(alert)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(alert.to_json(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._sync_dir()
+
+    def _remove(self, alert):
+        try:
+            os.remove(self._path(alert))
+            self._sync_dir()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Resent (and deduplicated by the server) after a restart at worst
+            print(f"Could not remove delivered alert {alert.id[:8]} from the outbox: {str(e)}")
+
+    def _load_outbox(self):
+        for name in sorted(os.listdir(self.outbox_dir)):
+            path = os.path.join(self.outbox_dir, name)
+            if name.endswith(".tmp"):
+                # Never renamed into place, so never acknowledged to anyone
+                os.remove(path)
+                continue
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(path) as f:
+                    alert = Alert.from_json(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Skipping unreadable outbox entry {name}: {str(e)}")
+                continue
+            age = time.time() - alert.created
+            if age > self.max_replay_age:
+                # An SOS from hours or days ago would only alarm the contact now
+                print(f"Dropping emergency alert {alert.id[:8]} raised {age / 3600:.1f} h ago")
+                self.expired += 1
+                os.remove(path)
+                continue
+            self.pending[alert.id] = alert
+        if self.pending:
+            print(f"Resending {len(self.pending)} undelivered emergency alert(s)")
+
+    ##################################
+    # SENDING
+    ##################################
+    def _backoff(self, attempts):
+        # Full jitter, as in gemini_client
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempts - 1))))
+
+    def _send(self, alert):
+        alert.attempts += 1
+        try:
+            response = self.session.post(self.endpoint, json=alert.body(), timeout=self.timeout,
+                                         headers={"Idempotency-Key": alert.id})
+            if 200 <= response.status_code < 300:
+                return True
+            print(f"Emergency endpoint answered {response.status_code} (attempt {alert.attempts})")
+        except requests.RequestException as e:
+            print(f"Emergency alert not sent (attempt {alert.attempts}): {str(e)}")
+        return False
+
+    def _due(self):
+        # Called with the lock held: the next alert to send, or the wait until one is due
+        now = time.monotonic()
+        soonest = None
+        for alert in self.pending.values():
+            if alert.next_attempt <= now:
+                return alert, 0
+            wait = alert.next_attempt - now
+            soonest = wait if soonest is None else min(soonest, wait)
+        return None, soonest
+
+    def _run(self):
+        while True:
+            with self.cond:
+                alert, wait = self._due()
+                while self.running and alert is None:
+                    self.cond.wait(wait)
+                    alert, wait = self._due()
+                if not self.running:
+                    return
+            try:
+                if self._send(alert):
+                    self._delivered(alert)
+                else:
+                    self.failures += 1
+                    alert.next_attempt = time.monotonic() + self._backoff(alert.attempts)
+            except Exception as e:
+                # The sender thread must outlive any one alert
+                print(f"Error in emergency sender: {str(e)}")
+                if alert.delivered_at is None:
+                    alert.next_attempt = time.monotonic() + self._backoff(alert.attempts)
+
+    def _delivered(self, alert):
+        alert.delivered_at = time.monotonic()
+        self._remove(alert)
+        with self.cond:
+            self.pending.pop(alert.id, None)
+            self.delivered += 1
+            self.latencies.append(alert.delivery_ms)
+            if len(self.latencies) > 500:
+                del self.latencies[0]
+        alert._delivered.set()
+        print(f"Emergency alert {alert.id[:8]} delivered in {alert.delivery_ms:.0f} ms "
+              f"after {alert.attempts} attempt(s)")
+        if self.on_delivered is not None:
+            try:
+                self.on_delivered(alert)
+            except Exception as e:
+                print(f"Error in delivery callback: {str(e)}")
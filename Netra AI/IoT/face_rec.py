@@ -2,36 +2,67 @@
 
 import cv2
 import os
+import signal
 import sys
-import numpy as np
+import threading
 import time
 import speech_recognition as sr
-from gtts import gTTS
+from face_tracker import FaceTracker
+from camera import open_camera
+from speech_queue import AnnouncementScheduler
+import audio_engine
+from tts_cache import get_default_cache
+from face_store import FaceStore, import_directory, normalize_face
+import feature_matcher
+import model_bundle
+import tracing
+from preview_server import PreviewServer
+from netra_client import WorkerTimeout, WorkerUnavailable, send_command
 
 ##################################
 # CONFIGURABLE PARAMETERS
 ##################################
 HAAR_CASCADE_PATH = "haarcascade_frontalface_default.xml"  # Haar cascade for face detection
-DATASET_DIR = "dataset"         # Where face images are stored
-MODEL_PATH = "face_model.xml"   # LBPH model output
+DATASET_DIR = "dataset"         # Legacy per-sample JPEGs, imported into the store once
+STORE_DIR = "face_store"        # Packed face dataset (see face_store.py)
+RECOGNIZER_BACKEND = "lbph"     # "lbph" (cv2.face) or "numpy" (feature_matcher.py)
+MODEL_PATH = "face_model.bundle"        # Weights, labels and metadata (see model_bundle.py)
+LEGACY_MODEL_PATH = "face_model.xml"    # Pre-bundle LBPH model, used with label_map.txt
 NUM_SAMPLES = 20                # How many face images to capture
+# Distance above which a face is "Unknown" (the backends use different scales)
+UNKNOWN_CONFIDENCE = {"lbph": 80, "numpy": feature_matcher.UNKNOWN_CONFIDENCE}
+PREDICT_REFRESH_FRAMES = 15     # Re-run recognition on a tracked face every N frames
+ANNOUNCE_COOLDOWN = 10.0        # Seconds before the same name is spoken again
+DETECT_SCALE = 0.5              # Detection runs on a frame downscaled by this factor
+FULL_SCAN_INTERVAL = 10         # Rescan the whole frame every N frames
+ROI_MARGIN = 0.5                # Search margin around last seen faces (fraction of box size)
+HEADLESS = not os.environ.get("DISPLAY")  # No drawing or windows without an X server (--headless / --gui)
+PREVIEW_PORT = 8090             # --preview serves an annotated MJPEG stream on localhost here
+PREVIEW_FPS = 2                 # Preview frame rate cap
 
 ##################################
 # GOOGLE TTS (Text-to-Speech)
 ##################################
 def speak_google(text):
     """
-    Use Google TTS to speak 'text' (requires internet).
-    We'll use 'mpg123' for playback to keep it simple on Raspberry Pi.
+    Use Google TTS to speak 'text' (internet needed only for uncached text).
+    Playback goes through the resident audio engine (see audio_engine.py).
     """
-    if not text:
-        return
-    tts = gTTS(text, lang='en')
-    filename = "temp_tts.mp3"
-    tts.save(filename)
-    # Use mpg123 to play
-    os.system(f"mpg123 -q {filename}")
-    os.remove(filename)
+    audio_engine.speak(text)
+
+def start_speaking(text):
+    """
+    Queue 'text' on the audio engine and return its Playback without waiting,
+    so the announcement scheduler can time and cut off its own clip.
+    """
+    return audio_engine.speak(text, wait=False)
+
+def stop_speaking(playback):
+    """
+    Interrupt one announcement started by start_speaking(); anything else
+    the process is playing (a Gemini description, say) carries on.
+    """
+    audio_engine.get_engine().cancel(playback)
 
 ##################################
 # GOOGLE STT (Speech-to-Text)
@@ -70,99 +101,270 @@ def record_name_from_mic_google():
 ##################################
 # FACE DETECTION
 ##################################
+class FaceDetector:
+    """
+    Long-lived Haar face detector.
+    The cascade is loaded once. Detection runs on a downscaled copy of the
+    frame and, between periodic full-frame rescans, only searches the regions
+    around the faces found in the previous frame. Boxes are returned in
+    full-resolution (x, y, w, h) coordinates.
+    """
+
+    def __init__(self, cascade_path=HAAR_CASCADE_PATH, scale=DETECT_SCALE,
+                 full_scan_interval=FULL_SCAN_INTERVAL, roi_margin=ROI_MARGIN,
+                 scale_factor=1.3, min_neighbors=5):
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise IOError(f"Could not load Haar cascade from {cascade_path}")
+        self.scale = scale
+        self.full_scan_interval = max(1, full_scan_interval)
+        self.roi_margin = roi_margin
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.last_faces = []
+        self.frames_since_full_scan = 0
+
+    def reset(self):
+        """
+        Forget previous faces so the next call does a full-frame scan.
+        """
+        self.last_faces = []
+        self.frames_since_full_scan = 0
+
+    def _detect_small(self, small_img):
+        faces = self.cascade.detectMultiScale(small_img, scaleFactor=self.scale_factor,
+                                              minNeighbors=self.min_neighbors)
+        return [tuple(int(v) for v in f) for f in faces]
+
+    def _detect_regions(self, small_img):
+        """
+        Search only around the last known faces (in downscaled coordinates).
+        """
+        img_h, img_w = small_img.shape[:2]
+        found = []
+        for (x, y, w, h) in self.last_faces:
+            # Last faces are stored in full-res coordinates
+            sx, sy = x * self.scale, y * self.scale
+            sw, sh = w * self.scale, h * self.scale
+            mx, my = sw * self.roi_margin, sh * self.roi_margin
+            x0 = max(0, int(sx - mx))
+            y0 = max(0, int(sy - my))
+            x1 = min(img_w, int(sx + sw + mx))
+            y1 = min(img_h, int(sy + sh + my))
+            if x1 - x0 < 24 or y1 - y0 < 24:  # smaller than the cascade window
+                continue
+            for (fx, fy, fw, fh) in self._detect_small(small_img[y0:y1, x0:x1]):
+                found.append((fx + x0, fy + y0, fw, fh))
+        return _suppress_overlaps(found)
+
+    def detect(self, gray_img):
+        """
+        Detect faces in a full-resolution grayscale frame.
+        Returns a list of (x, y, w, h) tuples in full-resolution coordinates.
+        """
+        if self.scale != 1.0:
+            small = cv2.resize(gray_img, None, fx=self.scale, fy=self.scale,
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = gray_img
+
+        faces = []
+        full_scan_due = self.frames_since_full_scan >= self.full_scan_interval
+        if self.last_faces and not full_scan_due:
+            faces = self._detect_regions(small)
+            self.frames_since_full_scan += 1
+
+        # No previous faces, rescan due, or the tracked faces were lost
+        if not faces:
+            faces = self._detect_small(small)
+            self.frames_since_full_scan = 0
+
+        inv = 1.0 / self.scale
+        self.last_faces = [(int(round(x * inv)), int(round(y * inv)),
+                            int(round(w * inv)), int(round(h * inv)))
+                           for (x, y, w, h) in faces]
+        return self.last_faces
+
+
+def _suppress_overlaps(boxes, max_overlap=0.3):
+    """
+    Drop boxes that mostly overlap a larger one (duplicates from adjacent regions).
+    """
+    kept = []
+    for box in sorted(boxes, key=lambda b: b[2] * b[3], reverse=True):
+        if all(_overlap_ratio(box, k) <= max_overlap for k in kept):
+            kept.append(box)
+    return kept
+
+
+def _overlap_ratio(a, b):
+    """
+    Intersection area divided by the area of the smaller box.
+    """
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    smaller = min(a[2] * a[3], b[2] * b[3])
+    return (ix * iy) / smaller if smaller else 0.0
+
+
+_default_detector = None
+
 def detect_faces(gray_img):
-    face_cascade = cv2.CascadeClassifier(HAAR_CASCADE_PATH)
-    faces = face_cascade.detectMultiScale(gray_img, scaleFactor=1.3, minNeighbors=5)
-    return faces
+    """
+    Detect faces with a shared, lazily created FaceDetector.
+    """
+    global _default_detector
+    if _default_detector is None:
+        _default_detector = FaceDetector()
+    return _default_detector.detect(gray_img)
+
+##################################
+# RECOGNIZER BACKEND
+##################################
+def create_recognizer():
+    """
+    New, untrained recognizer for RECOGNIZER_BACKEND. Both backends share
+    the train/update/predict/read/write interface.
+    """
+    return model_bundle.create_recognizer(RECOGNIZER_BACKEND)
+
+def load_model():
+    """
+    Load the model bundle, falling back to a legacy face_model.xml plus
+    label_map.txt. Returns a model_bundle.ModelBundle or None.
+    """
+    bundle = model_bundle.load_bundle(MODEL_PATH)
+    if bundle is None and os.path.exists(LEGACY_MODEL_PATH):
+        recognizer = model_bundle.create_recognizer("lbph")
+        recognizer.read(LEGACY_MODEL_PATH)
+        bundle = model_bundle.ModelBundle(recognizer, load_label_map(), "lbph", 0, {})
+    return bundle
 
 ##################################
 # CAPTURE SAMPLES
 ##################################
-def capture_samples(person_name, num_samples=NUM_SAMPLES):
+def capture_samples(person_name, num_samples=NUM_SAMPLES, camera=None, headless=HEADLESS, stop_event=None):
     """
-    Capture face samples from the camera and store them in dataset/<person_name>.
-    Each face is cropped to grayscale and saved as .jpg.
+    Capture face samples from the camera and append them to the packed
+    face store (STORE_DIR). Each face is cropped to grayscale and
+    normalized to the store's fixed size.
+    An already open `camera` (e.g. from the Netra worker) is used as is.
+    `headless` skips the preview window; set `stop_event` to stop early.
     """
-    person_folder = os.path.join(DATASET_DIR, person_name)
-    os.makedirs(person_folder, exist_ok=True)
+    store = FaceStore(STORE_DIR)
 
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
+    cap = camera or open_camera()
+    if cap is None:
         print("Could not open camera.")
         return
 
+    detector = FaceDetector()
     count = 0
-    while count < num_samples:
+    started = time.monotonic()
+    while count < num_samples and (stop_event is None or not stop_event.is_set()):
         ret, frame = cap.read()
         if not ret:
             continue
 
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = detect_faces(gray)
+        faces = detector.detect(gray)
         for (x, y, w, h) in faces:
             roi_gray = gray[y:y+h, x:x+w]
-            save_path = os.path.join(person_folder, f"{person_name}_{count}.jpg")
-            cv2.imwrite(save_path, roi_gray)
+            store.append(roi_gray, person_name)
             count += 1
             print(f"Captured {count}/{num_samples} face samples for {person_name}")
             time.sleep(0.2)
             if count >= num_samples:
                 break
 
-        cv2.imshow("Capture Samples", frame)
-        if cv2.waitKey(1) & 0xFF == 27:  # ESC
-            break
+        if not headless:
+            cv2.imshow("Capture Samples", frame)
+            if cv2.waitKey(1) & 0xFF == 27:  # ESC
+                break
 
-    cap.release()
-    cv2.destroyAllWindows()
+    if camera is None:
+        cap.release()
+    if not headless:
+        cv2.destroyAllWindows()
+    tracing.record_span("capture_samples", started, samples=count)
     print(f"Done capturing {num_samples} samples for {person_name}.")
 
 ##################################
 # TRAIN LBPH MODEL
 ##################################
-def train_model():
+def _open_store(known_labels):
     """
-    Train an LBPH face recognizer on images in dataset/<person_name>.
-    Saves the model to MODEL_PATH and label_map.txt
+    Open the packed face store, importing a legacy dataset/ of JPEGs
+    the first time so existing enrollments carry over.
     """
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    faces = []
-    labels = []
-    label_map = {}
-    current_label = 0
-
-    for person_name in os.listdir(DATASET_DIR):
-        person_folder = os.path.join(DATASET_DIR, person_name)
-        if not os.path.isdir(person_folder):
-            continue
-        label_map[person_name] = current_label
-        for filename in os.listdir(person_folder):
-            if filename.endswith(".jpg"):
-                path = os.path.join(person_folder, filename)
-                img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
-                if img is not None:
-                    faces.append(img)
-                    labels.append(current_label)
-        current_label += 1
-
-    if len(faces) < 2:
-        print("Not enough images to train. Please capture more samples for at least 2 people.")
-        return
+    store = FaceStore(STORE_DIR)
+    if len(store) == 0 and os.path.isdir(DATASET_DIR):
+        imported = import_directory(DATASET_DIR, store, known_labels)
+        if imported:
+            print(f"Imported {imported} samples from {DATASET_DIR} into {STORE_DIR}")
+    return store
+
+def _known_labels():
+    """
+    {name: label_id} of the current model (bundle or legacy label_map.txt).
+    """
+    labels = model_bundle.read_labels(MODEL_PATH) or load_label_map()
+    return {name: lid for lid, name in labels.items()}
 
-    recognizer.train(faces, np.array(labels))
-    recognizer.write(MODEL_PATH)
-    print("LBPH model trained and saved to", MODEL_PATH)
+def train_model(full=False):
+    """
+    Train the face recognizer (LBPH by default) on the packed face store.
+    Saves weights, labels and metadata as one model bundle at MODEL_PATH.
+
+    By default training is incremental: the store is append-only, so the
+    samples past the count recorded in the bundle metadata are the new ones
+    and are added with update(). A full rebuild happens when full=True, when
+    there is no previous bundle for this backend, or when the store no
+    longer matches it. Label IDs come from the store and stay stable.
+    """
+    store = _open_store(_known_labels())
+    count = len(store)
+    manifest = model_bundle.read_manifest(MODEL_PATH)
+    trained = None
+    if manifest and manifest["backend"] == RECOGNIZER_BACKEND:
+        trained = manifest["metadata"].get("trained_samples")
+    if trained is None or trained > count:
+        full = True
+
+    if full:
+        recognizer = create_recognizer()
+        # One bulk read of the whole store
+        faces, labels = store.load()
+        if len(faces) < 2:
+            print("Not enough images to train. Please capture more samples for at least 2 people.")
+            return
+        with tracing.span("train", samples=len(faces), full=True):
+            recognizer.train(list(faces), labels)
+        print(f"{RECOGNIZER_BACKEND} model trained on {len(faces)} samples")
+    else:
+        if trained == count:
+            print("Model is up to date; no new samples to train.")
+            return
+        faces, labels = store.load(start=trained)
+        recognizer = model_bundle.load_bundle(MODEL_PATH).recognizer
+        with tracing.span("train", samples=len(faces), full=False):
+            recognizer.update(list(faces), labels)
+        print(f"{RECOGNIZER_BACKEND} model updated with {len(faces)} new samples")
+
+    label_map = store.label_map()
+    version = model_bundle.save_bundle(recognizer, RECOGNIZER_BACKEND, label_map,
+                                       {"trained_samples": count}, MODEL_PATH)
+    print(f"{RECOGNIZER_BACKEND} model version {version} saved to", MODEL_PATH)
     print("Label map:", label_map)
 
-    # Save label map
-    with open("label_map.txt", "w") as f:
-        for pname, lid in label_map.items():
-            f.write(f"{lid}:{pname}\n")
-
 ##################################
 # LOAD LABEL MAP
 ##################################
 def load_label_map():
+    """
+    Read the legacy label_map.txt ("<id>:<name>" per line). Newer models
+    keep their labels inside the model bundle.
+    """
     label_map = {}
     if not os.path.exists("label_map.txt"):
         return label_map
@@ -170,87 +372,242 @@ def load_label_map():
         for line in f:
             line = line.strip()
             if line:
-                parts = line.split(":")
-                label_id = int(parts[0])
-                name = parts[1]
-                label_map[label_id] = name
+                # Split once so names may contain ':'
+                label_id, name = line.split(":", 1)
+                label_map[int(label_id)] = name
     return label_map
 
 ##################################
 # RECOGNIZE LOOP
 ##################################
-def recognize_loop():
+class RecognitionPipeline:
+    """
+    Per-frame recognition without camera, GUI or speech: detect faces,
+    track them, and score the tracks that are due (new, or every
+    PREDICT_REFRESH_FRAMES). Used by recognize_loop and by the offline
+    benchmarks, which feed it recorded or synthetic frames.
+    """
+
+    def __init__(self, model, detector=None):
+        self.detector = detector or FaceDetector()
+        # Faces are tracked across frames so the recognizer only runs on new
+        # tracks and every PREDICT_REFRESH_FRAMES; the tracker fuses the results by vote.
+        self.tracker = FaceTracker(refresh_interval=PREDICT_REFRESH_FRAMES,
+                                   unknown_threshold=UNKNOWN_CONFIDENCE[model.backend])
+        self.set_model(model)
+        self.frames = 0
+        self.predictions = 0
+        self.detect_time = 0.0
+        self.predict_time = 0.0
+
+    def set_model(self, model):
+        """
+        Swap in a new ModelBundle between frames; tracks re-predict with it.
+        """
+        self.recognizer, self.label_map = model.recognizer, model.labels
+        self.tracker.unknown_threshold = UNKNOWN_CONFIDENCE[model.backend]
+        self.tracker.reset_predictions()
+
+    def process_frame(self, frame):
+        """
+        Recognize the faces in one BGR frame. Returns a list of
+        (box, name, confidence, known) per tracked face; `name` is the
+        best label even when the fused distance is too high to be `known`.
+        """
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = self.detector.detect(gray)
+        tracks = self.tracker.update(faces)
+        detected = time.perf_counter()
+
+        # All faces due for recognition are scored together (one batch on
+        # the numpy backend)
+        pending = [t for t in tracks if self.tracker.needs_prediction(t)]
+        if pending:
+            rois = [normalize_face(gray[y:y+h, x:x+w]) for (x, y, w, h) in (t.box for t in pending)]
+            for track, (label_id, confidence) in zip(pending, feature_matcher.predict_faces(self.recognizer, rois)):
+                self.tracker.add_prediction(track, label_id, confidence)
+
+        self.frames += 1
+        self.predictions += len(pending)
+        self.detect_time += detected - start
+        self.predict_time += time.perf_counter() - detected
+        return [(track.box, self.label_map.get(track.label_id, "Unknown"), track.confidence, track.known)
+                for track in tracks]
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "predictions": self.predictions,
+            "detect_ms_per_frame": self.detect_time * 1000 / self.frames if self.frames else 0.0,
+            "predict_ms_per_face": self.predict_time * 1000 / self.predictions if self.predictions else 0.0,
+        }
+
+
+def draw_results(frame, results):
+    """
+    Draw boxes and "name (confidence)" labels onto `frame` in place.
+    """
+    for (x, y, w, h), name, confidence, _ in results:
+        cv2.rectangle(frame, (x, y), (x+w, y+h), (0,255,0), 2)
+        text = f"{name} ({confidence:.2f})"
+        cv2.putText(frame, text, (x, y-10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,255,0), 2)
+
+
+def recognize_loop(camera=None, stop_event=None, headless=HEADLESS, preview=None):
     """
     Real-time recognition using LBPH. Speaks recognized name via Google TTS.
-    Press ESC to quit.
+    Press ESC to quit, or set `stop_event` (a threading.Event) from another
+    thread. An already open `camera` is used as is and left open.
+    `headless` skips all drawing and windows; annotated frames then only go
+    to `preview` (a PreviewServer), and only while someone is watching it.
     """
-    if not os.path.exists(MODEL_PATH):
+    with tracing.span("model_load"):
+        model = load_model()
+    if model is None:
         print("No trained model found. Please run 'train' first.")
         return
 
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.read(MODEL_PATH)
-    label_map = load_label_map()
+    # New bundles written by 'train' are loaded in the background and swapped in
+    watcher = model_bundle.BundleWatcher(MODEL_PATH, model.version).start()
+    # Enrolled names are synthesized ahead of time so announcements play instantly
+    get_default_cache().prewarm_async(list(model.labels.values()) + ["Unknown"])
 
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
+    cap = camera or open_camera()
+    if cap is None:
         print("Could not open camera.")
+        watcher.stop()
         return
 
-    speak_google("Recognition started. Press escape to stop.")
+    pipeline = RecognitionPipeline(model)
+    # Speech runs on its own worker so the video loop never waits for gTTS
+    announcer = AnnouncementScheduler(start_speaking, stop_speaking,
+                                      cooldown=ANNOUNCE_COOLDOWN).start()
+    announcer.announce("Recognition started." if headless else "Recognition started. Press escape to stop.",
+                       urgent=True)
 
-    while True:
+    first_frame = True
+    started = time.monotonic()
+    while stop_event is None or not stop_event.is_set():
         ret, frame = cap.read()
         if not ret:
             continue
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = detect_faces(gray)
-        for (x, y, w, h) in faces:
-            roi_gray = gray[y:y+h, x:x+w]
-            label_id, confidence = recognizer.predict(roi_gray)
-            name = label_map.get(label_id, "Unknown")
-
-            # Draw bounding box
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (0,255,0), 2)
-            text = f"{name} ({confidence:.2f})"
-            cv2.putText(frame, text, (x, y-10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,255,0), 2)
-
-            # If confidence is too high => "Unknown"
-            if confidence > 80:
-                name = "Unknown"
-
-            # Speak recognized name
-            speak_google(name)
+        new_model = watcher.poll()
+        if new_model is not None:
+            pipeline.set_model(new_model)
+            get_default_cache().prewarm_async(list(new_model.labels.values()))
+            print(f"Switched to model version {new_model.version}")
+
+        results = pipeline.process_frame(frame)
+        if first_frame:
+            tracing.mark("first_recognition_frame", faces=len(results))
+            first_frame = False
+
+        for _, name, _, known in results:
+            # Fused distance too high (with hysteresis) => "Unknown";
+            # announcements are coalesced, with a per-name cooldown
+            name = name if known else "Unknown"
+            announcer.announce(name, key=name)
+
+        if headless:
+            if preview is not None and preview.due():
+                annotated = frame.copy()
+                draw_results(annotated, results)
+                preview.publish(annotated)
+            continue
 
+        if not frame.flags.writeable:
+            frame = frame.copy()   # shared camera frames are read-only; draw on a copy
+        draw_results(frame, results)
+        if preview is not None and preview.due():
+            preview.publish(frame.copy())
         cv2.imshow("Recognizing...", frame)
         if cv2.waitKey(1) & 0xFF == 27:  # ESC to exit
             break
 
-    cap.release()
-    cv2.destroyAllWindows()
+    elapsed = time.monotonic() - started
+    stats = pipeline.stats()
+    stats["fps"] = stats["frames"] / elapsed if elapsed > 0 else 0.0
+    stats["mode"] = "headless" if headless else "gui"
+    print("Camera stats:", cap.stats())
+    print("Recognition stats:", stats)
+    if preview is not None:
+        print("Preview stats:", preview.stats())
+    print("Announcer stats:", announcer.stats())
+    announcer.stop()
+    watcher.stop()
+    if camera is None:
+        cap.release()
+    if not headless:
+        cv2.destroyAllWindows()
     speak_google("Recognition stopped.")
 
 ##################################
 # COMMAND LINE INTERFACE
 ##################################
+def stop_on_signals():
+    """
+    An Event set by SIGTERM or SIGINT, so loops stop cleanly (camera
+    released, "Recognition stopped." spoken) when final.py terminates them.
+    """
+    stop_event = threading.Event()
+    def handler(signum, frame):
+        stop_event.set()
+    signal.signal(signal.SIGTERM, handler)
+    signal.signal(signal.SIGINT, handler)
+    return stop_event
+
 def print_help():
     print("""
 Usage: python face_rec.py [command]
 
 Commands:
   capture  - Use Google STT to get person's name, then capture face images
-  train    - Train LBPH model on the dataset
+  train    - Train LBPH model on new samples in the dataset (incremental)
+             add --full to rebuild the model from scratch
+  import   - Import a legacy dataset/<name>/*.jpg tree into the packed store
   recognize- Real-time recognition with Google TTS
+
+capture and train run in the Netra worker (netra_worker.py) when it is
+running; add --local to run them in this process.
+
+Options for capture and recognize:
+  --headless      no drawing or windows (default when DISPLAY is unset)
+  --gui           force the preview windows
+  --preview [N]   serve an annotated MJPEG stream on http://127.0.0.1:N/
+                  (recognize only; default port 8090)
+  --workers N     recognize on N processes fed from the shared camera ring
+                  (see parallel_recognition.py; default 1, this process)
 """)
 
 if __name__ == "__main__":
+    # Started by final.py: time from its Popen to here (interpreter + imports)
+    tracing.record_spawn()
     if len(sys.argv) < 2:
         print_help()
         sys.exit(0)
 
     command = sys.argv[1].lower()
+    local = "--local" in sys.argv[2:]
+    headless = ("--headless" in sys.argv[2:] or HEADLESS) and "--gui" not in sys.argv[2:]
+
+    # capture and train are handed to the resident worker when it is running
+    # (camera, model and audio already warm); --local forces in-process work.
+    if command in ("capture", "train") and not local:
+        try:
+            args = {"full": "--full" in sys.argv[2:]} if command == "train" else {}
+            response = send_command(command, **args)
+            print(f"{command} done by Netra worker in {response['latency_ms']:.0f} ms:",
+                  response.get("result"))
+            sys.exit(0)
+        except WorkerTimeout as e:
+            # Still running in the worker, which holds the camera
+            print(e)
+            sys.exit(1)
+        except WorkerUnavailable:
+            pass
 
     if command == "capture":
         # 1) Use Google STT to get name
@@ -260,13 +617,37 @@ if __name__ == "__main__":
             sys.exit(0)
 
         # 2) Capture images
-        capture_samples(recognized_name, num_samples=NUM_SAMPLES)
+        capture_samples(recognized_name, num_samples=NUM_SAMPLES, headless=headless,
+                        stop_event=stop_on_signals())
 
     elif command == "train":
-        train_model()
+        train_model(full="--full" in sys.argv[2:])
+
+    elif command == "import":
+        dataset_dir = sys.argv[2] if len(sys.argv) > 2 else DATASET_DIR
+        imported = import_directory(dataset_dir, FaceStore(STORE_DIR), _known_labels())
+        print(f"Imported {imported} samples into {STORE_DIR}")
 
     elif command == "recognize":
-        recognize_loop()
+        preview = None
+        if "--preview" in sys.argv[2:]:
+            port_arg = sys.argv[sys.argv.index("--preview") + 1:][:1]
+            port = int(port_arg[0]) if port_arg and port_arg[0].isdigit() else PREVIEW_PORT
+            preview = PreviewServer(port=port, max_fps=PREVIEW_FPS).start()
+            print("Preview at", preview.url)
+        workers_arg = sys.argv[sys.argv.index("--workers") + 1:][:1] if "--workers" in sys.argv[2:] else []
+        workers = int(workers_arg[0]) if workers_arg and workers_arg[0].isdigit() else 1
+        try:
+            if workers > 1:
+                # Imported here: parallel_recognition builds on this module
+                import parallel_recognition
+                parallel_recognition.recognize_parallel(workers, stop_event=stop_on_signals(),
+                                                        headless=headless, preview=preview)
+            else:
+                recognize_loop(stop_event=stop_on_signals(), headless=headless, preview=preview)
+        finally:
+            if preview is not None:
+                preview.close()
 
     else:
         print_help()
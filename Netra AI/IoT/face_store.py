@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+"""
+Packed face dataset.
+
+All samples are fixed-size grayscale crops stored back to back in one raw
+uint8 file, with a parallel int32 label file and a small JSON header holding
+the crop size and the name -> label table. Capture appends to the files,
+training loads everything with one bulk read (or memory-maps it), and
+import_directory() converts the old dataset/<name>/<name>_<i>.jpg layout.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+STORE_DIR = "face_store"     # Directory holding the packed dataset
+FACE_SIZE = (100, 100)       # (width, height) every crop is normalized to
+
+META_FILE = "meta.json"
+FACES_FILE = "faces.u8"
+LABELS_FILE = "labels.i32"
+
+
+def normalize_face(gray_roi, size=FACE_SIZE):
+    """
+    Resize a grayscale face crop to the fixed store size.
+    """
+    if gray_roi.ndim == 3:
+        gray_roi = cv2.cvtColor(gray_roi, cv2.COLOR_BGR2GRAY)
+    if (gray_roi.shape[1], gray_roi.shape[0]) == tuple(size):
+        return np.ascontiguousarray(gray_roi, dtype=np.uint8)
+    return cv2.resize(gray_roi, tuple(size), interpolation=cv2.INTER_AREA)
+
+
+class FaceStore:
+    """
+    Append-only store of normalized face crops and their labels.
+    """
+
+    def __init__(self, store_dir=STORE_DIR, size=FACE_SIZE):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+        self.meta_path = os.path.join(store_dir, META_FILE)
+        self.faces_path = os.path.join(store_dir, FACES_FILE)
+        self.labels_path = os.path.join(store_dir, LABELS_FILE)
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r") as f:
+                meta = json.load(f)
+            self.size = (meta["width"], meta["height"])
+            self.names = meta["names"]
+            self.imported = set(meta.get("imported", []))
+        else:
+            self.size = tuple(size)
+            self.names = {}
+            self.imported = set()   # Content hashes of imported JPEGs
+            self._save_meta()
+
+    @property
+    def sample_bytes(self):
+        return self.size[0] * self.size[1]
+
+    def _save_meta(self):
+        meta = {"version": 1, "width": self.size[0], "height": self.size[1],
+                "names": self.names, "imported": sorted(self.imported)}
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=1)
+        os.replace(tmp_path, self.meta_path)
+
+    def __len__(self):
+        # A crash mid-append can leave one file longer; only count complete samples
+        faces = os.path.getsize(self.faces_path) if os.path.exists(self.faces_path) else 0
+        labels = os.path.getsize(self.labels_path) if os.path.exists(self.labels_path) else 0
+        return min(faces // self.sample_bytes, labels // 4)
+
+    def label_for(self, name, preferred=None):
+        """
+        Stable label for `name`, assigning the next free one (or `preferred`) if new.
+        """
+        if name not in self.names:
+            used = set(self.names.values())
+            if preferred is None or preferred in used:
+                preferred = max(used, default=-1) + 1
+            self.names[name] = int(preferred)
+            self._save_meta()
+        return self.names[name]
+
+    def label_map(self):
+        """
+        {label_id: name}, the same shape load_label_map() returns.
+        """
+        return {lid: name for name, lid in self.names.items()}
+
+    def append(self, crops, name):
+        """
+        Append one crop or a list of crops for `name`. Returns the new sample count.
+        """
+        if isinstance(crops, np.ndarray) and crops.ndim == 2:
+            crops = [crops]
+        label = self.label_for(name)
+        count = len(self)
+        data = b"".join(normalize_face(c, self.size).tobytes() for c in crops)
+        labels = np.full(len(crops), label, dtype=np.int32).tobytes()
+        with open(self.faces_path, "ab") as f:
+            # Drop a torn trailing sample before appending
+            f.truncate(count * self.sample_bytes)
+            f.write(data)
+        with open(self.labels_path, "ab") as f:
+            f.truncate(count * 4)
+            f.write(labels)
+        return count + len(crops)
+
+    def load(self, start=0):
+        """
+        Read samples [start:] with one bulk read.
+        Returns (faces as an N x H x W uint8 array, labels as an int32 array).
+        """
+        count = len(self)
+        n = max(0, count - start)
+        width, height = self.size
+        if n == 0:
+            return np.empty((0, height, width), np.uint8), np.empty(0, np.int32)
+        faces = np.fromfile(self.faces_path, dtype=np.uint8, count=n * self.sample_bytes,
+                            offset=start * self.sample_bytes).reshape(n, height, width)
+        labels = np.fromfile(self.labels_path, dtype=np.int32, count=n, offset=start * 4)
+        return faces, labels
+
+    def open_memmap(self):
+        """
+        Memory-map the whole store read-only. Returns (faces, labels).
+        """
+        count = len(self)
+        width, height = self.size
+        if count == 0:
+            return np.empty((0, height, width), np.uint8), np.empty(0, np.int32)
+        faces = np.memmap(self.faces_path, dtype=np.uint8, mode="r", shape=(count, height, width))
+        labels = np.memmap(self.labels_path, dtype=np.int32, mode="r", shape=(count,))
+        return faces, labels
+
+
+def import_directory(dataset_dir, store, label_map=None):
+    """
+    Import dataset/<person_name>/*.jpg into `store`.
+    `label_map` ({name: label}) keeps label IDs from an existing model.
+    Files already imported (same name and content) are skipped, so running
+    it again only adds new samples. Returns the number of samples imported.
+    """
+    label_map = label_map or {}
+    imported = 0
+    for person_name in sorted(os.listdir(dataset_dir)):
+        person_folder = os.path.join(dataset_dir, person_name)
+        if not os.path.isdir(person_folder):
+            continue
+        crops, hashes = [], []
+        for filename in sorted(os.listdir(person_folder)):
+            if filename.endswith(".jpg"):
+                with open(os.path.join(person_folder, filename), "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha1(person_name.encode("utf-8") + b"\0" + data).hexdigest()
+                if digest in store.imported:
+                    continue
+                img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+                if img is not None:
+                    crops.append(img)
+                    hashes.append(digest)
+        if crops:
+            store.label_for(person_name, label_map.get(person_name))
+            store.append(crops, person_name)
+            # Recorded after the samples are written: a crash in between re-imports, never loses
+            store.imported.update(hashes)
+            store._save_meta()
+            imported += len(crops)
+    return imported
+
+
+if __name__ == "__main__":
+    # python face_store.py [dataset_dir]  -> import a JPEG dataset and print a summary
+    face_store = FaceStore()
+    if len(sys.argv) > 1:
+        print("Imported", import_directory(sys.argv[1], face_store), "samples")
+    print(f"{len(face_store)} samples of {face_store.size[0]}x{face_store.size[1]}:",
+          face_store.label_map())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+"""
+Lightweight face tracking between detection and recognition.
+
+Detected boxes are associated across frames by overlap (IoU) into tracks.
+Each track only asks for an LBPH prediction when it is new, while it is still
+collecting its first few votes, or every `refresh_interval` frames. The
+per-track predictions are fused with a temporal vote, and a hysteresis band
+around the "Unknown" threshold stops the identity from flickering.
+"""
+
+from collections import deque
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+IOU_THRESHOLD = 0.3        # Minimum overlap to continue a track
+MAX_MISSES = 5             # Frames a track survives without a matching box
+REFRESH_INTERVAL = 15      # Re-run prediction on a track every N frames
+MIN_VOTES = 3              # Predictions collected before relying on the refresh interval
+VOTE_WINDOW = 7            # Number of recent predictions in the vote
+UNKNOWN_THRESHOLD = 80     # LBPH distance above which a face counts as "Unknown"
+HYSTERESIS = 10            # Extra distance needed before a known face drops to "Unknown"
+
+
+def iou(a, b):
+    """
+    Intersection over union of two (x, y, w, h) boxes.
+    """
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+class Track:
+    """
+    One face followed across frames, with its recent recognition votes.
+    """
+
+    def __init__(self, track_id, box, frame_index, vote_window=VOTE_WINDOW):
+        self.track_id = track_id
+        self.box = tuple(box)
+        self.last_seen = frame_index
+        self.misses = 0
+        self.last_predicted = None
+        self.votes = deque(maxlen=vote_window)
+        self.label_id = -1
+        self.confidence = float("inf")
+        self.known = False
+
+    def __repr__(self):
+        return f"Track({self.track_id}, label={self.label_id}, conf={self.confidence:.1f}, known={self.known})"
+
+
+class FaceTracker:
+    """
+    Associates detections into tracks and fuses per-track predictions.
+
+    Typical use per frame:
+        for track in tracker.update(faces):
+            if tracker.needs_prediction(track):
+                tracker.add_prediction(track, *recognizer.predict(roi))
+            label_id, confidence, known = track.label_id, track.confidence, track.known
+    """
+
+    def __init__(self, iou_threshold=IOU_THRESHOLD, max_misses=MAX_MISSES,
+                 refresh_interval=REFRESH_INTERVAL, min_votes=MIN_VOTES,
+                 vote_window=VOTE_WINDOW, unknown_threshold=UNKNOWN_THRESHOLD,
+                 hysteresis=HYSTERESIS):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.refresh_interval = refresh_interval
+        self.min_votes = min_votes
+        self.vote_window = vote_window
+        self.unknown_threshold = unknown_threshold
+        self.hysteresis = hysteresis
+        self.tracks = []
+        self.frame_index = 0
+        self.next_id = 0
+        self.predictions = 0
+
+    def update(self, boxes):
+        """
+        Associate this frame's boxes with existing tracks (greedy by IoU).
+        Returns the tracks seen in this frame, in the same order as `boxes`.
+        """
+        self.frame_index += 1
+        boxes = [tuple(int(v) for v in b) for b in boxes]
+
+        pairs = []
+        for bi, box in enumerate(boxes):
+            for ti, track in enumerate(self.tracks):
+                overlap = iou(box, track.box)
+                if overlap >= self.iou_threshold:
+                    pairs.append((overlap, bi, ti))
+        pairs.sort(reverse=True)
+
+        matched = [None] * len(boxes)
+        used_tracks = set()
+        for _, bi, ti in pairs:
+            if matched[bi] is not None or ti in used_tracks:
+                continue
+            track = self.tracks[ti]
+            track.box = boxes[bi]
+            track.last_seen = self.frame_index
+            track.misses = 0
+            matched[bi] = track
+            used_tracks.add(ti)
+
+        for ti, track in enumerate(self.tracks):
+            if ti not in used_tracks:
+                track.misses += 1
+
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        for bi, box in enumerate(boxes):
+            if matched[bi] is None:
+                track = Track(self.next_id, box, self.frame_index, self.vote_window)
+                self.next_id += 1
+                self.tracks.append(track)
+                matched[bi] = track
+
+        return matched
+
+    def needs_prediction(self, track):
+        """
+        True if the recognizer should run on this track in the current frame.
+        """
+        if track.last_predicted is None or len(track.votes) < self.min_votes:
+            return True
+        return self.frame_index - track.last_predicted >= self.refresh_interval
+
+    def reset_predictions(self):
+        """
+        Drop all votes so every track is predicted again (e.g. after a model swap).
+        """
+        for track in self.tracks:
+            track.votes.clear()
+            track.last_predicted = None
+
+    def add_prediction(self, track, label_id, confidence):
+        """
+        Record a recognizer result and update the fused identity of the track.
+        """
+        self.predictions += 1
+        track.last_predicted = self.frame_index
+        track.votes.append((int(label_id), float(confidence)))
+
+        # Majority vote over the window; ties go to the lower mean distance
+        tally = {}
+        for lid, conf in track.votes:
+            count, total = tally.get(lid, (0, 0.0))
+            tally[lid] = (count + 1, total + conf)
+        best = min(tally.items(), key=lambda item: (-item[1][0], item[1][1] / item[1][0]))
+        track.label_id = best[0]
+        track.confidence = best[1][1] / best[1][0]
+
+        # Hysteresis: becoming known uses the plain threshold, dropping back
+        # to "Unknown" requires clearing it by a margin.
+        if track.known:
+            track.known = track.confidence <= self.unknown_threshold + self.hysteresis
+        else:
+            track.known = track.confidence <= self.unknown_threshold
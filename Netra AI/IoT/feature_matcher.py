@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+"""
+Vectorized face matching with NumPy.
+
+Faces are described by uniform-LBP histograms on a grid of cells (the same
+idea as cv2.face LBPH). Each histogram is square-rooted and scaled to unit
+length, so the Hellinger distance between two faces reduces to a dot product
+and one matrix multiply scores a query (or every face in a frame) against all
+references at once. References are kept in one contiguous matrix sorted by
+label, and each identity is capped to a few k-means centroids.
+
+NumpyFaceRecognizer mirrors the LBPH interface used in face_rec.py
+(train / update / predict / read / write) and adds predict_topk and
+predict_batch.
+"""
+
+import numpy as np
+
+import cv2
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+GRID = 8                        # Cells per side of the histogram grid
+FACE_SIZE = (100, 100)          # Crops are resized to this before feature extraction
+MAX_SAMPLES_PER_IDENTITY = 8    # References kept per person (k-means centroids beyond this)
+KMEANS_ITERATIONS = 10
+# Distances are scaled to 0..100. Tune on enrolled data; this is not on the LBPH scale.
+UNKNOWN_CONFIDENCE = 45
+
+
+def _uniform_lut():
+    """
+    Map the 256 LBP codes to 59 bins: one per uniform pattern (at most two
+    0/1 transitions around the circle) and one shared bin for the rest.
+    """
+    lut = np.full(256, 58, dtype=np.int32)
+    next_bin = 0
+    for code in range(256):
+        bits = [(code >> i) & 1 for i in range(8)]
+        transitions = sum(bits[i] != bits[(i + 1) % 8] for i in range(8))
+        if transitions <= 2:
+            lut[code] = next_bin
+            next_bin += 1
+    return lut
+
+
+UNIFORM_LUT = _uniform_lut()
+N_BINS = 59
+
+
+class FeatureExtractor:
+    """
+    Grid of uniform-LBP histograms, square-rooted and L2-normalized.
+    """
+
+    def __init__(self, grid=GRID, size=FACE_SIZE):
+        self.grid = grid
+        self.size = tuple(size)
+        width, height = self.size
+        # Cell index of every interior pixel, precomputed once
+        rows = (np.arange(1, height - 1) * grid) // height
+        cols = (np.arange(1, width - 1) * grid) // width
+        self.cell_index = (rows[:, None] * grid + cols[None, :]).astype(np.int32) * N_BINS
+        self.cell_pixels = np.bincount(self.cell_index.ravel() // N_BINS,
+                                       minlength=grid * grid).astype(np.float32)
+        self.dim = grid * grid * N_BINS
+
+    def lbp_codes(self, img):
+        img = img.astype(np.int16)
+        center = img[1:-1, 1:-1]
+        h, w = center.shape
+        codes = np.zeros((h, w), dtype=np.uint8)
+        neighbours = [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0), (1, 0)]
+        for bit, (dy, dx) in enumerate(neighbours):
+            codes |= (img[dy:dy + h, dx:dx + w] >= center).astype(np.uint8) << bit
+        return codes
+
+    def extract(self, gray_face):
+        """
+        Feature vector (float32, unit length) for one grayscale face crop.
+        """
+        if (gray_face.shape[1], gray_face.shape[0]) != self.size:
+            gray_face = cv2.resize(gray_face, self.size, interpolation=cv2.INTER_AREA)
+        bins = self.cell_index + UNIFORM_LUT[self.lbp_codes(gray_face)]
+        hist = np.bincount(bins.ravel(), minlength=self.dim).astype(np.float32)
+        hist = hist.reshape(-1, N_BINS) / self.cell_pixels[:, None]
+        feature = np.sqrt(hist).ravel()
+        return feature / np.sqrt(self.grid * self.grid)
+
+    def extract_many(self, faces):
+        out = np.empty((len(faces), self.dim), dtype=np.float32)
+        for i, face in enumerate(faces):
+            out[i] = self.extract(face)
+        return out
+
+
+def kmeans(features, k, iterations=KMEANS_ITERATIONS):
+    """
+    Reduce `features` to `k` unit-length centroids (deterministic init).
+    """
+    if len(features) <= k:
+        return features
+    init = np.linspace(0, len(features) - 1, k).astype(int)
+    centroids = features[init].copy()
+    for _ in range(iterations):
+        assign = np.argmax(features @ centroids.T, axis=1)
+        for c in range(k):
+            members = features[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+    return centroids
+
+
+class NumpyFaceRecognizer:
+    """
+    Drop-in alternative to cv2.face.LBPHFaceRecognizer backed by one
+    contiguous reference matrix.
+    """
+
+    def __init__(self, grid=GRID, size=FACE_SIZE, max_samples=MAX_SAMPLES_PER_IDENTITY):
+        self.extractor = FeatureExtractor(grid, size)
+        self.max_samples = max_samples
+        self.matrix = np.empty((0, self.extractor.dim), dtype=np.float32)
+        self.labels = np.empty(0, dtype=np.int32)
+        self._index()
+
+    def _index(self):
+        """
+        Keep rows sorted by label and remember where each label starts.
+        """
+        order = np.argsort(self.labels, kind="stable")
+        self.matrix = np.ascontiguousarray(self.matrix[order])
+        self.labels = self.labels[order]
+        self.unique_labels, self.label_starts = np.unique(self.labels, return_index=True)
+
+    def _set_identity(self, label, features):
+        keep = self.labels != label
+        features = kmeans(features, self.max_samples)
+        self.matrix = np.concatenate([self.matrix[keep], features.astype(np.float32)])
+        self.labels = np.concatenate([self.labels[keep],
+                                      np.full(len(features), label, dtype=np.int32)])
+
+    def train(self, faces, labels):
+        self.matrix = np.empty((0, self.extractor.dim), dtype=np.float32)
+        self.labels = np.empty(0, dtype=np.int32)
+        self.update(faces, labels)
+
+    def update(self, faces, labels):
+        """
+        Add samples. Only identities present in `labels` are re-clustered.
+        """
+        labels = np.asarray(labels, dtype=np.int32)
+        features = self.extractor.extract_many(faces)
+        for label in np.unique(labels):
+            existing = self.matrix[self.labels == label]
+            self._set_identity(label, np.concatenate([existing, features[labels == label]]))
+        self._index()
+
+    def _identity_scores(self, features):
+        """
+        Best similarity per identity for each query row: (B x identities).
+        """
+        sims = features @ self.matrix.T
+        return np.maximum.reduceat(sims, self.label_starts, axis=1)
+
+    @staticmethod
+    def _to_confidence(similarity):
+        # Hellinger distance of unit vectors, scaled to 0..100 (lower is closer)
+        return 100.0 * np.sqrt(np.clip(1.0 - similarity, 0.0, 1.0))
+
+    def predict_batch(self, faces, k=1):
+        """
+        Score all `faces` with one matrix multiply.
+        Returns, per face, a list of up to k (label, confidence) pairs, best first.
+        """
+        if len(self.labels) == 0 or len(faces) == 0:
+            return [[] for _ in faces]
+        scores = self._identity_scores(self.extractor.extract_many(faces))
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            candidates = candidates[np.argsort(-row[candidates])]
+            results.append([(int(self.unique_labels[c]), float(self._to_confidence(row[c])))
+                            for c in candidates])
+        return results
+
+    def predict_topk(self, face, k=3):
+        return self.predict_batch([face], k)[0]
+
+    def predict(self, face):
+        """
+        Same contract as LBPH predict: (label, distance), label -1 if untrained.
+        """
+        top = self.predict_topk(face, 1)
+        return top[0] if top else (-1, float("inf"))
+
+    def write(self, path):
+        np.savez(path, matrix=self.matrix, labels=self.labels,
+                 grid=self.extractor.grid, size=np.array(self.extractor.size),
+                 max_samples=self.max_samples)
+
+    def read(self, path):
+        with np.load(path) as data:
+            self.extractor = FeatureExtractor(int(data["grid"]), tuple(int(v) for v in data["size"]))
+            self.max_samples = int(data["max_samples"])
+            self.matrix = data["matrix"].astype(np.float32)
+            self.labels = data["labels"].astype(np.int32)
+        self._index()
+
+
+def predict_faces(recognizer, faces):
+    """
+    Predict (label, confidence) for every face crop, in one batch when the
+    recognizer supports it.
+    """
+    if hasattr(recognizer, "predict_batch"):
+        return [top[0] if top else (-1, float("inf")) for top in recognizer.predict_batch(faces)]
+    return [recognizer.predict(face) for face in faces]
@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
 
-import RPi.GPIO as GPIO
 import time
 import subprocess
-import requests
 import os
-from gtts import gTTS
+
+# Real GPIO on the Pi; the scripted simulator only when asked for with NETRA_GPIO=sim.
+# A broken RPi.GPIO (or no root) must not quietly leave the device with dead buttons.
+GPIO_ERROR = None
+if os.environ.get("NETRA_GPIO") == "sim":
+    import sim_gpio as GPIO
+else:
+    try:
+        import RPi.GPIO as GPIO
+    except (ImportError, RuntimeError) as e:
+        GPIO, GPIO_ERROR = None, e
+import audio_engine
+from tts_cache import get_default_cache, startup_phrases
+from netra_client import WorkerTimeout, WorkerUnavailable, send_command, worker_available
+from button_input import ButtonInput
+from emergency import EmergencyDispatcher
+import tracing
 
 # BCM pin numbers for buttons
 CAPTURE_BUTTON_PIN = 17   # Button A: capture + train
@@ -14,122 +28,169 @@ GEMINI_IMAGE_PIN = 22     # Button C: image describe
 GEMINI_VIDEO_PIN = 23     # Button D: video describe (long press emergency)
 
 # Configuration
-EMERGENCY_ENDPOINT = "https://emergency-alert-system.onrender.com/data"
-DEBOUNCE_TIME = 1
+EMERGENCY_ENDPOINT = os.environ.get("NETRA_EMERGENCY_ENDPOINT",
+                                    "https://emergency-alert-system.onrender.com/data")
+EMERGENCY_NOTICE_TIME = 5   # Seconds without delivery before telling the user it is still retrying
+DEBOUNCE_TIME = 0.05      # Software debounce for button edges (seconds)
+LONG_PRESS_TIME = 3       # Button D held this long triggers the emergency alert
+STREAM_DESCRIPTIONS = True  # Speak Gemini descriptions sentence by sentence as they stream in
+VIDEO_KEYFRAMES = False     # Send scene-change keyframes instead of the MP4 (smaller upload)
 recognize_process = None
-button_d_pressed = False
-button_d_start_time = 0
+emergency = None            # EmergencyDispatcher, started in main()
 
-def speak_google(text):
+def speak_google(text, priority=audio_engine.NORMAL):
     """Text-to-speech using gTTS with Bluetooth output"""
-    if not text:
-        return
-    tts = gTTS(text, lang='en')
-    filename = "temp_tts.mp3"
-    tts.save(filename)
-    os.system(f"mpg123 -q {filename}")  # Uses default audio device
-    os.remove(filename)
+    # Cached audio plays through the resident audio engine (mixer stays open);
+    # misses are synthesized once by gTTS
+    with tracing.span("speak", text=text):
+        audio_engine.speak(text, priority)
+
+def _traced(name, action):
+    """Run a button action as the root span of a new trace, starting at the press"""
+    def run(event=None):
+        with tracing.trace(name, start=event.fired_at if event else None):
+            action(event)
+    return run
+
+def run_command(command, fallback_argv, **args):
+    """
+    Run `command` in the resident Netra worker (camera, model and audio
+    already warm); spawn `fallback_argv` as before if the worker is not running.
+    Without a fallback (None) the command is skipped and None returned.
+    A timeout after the command was sent starts no fallback: the worker may
+    still be running it and holding the camera.
+    """
+    try:
+        response = send_command(command, **args)
+        print(f"{command}: {response['latency_ms']:.0f} ms in worker "
+              f"({response['round_trip_ms']:.0f} ms round trip)")
+        return response.get("result")
+    except WorkerUnavailable:
+        if not fallback_argv:
+            print(f"{command}: Netra worker unavailable")
+            return None
+        start = time.monotonic()
+        # The script joins this trace through its environment
+        with tracing.span(f"subprocess:{command}"):
+            subprocess.run(fallback_argv + ["--local"], env=tracing.child_env())
+        print(f"{command}: {(time.monotonic() - start) * 1000:.0f} ms as subprocess")
+    except WorkerTimeout as e:
+        print(f"{command}: {str(e)}")
+    except RuntimeError as e:
+        print(f"Error: {str(e)}")
+    return None
 
-def capture_and_train():
+def capture_and_train(event=None):
     """Handle Button A: Capture and train faces"""
     speak_google("Starting face capture and training")
     print("Button A: Capturing...")
-    subprocess.run(["python", "face_rec.py", "capture"])
+    run_command("capture", ["python", "face_rec.py", "capture", "--headless"])
     speak_google("Capture complete. Starting training.")
-    subprocess.run(["python", "face_rec.py", "train"])
+    run_command("train", ["python", "face_rec.py", "train"])
     speak_google("Training completed successfully")
-    time.sleep(DEBOUNCE_TIME)
 
-def toggle_recognize():
+def toggle_recognize(event=None):
     """Handle Button B: Toggle recognition"""
     global recognize_process
+    if recognize_process is None and worker_available():
+        # No fallback here: if the worker went away meanwhile, start a process below
+        result = run_command("recognize_toggle", None)
+        if result == "started":
+            speak_google("Starting real time recognition")
+            return
+        elif result == "stopped":
+            speak_google("Recognition ended")
+            return
     if recognize_process is None:
         speak_google("Starting real time recognition")
-        recognize_process = subprocess.Popen(["python", "face_rec.py", "recognize"])
+        # Headless: no windows on the wearable; terminate() stops it cleanly via SIGTERM
+        recognize_process = subprocess.Popen(["python", "face_rec.py", "recognize", "--headless"],
+                                             env=tracing.child_env())
     else:
         speak_google("Recognition ended")
         recognize_process.terminate()
         recognize_process = None
         time.sleep(0.5)  # Cleanup delay
-    time.sleep(DEBOUNCE_TIME)
 
-def gemini_describe_image():
+def _stream_flag():
+    return ["--stream"] if STREAM_DESCRIPTIONS else []
+
+def gemini_describe_image(event=None):
     """Handle Button C: Image analysis"""
     speak_google("Capturing image for analysis")
-    subprocess.run(["python", "gemini_image_describer.py"])
+    run_command("describe_image", ["python", "gemini_image_describer.py"] + _stream_flag(),
+                stream=STREAM_DESCRIPTIONS)
     speak_google("Image analysis complete")
-    time.sleep(DEBOUNCE_TIME)
 
-def gemini_describe_video():
+def gemini_describe_video(event=None):
     """Handle Button D short press: Video analysis"""
     speak_google("Recording video for analysis")
-    subprocess.run(["python", "gemini_video_describer.py"])
+    run_command("describe_video",
+                ["python", "gemini_video_describer.py"] + _stream_flag() + (["--keyframes"] if VIDEO_KEYFRAMES else []),
+                duration=5, stream=STREAM_DESCRIPTIONS, keyframes=VIDEO_KEYFRAMES)
     speak_google("Video analysis finished")
-    time.sleep(DEBOUNCE_TIME)
 
-def send_emergency_sms():
-    """Handle Button D long press: Emergency SMS"""
-    speak_google("Emergency alert triggered")
-    try:
-        response = requests.post(EMERGENCY_ENDPOINT, timeout=5)
-        if response.status_code == 200:
-            speak_google("Emergency message sent successfully")
-        else:
-            speak_google("Failed to send emergency message")
-    except Exception as e:
-        speak_google("Emergency service unavailable")
-        print(f"Error: {str(e)}")
+def _emergency_delivered(alert):
+    # Runs on the dispatcher's sender thread; don't block it on playback
+    audio_engine.speak("Emergency message sent successfully", audio_engine.URGENT, wait=False)
 
-def handle_button_d():
-    """Handle Button D press duration"""
-    global button_d_pressed, button_d_start_time
-    current_state = GPIO.input(GEMINI_VIDEO_PIN)
-    
-    if current_state == GPIO.LOW:
-        if not button_d_pressed:
-            button_d_pressed = True
-            button_d_start_time = time.time()
-    else:
-        if button_d_pressed:
-            duration = time.time() - button_d_start_time
-            button_d_pressed = False
-            if duration >= 3:
-                send_emergency_sms()
-            else:
-                gemini_describe_video()
-            time.sleep(DEBOUNCE_TIME)
+def send_emergency_sms(event=None):
+    """Handle Button D long press: Emergency SMS"""
+    # The alert is on disk and being sent before anything is spoken;
+    # the dispatcher keeps retrying in the background until it is delivered
+    alert, new = emergency.trigger(pressed_at=event.fired_at if event else None)
+    if not new:
+        speak_google("Emergency alert already raised", audio_engine.URGENT)
+        return
+    speak_google("Emergency alert triggered", audio_engine.URGENT)
+    if not alert.wait(EMERGENCY_NOTICE_TIME):
+        speak_google("Emergency service unavailable. Still trying.", audio_engine.URGENT)
 
 def main():
+    global emergency
+    if GPIO is None:
+        print(f"FATAL: GPIO unavailable ({GPIO_ERROR}); buttons, including SOS, would not work. "
+              "Set NETRA_GPIO=sim to run with simulated buttons.")
+        try:
+            speak_google("Button input failed. Netra cannot start.", audio_engine.URGENT)
+        except Exception as e:
+            print(f"Error announcing GPIO failure: {str(e)}")
+        raise SystemExit(1)
     GPIO.setmode(GPIO.BCM)
     GPIO.setup(CAPTURE_BUTTON_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
     GPIO.setup(RECOGNIZE_BUTTON_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
     GPIO.setup(GEMINI_IMAGE_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
     GPIO.setup(GEMINI_VIDEO_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
+    # Pre-synthesize system prompts and enrolled names in the background
+    get_default_cache().prewarm_async(startup_phrases())
+
+    # Resends anything left in the outbox by a previous run
+    emergency = EmergencyDispatcher(EMERGENCY_ENDPOINT, on_delivered=_emergency_delivered).start()
+
+    # Edge callbacks classify presses; actions run on worker threads so
+    # presses during a running action are queued, not lost
+    buttons = ButtonInput(GPIO, debounce=DEBOUNCE_TIME, long_press=LONG_PRESS_TIME)
+    # Each press is traced from the moment it fired (see tracing.py)
+    buttons.add_button(CAPTURE_BUTTON_PIN, _traced("button_a", capture_and_train))       # Button A
+    buttons.add_button(RECOGNIZE_BUTTON_PIN, _traced("button_b", toggle_recognize))      # Button B
+    buttons.add_button(GEMINI_IMAGE_PIN, _traced("button_c", gemini_describe_image))     # Button C
+    buttons.add_button(GEMINI_VIDEO_PIN, _traced("button_d", gemini_describe_video),     # Button D
+                       on_long=_traced("button_d_long", send_emergency_sms))
+    buttons.start()
     speak_google("Netra AI system initialized")
 
     try:
         while True:
-            # Button A - Capture + Train
-            if GPIO.input(CAPTURE_BUTTON_PIN) == GPIO.LOW:
-                capture_and_train()
-
-            # Button B - Recognition Toggle
-            if GPIO.input(RECOGNIZE_BUTTON_PIN) == GPIO.LOW:
-                toggle_recognize()
-
-            # Button C - Image Analysis
-            if GPIO.input(GEMINI_IMAGE_PIN) == GPIO.LOW:
-                gemini_describe_image()
-
-            # Button D Handling
-            handle_button_d()
-            
-            time.sleep(0.1)  # Reduce CPU usage
+            time.sleep(1)
 
     except KeyboardInterrupt:
         speak_google("System shutting down")
     finally:
+        buttons.stop()
+        print("Button stats:", buttons.stats())
+        emergency.close()
+        print("Emergency stats:", emergency.stats())
         if recognize_process:
             recognize_process.terminate()
         GPIO.cleanup()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+
+"""
+Gemini API client shared by the image and video describers.
+
+One requests.Session with a fixed-size connection pool is kept per client,
+so repeated calls skip the TCP/TLS handshake. Every request has connect and
+read timeouts. 429 and 5xx responses, connection errors and timeouts are
+retried with jittered exponential backoff (Retry-After is honoured). The API
+key comes from the GEMINI_API_KEY environment variable and is sent in a
+header, never in the URL. Per-request latency and retry counts are
+kept for stats(). stream_generate_content() yields the text as the model
+produces it (streamGenerateContent with server-sent events). The
+start_upload() / upload_chunk() / wait_for_file() methods implement the
+File API resumable upload for media too large to send inline.
+
+GEMINI_BASE_URL points the client at another server, e.g. the local
+stand-in in mock_gemini_server.py.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+API_KEY_ENV = "GEMINI_API_KEY"
+BASE_URL_ENV = "GEMINI_BASE_URL"
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+DEFAULT_MODEL = "gemini-1.5-pro"
+CONNECT_TIMEOUT = 5.0     # Seconds to establish the connection
+READ_TIMEOUT = 60.0       # Seconds to wait for the response (video takes a while)
+MAX_RETRIES = 3           # Retries after the first attempt
+BACKOFF_BASE = 0.5        # Seconds; doubles every retry
+BACKOFF_MAX = 8.0
+POOL_SIZE = 4             # Keep-alive connections kept open
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_SAMPLES = 500         # Latency samples kept for stats()
+DEFAULT_GRANULARITY = 256 * 1024  # Upload chunk multiple if the server does not say
+FILE_POLL_INTERVAL = 1.0  # Seconds between checks while an uploaded file is processed
+FILE_READY_TIMEOUT = 120.0
+
+
+class GeminiError(RuntimeError):
+    """
+    A request that failed for good (after retries, or not retryable).
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def load_api_key():
+    """
+    The API key from the environment, or None.
+    """
+    return os.environ.get(API_KEY_ENV) or None
+
+
+def inline_part(mime_type, base64_data):
+    """
+    A generateContent part carrying base64 media inline.
+    """
+    return {"inlineData": {"mimeType": mime_type, "data": base64_data}}
+
+
+def file_part(mime_type, file_uri):
+    """
+    A generateContent part referencing a file uploaded through the File API.
+    """
+    return {"fileData": {"mimeType": mime_type, "fileUri": file_uri}}
+
+
+def extract_text(response_json, default="No description available."):
+    """
+    The text of the first candidate's first part.
+    """
+    candidates = response_json.get("candidates", [])
+    if not candidates:
+        return "No candidates found."
+    parts = candidates[0].get("content", {}).get("parts", [])
+    if not parts:
+        return "No candidates found."
+    return parts[0].get("text", default)
+
+
+class GeminiClient:
+    """
+    Pooled, retrying client for generateContent.
+    """
+
+    def __init__(self, api_key=None, model=DEFAULT_MODEL, base_url=None,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, pool_size=POOL_SIZE):
+        self.api_key = api_key or load_api_key()
+        self.model = model
+        self.base_url = (base_url or os.environ.get(BASE_URL_ENV) or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.latencies = []       # ms per request, all attempts included
+
+    def url(self, method="generateContent"):
+        return f"{self.base_url}/v1beta/models/{self.model}:{method}"
+
+    def _headers(self):
+        if not self.api_key:
+            raise GeminiError(f"{API_KEY_ENV} is not set")
+        return {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(BACKOFF_MAX, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter: spread retries from several devices apart
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    def request(self, method, url, json=None, data=None, headers=None, stream=False, timeout=None):
+        """
+        HTTP request with timeouts and retries. Returns the successful
+        requests.Response; raises GeminiError otherwise.
+        """
+        request_headers = self._headers()
+        if headers:
+            request_headers.update(headers)
+        start = time.monotonic()
+        attempt = 0
+        try:
+            while True:
+                response = None
+                try:
+                    response = self.session.request(method, url, json=json, data=data, headers=request_headers,
+                                                    timeout=timeout or self.timeout, stream=stream)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = GeminiError(f"Gemini request failed: {e}")
+                else:
+                    if response.status_code == 200:
+                        return response
+                    error = GeminiError(f"Gemini API error {response.status_code}: {response.text[:500]}",
+                                        response.status_code)
+                    if response.status_code not in RETRY_STATUSES:
+                        raise error
+                if attempt >= self.max_retries:
+                    raise error
+                delay = self._backoff(attempt, response)
+                attempt += 1
+                with self.lock:
+                    self.retries += 1
+                print(f"{error}; retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+        except GeminiError:
+            with self.lock:
+                self.failures += 1
+            raise
+        finally:
+            self._record((time.monotonic() - start) * 1000)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def _record(self, latency_ms):
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency_ms)
+            if len(self.latencies) > MAX_SAMPLES:
+                del self.latencies[0]
+
+    def generate_content(self, parts):
+        """
+        Call generateContent with one user turn made of `parts`.
+        Returns the decoded JSON response.
+        """
+        payload = {"contents": [{"parts": parts}]}
+        return self.post(self.url(), json=payload).json()
+
+    def describe(self, prompt, mime_type, base64_data):
+        """
+        Ask for a description of one inline image or video. Returns the text.
+        """
+        return self.describe_parts(prompt, [inline_part(mime_type, base64_data)])
+
+    def describe_parts(self, prompt, media_parts):
+        """
+        Ask for a description of several media parts (e.g. the keyframes
+        of a clip, in order). Returns the text.
+        """
+        return extract_text(self.generate_content([{"text": prompt}] + list(media_parts)))
+
+    def stream_generate_content(self, parts):
+        """
+        Call streamGenerateContent and yield text fragments as they arrive.
+        Retries only happen before the first byte; a stream that breaks
+        midway raises GeminiError.
+        """
+        payload = {"contents": [{"parts": parts}]}
+        response = self.post(self.url("streamGenerateContent") + "?alt=sse", json=payload, stream=True)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                chunk = json.loads(line[len("data:"):].strip())
+                for candidate in chunk.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+        except (requests.RequestException, ValueError) as e:
+            raise GeminiError(f"Gemini stream broke off: {e}")
+        finally:
+            response.close()
+
+    def describe_stream(self, prompt, mime_type, base64_data):
+        """
+        Like describe(), but yields the description piece by piece.
+        """
+        return self.describe_parts_stream(prompt, [inline_part(mime_type, base64_data)])
+
+    def describe_parts_stream(self, prompt, media_parts):
+        """
+        Like describe_parts(), but yields the description piece by piece.
+        """
+        return self.stream_generate_content([{"text": prompt}] + list(media_parts))
+
+    def start_upload(self, mime_type, display_name=None, size=None):
+        """
+        Open a resumable File API upload. `size` may be None when the
+        length is not known yet (recording still in progress).
+        Returns (upload URL, chunk granularity in bytes).
+        """
+        headers = {
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Header-Content-Type": mime_type,
+        }
+        if size is not None:
+            headers["X-Goog-Upload-Header-Content-Length"] = str(size)
+        body = {"file": {"display_name": display_name}} if display_name else {}
+        response = self.post(f"{self.base_url}/upload/v1beta/files", json=body, headers=headers)
+        upload_url = response.headers.get("X-Goog-Upload-URL")
+        if not upload_url:
+            raise GeminiError("Upload start did not return an upload URL")
+        granularity = int(response.headers.get("X-Goog-Upload-Chunk-Granularity") or DEFAULT_GRANULARITY)
+        return upload_url, granularity
+
+    def upload_chunk(self, upload_url, offset, data, finalize=False):
+        """
+        Send bytes at `offset`. Every chunk except the final one must be a
+        multiple of the granularity. Returns the file resource on finalize.
+        A failed chunk is retried at the same offset.
+        """
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "X-Goog-Upload-Command": "upload, finalize" if finalize else "upload",
+            "X-Goog-Upload-Offset": str(offset),
+        }
+        response = self.post(upload_url, data=data, headers=headers)
+        if finalize:
+            return response.json().get("file", {})
+        return None
+
+    def get_file(self, name):
+        """
+        The File API resource for `name` ("files/...").
+        """
+        return self.get(f"{self.base_url}/v1beta/{name}").json()
+
+    def wait_for_file(self, uploaded, timeout=FILE_READY_TIMEOUT):
+        """
+        Wait until an uploaded file leaves the PROCESSING state.
+        Returns the ACTIVE file resource; raises GeminiError otherwise.
+        """
+        deadline = time.monotonic() + timeout
+        resource = uploaded
+        while resource.get("state", "ACTIVE") == "PROCESSING":
+            if time.monotonic() > deadline:
+                raise GeminiError(f"File {uploaded.get('name')} still processing after {timeout:.0f}s")
+            time.sleep(FILE_POLL_INTERVAL)
+            resource = self.get_file(uploaded["name"])
+        if resource.get("state", "ACTIVE") != "ACTIVE":
+            raise GeminiError(f"File {uploaded.get('name')} failed: {resource.get('state')}")
+        return resource
+
+    def stats(self):
+        with self.lock:
+            lat = sorted(self.latencies)
+            last = self.latencies[-1] if self.latencies else 0.0
+            requests_made, failures, retries = self.requests, self.failures, self.retries
+        return {
+            "requests": requests_made,
+            "failures": failures,
+            "retries": retries,
+            "p50_ms": lat[len(lat) // 2] if lat else 0.0,
+            "p95_ms": lat[min(len(lat) - 1, int(len(lat) * 0.95))] if lat else 0.0,
+            "max_ms": lat[-1] if lat else 0.0,
+            "last_ms": last,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+
+
+def get_default_client():
+    """
+    Process-wide client, so every describe call shares one connection pool.
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = GeminiClient()
+    return _default_client
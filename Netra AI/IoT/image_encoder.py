@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""
+In-memory JPEG encoding with a byte budget, for Gemini uploads.
+
+encode_jpeg() encodes a frame straight into memory (no temp file) and
+searches for the highest JPEG quality that fits `max_bytes`. If even the
+lowest allowed quality is too big, the frame is scaled down step by step and
+the search repeats. The result carries the encode time and sizes so callers
+can report them.
+"""
+
+import base64
+import time
+
+import cv2
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+MAX_BYTES = 60 * 1024     # JPEG byte budget per image (base64 adds about a third)
+MAX_DIMENSION = 640       # Longest side before any budget search
+QUALITY_MAX = 90
+QUALITY_MIN = 35
+SCALE_STEP = 0.75         # Downscale factor when QUALITY_MIN is still too big
+MIN_DIMENSION = 160       # Never scale the longest side below this
+
+
+class EncodedImage:
+    """
+    One encoded JPEG plus how it was produced.
+    """
+
+    def __init__(self, data, width, height, quality, encode_ms, attempts):
+        self.data = data              # JPEG bytes
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.encode_ms = encode_ms
+        self.attempts = attempts      # cv2.imencode calls made
+
+    def base64(self):
+        return base64.b64encode(self.data).decode("ascii")
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    @property
+    def payload_size(self):
+        # Length of the base64 text that goes into the JSON payload
+        return (len(self.data) + 2) // 3 * 4
+
+    def __repr__(self):
+        return (f"EncodedImage({self.width}x{self.height}, q={self.quality}, "
+                f"{self.size} bytes, {self.encode_ms:.1f} ms)")
+
+
+def _resize(frame, longest):
+    height, width = frame.shape[:2]
+    scale = longest / max(height, width)
+    if scale >= 1.0:
+        return frame
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def _imencode(frame, quality):
+    ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buf
+
+
+def encode_jpeg(frame, max_bytes=MAX_BYTES, max_dimension=MAX_DIMENSION,
+                quality_max=QUALITY_MAX, quality_min=QUALITY_MIN):
+    """
+    Encode a BGR frame as JPEG within `max_bytes`, keeping as much quality
+    as the budget allows. Returns an EncodedImage. If the budget cannot be
+    met even at MIN_DIMENSION and `quality_min`, the smallest encoding
+    is returned anyway.
+    """
+    start = time.perf_counter()
+    attempts = 0
+    longest = min(max_dimension, max(frame.shape[:2]))
+
+    while True:
+        scaled = _resize(frame, longest)
+        if max_bytes is None:
+            best = (_imencode(scaled, quality_max), quality_max)
+            attempts += 1
+            break
+        best = None
+        # Binary search for the highest quality that fits
+        low, high = quality_min, quality_max
+        while low <= high:
+            quality = (low + high) // 2
+            buf = _imencode(scaled, quality)
+            attempts += 1
+            if buf.size <= max_bytes:
+                best = (buf, quality)
+                low = quality + 1
+            else:
+                high = quality - 1
+        if best is not None:
+            break
+        if longest <= MIN_DIMENSION:
+            # Nothing fits; the search ended on quality_min, the smallest we allow
+            best = (buf, quality_min)
+            break
+        longest = max(MIN_DIMENSION, int(longest * SCALE_STEP))
+
+    buf, quality = best
+    height, width = scaled.shape[:2]
+    encode_ms = (time.perf_counter() - start) * 1000
+    return EncodedImage(buf.tobytes(), width, height, quality, encode_ms, attempts)
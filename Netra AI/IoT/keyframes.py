@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Streaming keyframe selection for short clips.
+
+Instead of recording and uploading a whole MP4, the video describer can
+feed frames one at a time to KeyframeSelector. A frame becomes a
+keyframe when its downscaled grayscale thumbnail differs enough from the last
+keyframe's. When more than `max_keyframes` are collected, the one that
+adds least (smallest change from its predecessor) is dropped. So memory
+stays at a few frames, and the result covers the distinct moments of the
+clip in order.
+"""
+
+import cv2
+import numpy as np
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+MAX_KEYFRAMES = 6         # Frames sent to Gemini per clip
+CHANGE_THRESHOLD = 0.08   # Mean absolute thumbnail difference (0..1) for a new keyframe
+MIN_GAP = 0.25            # Seconds between keyframes, so one motion is not sampled densely
+THUMB_SIZE = (32, 24)
+
+
+class Keyframe:
+    def __init__(self, timestamp, frame, thumb, score):
+        self.timestamp = timestamp    # seconds from the start of the clip
+        self.frame = frame
+        self.thumb = thumb
+        self.score = score            # change from the previous keyframe (first frame: 1.0)
+
+    def __repr__(self):
+        return f"Keyframe(t={self.timestamp:.2f}s, score={self.score:.3f})"
+
+
+def thumbnail(frame):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32) / 255.0
+
+
+def change(a, b):
+    return float(np.mean(np.abs(a - b)))
+
+
+class KeyframeSelector:
+    """
+    Feed frames with add(); keyframes() returns the selection in time order.
+    """
+
+    def __init__(self, max_keyframes=MAX_KEYFRAMES, threshold=CHANGE_THRESHOLD, min_gap=MIN_GAP):
+        self.max_keyframes = max_keyframes
+        self.threshold = threshold
+        self.min_gap = min_gap
+        self.selected = []
+        self.frames_seen = 0
+        self.last = None              # (timestamp, frame, thumb) of the newest frame seen
+
+    def add(self, frame, timestamp):
+        """
+        Consider one frame. Returns True if it was kept as a keyframe.
+        """
+        self.frames_seen += 1
+        thumb = thumbnail(frame)
+        # The caller's frame may be a camera ring slot that is reused: keep a copy
+        frame = frame.copy()
+        self.last = (timestamp, frame, thumb)
+        if not self.selected:
+            self.selected.append(Keyframe(timestamp, frame, thumb, 1.0))
+            return True
+        previous = self.selected[-1]
+        score = change(thumb, previous.thumb)
+        if score < self.threshold or timestamp - previous.timestamp < self.min_gap:
+            return False
+        self.selected.append(Keyframe(timestamp, frame, thumb, score))
+        if len(self.selected) > self.max_keyframes:
+            self._drop_least_informative()
+        return True
+
+    def _drop_least_informative(self):
+        # Never drop the first frame; rescore the neighbour of the dropped one
+        index = min(range(1, len(self.selected)), key=lambda i: self.selected[i].score)
+        del self.selected[index]
+        if index < len(self.selected):
+            following = self.selected[index]
+            following.score = change(following.thumb, self.selected[index - 1].thumb)
+
+    def keyframes(self):
+        """
+        The selected keyframes. A static clip yields just its first frame,
+        so the newest frame is added as well if the scene drifted slowly.
+        """
+        selected = list(self.selected)
+        if self.last is not None and selected and self.last[0] > selected[-1].timestamp:
+            timestamp, frame, thumb = self.last
+            score = change(thumb, selected[-1].thumb)
+            if score >= self.threshold / 2 and len(selected) < self.max_keyframes:
+                selected.append(Keyframe(timestamp, frame.copy(), thumb, score))
+        return selected
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""
+Local stand-in for the emergency alert endpoint, for exercising
+emergency.py without sending real alerts.
+
+Accepts POST on any path and answers 200 with {"status": "ok"}. Alerts
+are recorded by their Idempotency-Key, so duplicate deliveries (retries
+of an alert the endpoint already accepted) are counted separately. Faults
+are injected as in mock_gemini_server.py, plus an outage: every request in
+the first `outage` seconds after start fails.
+
+Usage: python mock_emergency_server.py [--port 8766] [--delay 0.1] [--outage 5]
+                                       [--fail-first 2 --fail-status 503] [--fail-rate 0.3]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from mock_gemini_server import Faults
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+HOST = "127.0.0.1"
+PORT = 8766
+
+
+class MockEmergencyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, every reused
+    # connection would stall on the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        server = self.server
+        faults = server.faults
+        if faults.delay:
+            time.sleep(faults.delay)
+        status = faults.next_failure()
+        if status is None and time.monotonic() < server.outage_until:
+            status = 503
+        if status is not None:
+            self._send_json(status, {"status": "error", "message": "injected failure"})
+            return
+        key = self.headers.get("Idempotency-Key") or f"anonymous-{time.monotonic()}"
+        with server.lock:
+            if key in server.alerts:
+                server.duplicates += 1
+            else:
+                server.alerts[key] = {"received_at": time.time(), "body": body.decode("utf-8", "replace")}
+        self._send_json(200, {"status": "ok"})
+
+
+class MockEmergencyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=(HOST, PORT), faults=None, outage=0.0, verbose=False):
+        super().__init__(address, MockEmergencyHandler)
+        self.faults = faults or Faults()
+        self.outage_until = time.monotonic() + outage
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.alerts = {}          # Idempotency-Key -> first delivery
+        self.duplicates = 0
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_background(faults=None, port=0, **kwargs):
+    """
+    Start a server on a free port in a daemon thread. Returns the server;
+    call shutdown() when done.
+    """
+    server = MockEmergencyServer((HOST, port), faults, **kwargs)
+    threading.Thread(target=server.serve_forever, name="mock-emergency", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the emergency alert endpoint")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--outage", type=float, default=0.0, help="Fail every request for this many seconds")
+    parser.add_argument("--fail-first", type=int, default=0, help="Fail this many requests first")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests to fail")
+    args = parser.parse_args()
+
+    faults = Faults(args.delay, args.fail_first, args.fail_status, args.fail_rate)
+    server = MockEmergencyServer((HOST, args.port), faults, outage=args.outage, verbose=True)
+    print("Mock emergency endpoint listening on", server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{len(server.alerts)} alerts received, {server.duplicates} duplicate deliveries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+"""
+Local stand-in for the Gemini API, for exercising gemini_client.py and the
+describers without a key or network.
+
+Answers POST /v1beta/models/<model>:generateContent with a canned
+description that mentions the size of each inline part, and
+:streamGenerateContent?alt=sse with a longer canned description sent as
+server-sent events, a few words per event. The File API resumable upload
+is served too: POST /upload/v1beta/files (start, upload, finalize) with
+an X-Goog-Upload-Chunk-Granularity that is enforced on every chunk but the
+last, and GET /v1beta/files/<id>, which reports PROCESSING for a short
+while after finalize. Faults can be
+injected: a fixed response delay, a number of initial failures with a given
+status, and a random failure rate. HTTP/1.1 keep-alive is supported, so
+connection reuse shows up in latencies.
+
+Usage: python mock_gemini_server.py [--port 8765] [--delay 0.2] [--chunk-delay 0.15]
+                                    [--fail-first 2 --fail-status 503] [--fail-rate 0.1]
+Then: GEMINI_BASE_URL=http://127.0.0.1:8765 GEMINI_API_KEY=test python gemini_image_describer.py --local
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+HOST = "127.0.0.1"
+PORT = 8765
+WORDS_PER_EVENT = 4       # Streamed words per server-sent event
+UPLOAD_GRANULARITY = 256 * 1024   # Chunk multiple the upload endpoint demands
+PROCESSING_TIME = 1.0     # Seconds an uploaded file stays PROCESSING
+STREAM_TEXT = (
+    "The image shows a small room with a wooden desk in the middle. "
+    "A laptop sits open on the desk next to a coffee mug. "
+    "Behind the desk there is a window, and daylight is coming in. "
+    "A person is standing near the door on the left, facing the camera. "
+    "The floor is clear, so there are no obstacles in front of you."
+)
+
+
+class Faults:
+    """
+    Fault injection settings, shared by all handler threads.
+    """
+
+    def __init__(self, delay=0.0, fail_first=0, fail_status=503, fail_rate=0.0, retry_after=None,
+                 chunk_delay=0.0):
+        self.delay = delay
+        self.chunk_delay = chunk_delay        # seconds between streamed events
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.fail_rate = fail_rate
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def next_failure(self):
+        """
+        The status to fail this request with, or None to answer normally.
+        """
+        with self.lock:
+            self.requests += 1
+            if self.requests <= self.fail_first:
+                return self.fail_status
+        if self.fail_rate and random.random() < self.fail_rate:
+            return self.fail_status
+        return None
+
+
+def describe_parts(parts):
+    """
+    The canned answer: what the request contained.
+    """
+    described = []
+    for part in parts:
+        if "text" in part:
+            continue
+        if "inlineData" in part:
+            data = part["inlineData"]
+            described.append(f"{data.get('mimeType')} of {len(data.get('data', '')) * 3 // 4} bytes")
+        elif "fileData" in part:
+            described.append(f"{part['fileData'].get('mimeType')} file {part['fileData'].get('fileUri')}")
+    return "A stand-in description of " + (", ".join(described) or "nothing") + "."
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, every reused
+    # connection would stall on the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.faults.lock:
+            self.server.faults.connections += 1
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _authorized(self):
+        if self.headers.get("x-goog-api-key") or "key=" in self.path:
+            return True
+        self._send_json(403, {"error": {"code": 403, "message": "API key missing"}})
+        return False
+
+    def _send_empty(self, status, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        path = urlparse(self.path).path
+        name = path[len("/v1beta/"):] if path.startswith("/v1beta/files/") else None
+        stored = self.server.files.get(name)
+        if stored is None:
+            self._send_json(404, {"error": {"code": 404, "message": f"no file {name}"}})
+            return
+        resource = dict(stored)
+        if time.monotonic() - resource.pop("finalized_at") >= self.server.processing_time:
+            resource["state"] = "ACTIVE"
+        self._send_json(200, resource)
+
+    def _upload(self):
+        command = self.headers.get("X-Goog-Upload-Command", "")
+        query = parse_qs(urlparse(self.path).query)
+        server = self.server
+        if command == "start":
+            self._read_json()
+            upload_id = str(next(server.ids))
+            server.uploads[upload_id] = {
+                "mimeType": self.headers.get("X-Goog-Upload-Header-Content-Type", "application/octet-stream"),
+                "received": 0,
+                "head": b"",
+            }
+            self._send_empty(200, {
+                "X-Goog-Upload-URL": f"{server.base_url}/upload/v1beta/files?upload_id={upload_id}"
+                                     "&upload_protocol=resumable",
+                "X-Goog-Upload-Chunk-Granularity": str(server.granularity),
+                "X-Goog-Upload-Status": "active",
+            })
+            return
+        upload_id = query.get("upload_id", [None])[0]
+        upload = server.uploads.get(upload_id)
+        if upload is None:
+            self._send_json(404, {"error": {"code": 404, "message": "unknown upload"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length)
+        if command == "query":
+            self._send_empty(200, {"X-Goog-Upload-Status": "active",
+                                   "X-Goog-Upload-Size-Received": str(upload["received"])})
+            return
+        finalize = "finalize" in command
+        offset = int(self.headers.get("X-Goog-Upload-Offset", -1))
+        if offset != upload["received"]:
+            self._send_json(400, {"error": {"code": 400,
+                                            "message": f"offset {offset}, expected {upload['received']}"}})
+            return
+        if not finalize and length % server.granularity:
+            self._send_json(400, {"error": {"code": 400,
+                                            "message": f"chunk of {length} bytes is not a multiple of "
+                                                       f"{server.granularity}"}})
+            return
+        upload["received"] += length
+        upload["head"] = (upload["head"] + data[:16])[:16]
+        if not finalize:
+            self._send_empty(200, {"X-Goog-Upload-Status": "active"})
+            return
+        del server.uploads[upload_id]
+        name = f"files/{upload_id}"
+        resource = {
+            "name": name,
+            "uri": f"{server.base_url}/v1beta/{name}",
+            "mimeType": upload["mimeType"],
+            "sizeBytes": str(upload["received"]),
+            "state": "PROCESSING",
+            # An MP4 (fragmented or not) starts with an ftyp box
+            "isMp4": upload["head"][4:8] == b"ftyp",
+        }
+        server.files[name] = dict(resource, finalized_at=time.monotonic())
+        self._send_json(200, {"file": resource}, {"X-Goog-Upload-Status": "final"})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        if not self._authorized():
+            return
+        if path == "/upload/v1beta/files":
+            self._upload()
+            return
+        streaming = path.endswith(":streamGenerateContent")
+        if not streaming and not path.endswith(":generateContent"):
+            self._send_json(404, {"error": {"code": 404, "message": f"no route {path}"}})
+            return
+        request = self._read_json()
+        faults = self.server.faults
+        if faults.delay:
+            time.sleep(faults.delay)
+        status = faults.next_failure()
+        if status is not None:
+            headers = {"Retry-After": str(faults.retry_after)} if faults.retry_after is not None else None
+            self._send_json(status, {"error": {"code": status, "message": "injected failure"}}, headers)
+            return
+        parts = request.get("contents", [{}])[0].get("parts", [])
+        if streaming:
+            self._stream(describe_parts(parts) + " " + STREAM_TEXT)
+            return
+        self._send_json(200, {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": describe_parts(parts)}]}}],
+        })
+
+    def _stream(self, text):
+        # No Content-Length: the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = text.split(" ")
+        for i in range(0, len(words), WORDS_PER_EVENT):
+            if i and self.server.faults.chunk_delay:
+                time.sleep(self.server.faults.chunk_delay)
+            fragment = " ".join(words[i:i + WORDS_PER_EVENT]) + (" " if i + WORDS_PER_EVENT < len(words) else "")
+            event = {"candidates": [{"content": {"role": "model", "parts": [{"text": fragment}]}}]}
+            self.wfile.write(b"data: " + json.dumps(event).encode("utf-8") + b"\r\n\r\n")
+            self.wfile.flush()
+
+
+class MockGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=(HOST, PORT), faults=None, verbose=False,
+                 granularity=UPLOAD_GRANULARITY, processing_time=PROCESSING_TIME):
+        super().__init__(address, MockGeminiHandler)
+        self.faults = faults or Faults()
+        self.verbose = verbose
+        self.granularity = granularity
+        self.processing_time = processing_time
+        self.ids = itertools.count(1)
+        self.uploads = {}     # upload id -> progress of an open resumable upload
+        self.files = {}       # "files/<id>" -> finalized file resource
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_background(faults=None, port=0, **kwargs):
+    """
+    Start a server on a free port in a daemon thread. Returns the server;
+    call shutdown() when done.
+    """
+    server = MockGeminiServer((HOST, port), faults, **kwargs)
+    threading.Thread(target=server.serve_forever, name="mock-gemini", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini API")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed events")
+    parser.add_argument("--fail-first", type=int, default=0, help="Fail this many requests first")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests to fail")
+    parser.add_argument("--granularity", type=int, default=UPLOAD_GRANULARITY, help="Upload chunk multiple")
+    parser.add_argument("--processing-time", type=float, default=PROCESSING_TIME,
+                        help="Seconds uploaded files stay PROCESSING")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds on failures")
+    args = parser.parse_args()
+
+    faults = Faults(args.delay, args.fail_first, args.fail_status, args.fail_rate, args.retry_after,
+                    args.chunk_delay)
+    server = MockGeminiServer((HOST, args.port), faults, verbose=True,
+                              granularity=args.granularity, processing_time=args.processing_time)
+    print("Mock Gemini listening on", server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+"""
+Versioned face model bundle.
+
+One zip file holds the recognizer weights, the label table and metadata
+(backend, version, creation time, number of trained samples). It is written
+to a temporary file and renamed into place, so readers never see a partial
+bundle. BundleWatcher lets a running recognizer pick up a new version
+without restarting.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+BUNDLE_PATH = "face_model.bundle"   # Weights + labels + metadata
+POLL_INTERVAL = 2.0                 # Seconds between checks for a new bundle
+FORMAT_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+WEIGHT_FILES = {"lbph": "weights.xml", "numpy": "weights.npz"}
+
+
+def create_recognizer(backend):
+    """
+    New, untrained recognizer for `backend` ("lbph" or "numpy").
+    """
+    if backend == "numpy":
+        from feature_matcher import NumpyFaceRecognizer
+        return NumpyFaceRecognizer()
+    import cv2
+    return cv2.face.LBPHFaceRecognizer_create()
+
+
+class ModelBundle:
+    """
+    A loaded bundle: ready recognizer plus {label_id: name} and metadata.
+    """
+
+    def __init__(self, recognizer, labels, backend, version, metadata):
+        self.recognizer = recognizer
+        self.labels = labels
+        self.backend = backend
+        self.version = version
+        self.metadata = metadata
+
+    def __repr__(self):
+        return f"ModelBundle(v{self.version}, {self.backend}, {len(self.labels)} labels)"
+
+
+def read_manifest(path=BUNDLE_PATH):
+    """
+    Only the manifest (labels and metadata), without loading the weights.
+    Returns None if there is no bundle.
+    """
+    if not os.path.exists(path):
+        return None
+    with zipfile.ZipFile(path) as bundle:
+        return json.loads(bundle.read(MANIFEST_NAME).decode("utf-8"))
+
+
+def read_labels(path=BUNDLE_PATH):
+    """
+    {label_id: name} from the bundle, or {} if there is none.
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        return {}
+    return {int(lid): name for lid, name in manifest["labels"]}
+
+
+def save_bundle(recognizer, backend, labels, metadata=None, path=BUNDLE_PATH):
+    """
+    Atomically write a new bundle version. `labels` is {label_id: name}.
+    Returns the new version number.
+    """
+    previous = read_manifest(path)
+    version = previous["version"] + 1 if previous else 1
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "backend": backend,
+        "created": time.time(),
+        # A list of pairs so names may contain any character
+        "labels": sorted([int(lid), name] for lid, name in labels.items()),
+        "metadata": metadata or {},
+    }
+
+    weights_name = WEIGHT_FILES[backend]
+    work_dir = tempfile.mkdtemp(prefix="netra_bundle_")
+    try:
+        weights_path = os.path.join(work_dir, weights_name)
+        recognizer.write(weights_path)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as bundle:
+            bundle.writestr(MANIFEST_NAME, json.dumps(manifest, indent=1))
+            bundle.write(weights_path, weights_name)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return version
+
+
+def load_bundle(path=BUNDLE_PATH):
+    """
+    Load a bundle into a ModelBundle, or return None if it does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    work_dir = tempfile.mkdtemp(prefix="netra_bundle_")
+    try:
+        with zipfile.ZipFile(path) as bundle:
+            manifest = json.loads(bundle.read(MANIFEST_NAME).decode("utf-8"))
+            backend = manifest["backend"]
+            weights_path = bundle.extract(WEIGHT_FILES[backend], work_dir)
+        recognizer = create_recognizer(backend)
+        recognizer.read(weights_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    labels = {int(lid): name for lid, name in manifest["labels"]}
+    return ModelBundle(recognizer, labels, backend, manifest["version"], manifest["metadata"])
+
+
+class BundleWatcher:
+    """
+    Watches the bundle file on a background thread and loads new versions
+    off the caller's thread. The recognition loop calls poll() once per
+    frame; it never blocks and returns a ModelBundle only when a newer
+    version is ready to swap in.
+    """
+
+    def __init__(self, path=BUNDLE_PATH, current_version=0, poll_interval=POLL_INTERVAL):
+        self.path = path
+        self.current_version = current_version
+        self.poll_interval = poll_interval
+        self.ready = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_stat = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._watch, name="bundle-watcher", daemon=True)
+        self.thread.start()
+        return self
+
+    def _watch(self):
+        while not self.stop_event.wait(self.poll_interval):
+            stat = self._stat()
+            if stat is None or stat == self.last_stat:
+                continue
+            self.last_stat = stat
+            try:
+                bundle = load_bundle(self.path)
+            except Exception as e:
+                print(f"Could not load model bundle: {str(e)}")
+                continue
+            if bundle is not None and bundle.version > self.current_version:
+                with self.lock:
+                    self.ready = bundle
+
+    def poll(self):
+        """
+        Newer ModelBundle if one has been loaded since the last call, else None.
+        """
+        with self.lock:
+            bundle, self.ready = self.ready, None
+        if bundle is not None:
+            self.current_version = bundle.version
+        return bundle
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
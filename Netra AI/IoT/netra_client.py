@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Client for the resident Netra worker (netra_worker.py).
+
+Commands are sent as one JSON line over a Unix socket and answered with one
+JSON line: {"ok": bool, "result": ..., "error": str, "latency_ms": float}.
+The caller's trace context (tracing.py) travels with the command, so the
+worker's spans join the caller's trace.
+Callers fall back to running the work in-process when WorkerUnavailable is
+raised. WorkerTimeout means the request was delivered but not answered in
+time: the worker may still be running it (and holding the camera), so
+callers must not start the fallback then.
+
+Usage: python netra_client.py <command> [key=value ...]
+"""
+
+import json
+import socket
+import sys
+import time
+
+import tracing
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+WORKER_SOCKET = "/tmp/netra_worker.sock"   # Unix socket the worker listens on
+CONNECT_TIMEOUT = 0.5                      # Seconds to wait for the worker to accept
+DEFAULT_TIMEOUT = 60                       # Seconds to wait for a reply to other commands
+COMMAND_TIMEOUTS = {                       # Seconds to wait for each command's reply
+    "ping": 2,
+    "stats": 2,
+    "speak": 30,
+    "recognize_start": 10,
+    "recognize_stop": 10,
+    "recognize_toggle": 10,
+    "shutdown": 10,
+    "describe_image": 60,
+    "describe_video": 90,                  # Plus the recording duration
+    "capture": 180,                        # Name prompt and sample capture
+    "train": 600,
+}
+
+
+class WorkerUnavailable(ConnectionError):
+    """
+    The worker is not running, or went away before taking the command.
+    """
+
+
+class WorkerTimeout(TimeoutError):
+    """
+    The command was sent but not answered in time. The worker may still be
+    running it, so do not start a fallback that needs the same resources.
+    """
+
+
+def send_command(command, timeout=None, socket_path=WORKER_SOCKET, **args):
+    """
+    Send `command` with keyword `args` and wait for the reply.
+    `timeout` bounds the wait for the reply (None uses COMMAND_TIMEOUTS).
+    Returns the reply dict; raises WorkerUnavailable if the worker is not reachable,
+    WorkerTimeout if it took the command but did not answer in time, and
+    RuntimeError if the command failed inside the worker.
+    """
+    if timeout is None:
+        timeout = COMMAND_TIMEOUTS.get(command, DEFAULT_TIMEOUT) + float(args.get("duration") or 0)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except OSError as e:
+            raise WorkerUnavailable(f"Netra worker not reachable at {socket_path}: {e}")
+
+        start = time.monotonic()
+        sock.settimeout(timeout)
+        request = {"command": command, "args": args, "trace": tracing.current_json()}
+        try:
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        except OSError as e:
+            raise WorkerUnavailable(f"Netra worker did not take '{command}': {e}")
+
+        data = b""
+        while not data.endswith(b"\n"):
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                raise WorkerTimeout(f"Netra worker did not answer '{command}' in {timeout:g}s; "
+                                    f"it may still be running")
+            if not chunk:
+                raise WorkerUnavailable(f"Netra worker closed the connection during '{command}'")
+            data += chunk
+    finally:
+        sock.close()
+
+    reply = json.loads(data.decode("utf-8"))
+    # Round trip as seen by the client, next to the worker's own timing
+    reply["round_trip_ms"] = (time.monotonic() - start) * 1000
+    if not reply.get("ok"):
+        raise RuntimeError(f"Netra worker failed '{command}': {reply.get('error')}")
+    return reply
+
+
+def worker_available(socket_path=WORKER_SOCKET):
+    try:
+        send_command("ping", timeout=2.0, socket_path=socket_path)
+        return True
+    except (WorkerUnavailable, WorkerTimeout, RuntimeError):
+        return False
+
+
+def _parse_value(value):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(0)
+    kwargs = dict(arg.split("=", 1) for arg in sys.argv[2:])
+    try:
+        print(json.dumps(send_command(sys.argv[1], **{k: _parse_value(v) for k, v in kwargs.items()}),
+                         indent=1))
+    except (WorkerUnavailable, WorkerTimeout, RuntimeError) as e:
+        print(e)
+        sys.exit(1)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+
+"""
+Resident Netra worker.
+
+Keeps the expensive pieces warm across button presses: the camera (with its
+grabber thread), the face model, the audio engine and TTS cache, and the pooled
+Gemini client. final.py and the script CLIs send commands over a Unix
+socket (see netra_client.py) instead of spawning a new Python process.
+
+Commands: ping, stats, speak, capture, train, recognize_start,
+recognize_stop, recognize_toggle, describe_image, describe_video, shutdown.
+Every reply carries the command's latency in ms; 'stats' reports per-command
+count / mean / max / last latency.
+
+Usage: python netra_worker.py
+"""
+
+import contextlib
+import json
+import os
+import socketserver
+import threading
+import time
+
+import cv2
+
+import audio_engine
+import description_cache
+import face_rec
+import gemini_image_describer
+import gemini_video_describer
+import tracing
+from camera import open_camera
+from gemini_client import get_default_client
+from netra_client import WORKER_SOCKET
+from tts_cache import get_default_cache, startup_phrases
+
+
+class NetraWorker:
+    """
+    Owns the warm resources and executes commands one at a time
+    (recognition runs on its own thread alongside).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.recognize_lock = threading.Lock()   # Guards the recognition thread state
+        self.camera = None
+        self.gemini = get_default_client()
+        self.recognize_thread = None
+        self.recognize_stop = None
+        self.latency = {}       # command -> [count, total_ms, max_ms, last_ms]
+        self.started_at = time.time()
+        self.stop_server = None
+        self.handlers = {
+            "ping": self.ping,
+            "stats": self.stats,
+            "speak": self.speak,
+            "capture": self.capture,
+            "train": self.train,
+            "recognize_start": self.recognize_start,
+            "recognize_stop": self.recognize_stop_cmd,
+            "recognize_toggle": self.recognize_toggle,
+            "describe_image": self.describe_image,
+            "describe_video": self.describe_video,
+            "shutdown": self.shutdown,
+        }
+
+    def warm_up(self):
+        """
+        Open everything once so the first button press is as fast as the rest.
+        """
+        start = time.monotonic()
+        audio_engine.get_engine()
+        self.camera = open_camera(0, cv2.CAP_V4L2, width=640, height=480)
+        if self.camera is None:
+            print("Warning: could not open camera; camera commands will fail.")
+        get_default_cache().prewarm_async(startup_phrases())
+        # Loading the model once here also brings cv2.face / NumPy pages in
+        face_rec.load_model()
+        print(f"Netra worker warmed up in {(time.monotonic() - start) * 1000:.0f} ms")
+
+    ##################################
+    # COMMANDS
+    ##################################
+    def ping(self):
+        return {"uptime_s": time.time() - self.started_at}
+
+    def stats(self):
+        result = {
+            name: {"count": c, "mean_ms": total / c, "max_ms": mx, "last_ms": last}
+            for name, (c, total, mx, last) in self.latency.items()
+        }
+        result["camera"] = self.camera.stats() if self.camera else None
+        result["tts_cache"] = get_default_cache().stats()
+        result["gemini"] = self.gemini.stats()
+        result["audio"] = audio_engine.get_engine().stats()
+        result["description_cache"] = description_cache.get_default_cache().stats()
+        result["recognizing"] = self._recognizing()
+        return result
+
+    def speak(self, text=""):
+        face_rec.speak_google(text)
+
+    def _reader(self):
+        """
+        A consumer of the warm camera with its own frame position, so
+        recognition and one-shot commands never take each other's frames.
+        """
+        if self.camera is None:
+            return contextlib.nullcontext()   # The command opens a camera itself
+        return self.camera.reader()
+
+    def capture(self):
+        name = face_rec.record_name_from_mic_google()
+        if not name:
+            raise RuntimeError("No name recognized")
+        # No display on the device: never open windows from the worker
+        with self._reader() as camera:
+            face_rec.capture_samples(name, face_rec.NUM_SAMPLES, camera=camera, headless=True)
+        return name
+
+    def train(self, full=False):
+        # A running recognizer picks the new bundle up by itself
+        face_rec.train_model(full=full)
+
+    def _recognizing(self):
+        return self.recognize_thread is not None and self.recognize_thread.is_alive()
+
+    def _recognize(self, stop_event):
+        with self._reader() as camera:
+            face_rec.recognize_loop(camera=camera, stop_event=stop_event, headless=True)
+
+    def _start_recognition(self):
+        if self._recognizing():
+            return "already running"
+        self.recognize_stop = threading.Event()
+        self.recognize_thread = threading.Thread(target=self._recognize, args=(self.recognize_stop,),
+                                                 name="recognize", daemon=True)
+        self.recognize_thread.start()
+        return "started"
+
+    def _stop_recognition(self):
+        if not self._recognizing():
+            return "not running"
+        self.recognize_stop.set()
+        self.recognize_thread.join(timeout=10)
+        self.recognize_thread = None
+        return "stopped"
+
+    def recognize_start(self):
+        with self.recognize_lock:
+            return self._start_recognition()
+
+    def recognize_stop_cmd(self):
+        with self.recognize_lock:
+            return self._stop_recognition()
+
+    def recognize_toggle(self):
+        with self.recognize_lock:
+            return self._stop_recognition() if self._recognizing() else self._start_recognition()
+
+    def describe_image(self, stream=False, use_cache=True):
+        with self._reader() as camera:
+            if stream:
+                return gemini_image_describer.describe_image_streaming(camera, self.gemini, use_cache)
+            description = gemini_image_describer.describe_image(camera, self.gemini, use_cache)
+        gemini_image_describer.play_tts(description)
+        return description
+
+    def describe_video(self, duration=5, stream=False, keyframes=False, upload=False):
+        with self._reader() as camera:
+            if stream:
+                return gemini_video_describer.describe_video_streaming(duration, camera, self.gemini,
+                                                                       keyframes, upload)
+            description = gemini_video_describer.describe_video(duration, camera, self.gemini,
+                                                                keyframes, upload)
+        gemini_video_describer.play_tts(description)
+        return description
+
+    def shutdown(self):
+        if self.stop_server is not None:
+            threading.Thread(target=self.stop_server, daemon=True).start()
+        return "shutting down"
+
+    ##################################
+    # DISPATCH
+    ##################################
+    def execute(self, command, args, trace=None):
+        """
+        Run one command and return the reply dict, including its latency.
+        With the caller's `trace` context, the command is recorded as a span
+        of that trace.
+        """
+        handler = self.handlers.get(command)
+        start = time.monotonic()
+        if handler is None:
+            reply = {"ok": False, "error": f"unknown command '{command}'"}
+        else:
+            # Recognition start/stop and status queries must not wait behind
+            # a long describe or capture command (each consumer has its own camera reader)
+            lock = None if command in ("ping", "stats", "recognize_start", "recognize_stop",
+                                       "recognize_toggle", "shutdown") else self.lock
+            try:
+                with tracing.activated(trace):
+                    if lock:
+                        with lock:
+                            result = self._traced(command, handler, args, start)
+                    else:
+                        result = self._traced(command, handler, args, start)
+                reply = {"ok": True, "result": result}
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+        latency_ms = (time.monotonic() - start) * 1000
+        reply["latency_ms"] = latency_ms
+        count, total, mx, _ = self.latency.get(command, (0, 0.0, 0.0, 0.0))
+        self.latency[command] = [count + 1, total + latency_ms, max(mx, latency_ms), latency_ms]
+        print(f"{command}: {latency_ms:.0f} ms ({'ok' if reply['ok'] else reply['error']})")
+        return reply
+
+    def _traced(self, command, handler, args, received):
+        if tracing.current() is None:
+            return handler(**args)
+        # Time spent waiting for the lock behind another command shows up too
+        tracing.record_span("worker_queue", received, command=command)
+        with tracing.span(f"worker:{command}"):
+            return handler(**args)
+
+    def close(self):
+        self.recognize_stop_cmd()
+        if self.camera is not None:
+            self.camera.release()
+        self.gemini.close()
+        audio_engine.get_engine().close()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line.decode("utf-8"))
+            reply = self.server.worker.execute(request["command"], request.get("args") or {},
+                                               request.get("trace"))
+        except (ValueError, KeyError) as e:
+            reply = {"ok": False, "error": f"bad request: {e}", "latency_ms": 0.0}
+        self.wfile.write(json.dumps(reply, default=str).encode("utf-8") + b"\n")
+
+
+class _WorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path=WORKER_SOCKET):
+    worker = NetraWorker()
+    worker.warm_up()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = _WorkerServer(socket_path, _RequestHandler)
+    server.worker = worker
+    worker.stop_server = server.shutdown
+    print("Netra worker listening on", socket_path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        worker.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        print("Netra worker stopped")
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+
+"""
+Multi-core face recognition.
+
+cv2's Haar and LBPH paths run one frame on one core, so frames are spread
+over a pool of worker processes instead:
+
+- a capture process publishes camera frames into the shared-memory ring
+  (camera_service.py; an already running camera service is reused);
+- the dispatcher (this process) hands out frame sequence numbers, never
+  pixels, over one task queue that workers block on. It puts a task there
+  only when a worker is free, holding up to MAX_IN_FLIGHT_PER_WORKER
+  further frames per worker itself, so frames are picked up long before
+  the ring wraps (one that is overwritten anyway is counted as dropped);
+- each worker attaches to the ring, copies its frame, runs a full-frame
+  detection with its own detector and returns the boxes with their
+  normalized face crops;
+- results are put back in frame order and tracked by one FaceTracker here,
+  exactly as in recognize_loop. Only the crops of tracks due for a
+  prediction (new, or every PREDICT_REFRESH_FRAMES) go back to the pool,
+  handed to the next free worker ahead of held frames, to be scored by a
+  worker's recognizer.
+
+Per frame, the end-to-end latency from capture to fused result is recorded.
+Workers that die are restarted (up to MAX_RESTARTS). The model is loaded
+once per worker at start; new bundles are not picked up while running.
+
+Usage: python face_rec.py recognize --workers 4 [--headless] [--preview]
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+
+import camera_service
+import face_rec
+from face_store import normalize_face
+from face_tracker import FaceTracker
+import feature_matcher
+import model_bundle
+from speech_queue import AnnouncementScheduler
+from tts_cache import get_default_cache
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+WORKERS = 4                   # Recognition processes (one per core on a Pi 4)
+MAX_IN_FLIGHT_PER_WORKER = 1  # Frames queued per worker beyond the one it is working on
+SERVICE_START_TIMEOUT = 5.0   # Seconds to wait for a capture process we started
+WORKER_START_TIMEOUT = 60.0   # Seconds for every worker to load its model
+RESULT_TIMEOUT = 5.0          # A frame or prediction not answered by then is given up
+WORKER_CHECK_INTERVAL = 1.0   # Seconds between worker liveness checks
+MAX_RESTARTS = 3              # Worker restarts before parallel recognition gives up
+
+
+def _worker_main(index, tasks, results, model_path, shm_name):
+    # Each process owns a detector and recognizer; nothing is shared but the ring
+    cv2.setNumThreads(1)
+    try:
+        model = model_bundle.load_bundle(model_path) if model_path else face_rec.load_model()
+        if model is None:
+            raise FileNotFoundError("No trained model found. Please run 'train' first.")
+        subscriber = camera_service.CameraSubscriber(name=shm_name)
+        # Consecutive frames go to different workers, so no ROI search: always scan fully
+        detector = face_rec.FaceDetector(full_scan_interval=1)
+    except Exception as e:
+        results.put(("failed", index, None, str(e)))
+        return
+    results.put(("ready", index, None, None))
+    try:
+        while True:
+            # ("detect", seq), ("predict", seq, crops), or None to exit
+            task = tasks.get()
+            if task is None:
+                return
+            if task[0] == "predict":
+                _, seq, crops = task
+                predictions = feature_matcher.predict_faces(model.recognizer, crops)
+                results.put(("predicted", index, seq, [(int(label), float(conf)) for label, conf in predictions]))
+                continue
+            seq = task[1]
+            frame, captured_at = subscriber.read_seq(seq)
+            if frame is None:
+                results.put(("dropped", index, seq, None))
+                continue
+            detector.reset()
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            boxes = detector.detect(gray)
+            crops = [normalize_face(gray[y:y+h, x:x+w]) for (x, y, w, h) in boxes]
+            results.put(("detected", index, seq, (captured_at, boxes, crops)))
+    finally:
+        subscriber.release()
+
+
+class ParallelRecognizer:
+    """
+    Worker pool plus the in-order tracking and fusion of its results.
+    """
+
+    def __init__(self, workers=WORKERS, model_path=None, shm_name=camera_service.SHM_NAME):
+        self.workers = max(1, workers)
+        self.model_path = model_path
+        self.shm_name = shm_name
+        self.model = model_bundle.load_bundle(model_path) if model_path else face_rec.load_model()
+        if self.model is None:
+            raise FileNotFoundError("No trained model found. Please run 'train' first.")
+        self.tracker = FaceTracker(refresh_interval=face_rec.PREDICT_REFRESH_FRAMES,
+                                   unknown_threshold=face_rec.UNKNOWN_CONFIDENCE[self.model.backend])
+        self.context = multiprocessing.get_context("spawn")
+        self.tasks = self.context.Queue()
+        self.results = self.context.Queue()
+        self.processes = [self._spawn(i) for i in range(self.workers)]
+        self.in_flight = {}           # seq -> dispatch time (monotonic)
+        self.held = deque()           # submitted frames no worker is free for yet
+        self.held_predictions = deque()  # (seq, crops) waiting for a free worker
+        self.assigned = set()         # ("detect" | "predict", seq) handed to a worker, not answered
+        self.done = {}                # seq -> worker result, waiting for earlier frames
+        self.predicted = {}           # seq -> predictions for the frame at the head
+        self.waiting = None           # head frame waiting for its predictions
+        self.order = deque()          # dispatched seqs, oldest first
+        self.latencies = []
+        self.frames = 0
+        self.dropped = 0
+        self.predictions = 0
+        self.restarts = 0
+        self.last_check = 0.0
+        self.started_at = None
+
+    def _spawn(self, index):
+        return self.context.Process(target=_worker_main, name=f"recognize-{index}", daemon=True,
+                                    args=(index, self.tasks, self.results, self.model_path, self.shm_name))
+
+    @property
+    def capacity(self):
+        return self.workers * (1 + MAX_IN_FLIGHT_PER_WORKER)
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        # Loading models in parallel; wait until every worker can take frames
+        try:
+            for _ in self.processes:
+                kind, index, _, error = self.results.get(timeout=WORKER_START_TIMEOUT)
+                if kind == "failed":
+                    raise RuntimeError(f"Recognition worker {index} failed to start: {error}")
+        except queue.Empty:
+            self.close()
+            raise RuntimeError(f"Recognition workers not ready after {WORKER_START_TIMEOUT:.0f} s")
+        except RuntimeError:
+            self.close()
+            raise
+        self.started_at = time.monotonic()
+        return self
+
+    def check_workers(self):
+        """
+        Restart workers that died. Their frames time out as dropped.
+        Raises RuntimeError after MAX_RESTARTS restarts.
+        """
+        now = time.monotonic()
+        if now - self.last_check < WORKER_CHECK_INTERVAL:
+            return
+        self.last_check = now
+        for index, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+            if self.restarts >= MAX_RESTARTS:
+                raise RuntimeError(f"Recognition worker {index} died (exit code {process.exitcode}); "
+                                   f"giving up after {self.restarts} restarts")
+            print(f"Recognition worker {index} died (exit code {process.exitcode}); restarting")
+            self.restarts += 1
+            self.processes[index] = self._spawn(index)
+            self.processes[index].start()
+
+    def submit(self, seq):
+        """
+        Hand frame `seq` to the pool. Returns False while the pool is full.
+        """
+        if len(self.in_flight) >= self.capacity:
+            return False
+        self.in_flight[seq] = time.monotonic()
+        self.order.append(seq)
+        self.held.append(seq)
+        self._dispatch()
+        return True
+
+    def _dispatch(self):
+        # One task per free worker, predictions first: they hold up the in-order output.
+        # Returns whether anything was handed out.
+        dispatched = False
+        while len(self.assigned) < self.workers:
+            if self.held_predictions:
+                seq, crops = self.held_predictions.popleft()
+                self.assigned.add(("predict", seq))
+                self.tasks.put(("predict", seq, crops))
+            elif self.held:
+                seq = self.held.popleft()
+                self.assigned.add(("detect", seq))
+                # Time out from when a worker gets the frame, not from submit()
+                self.in_flight[seq] = time.monotonic()
+                self.tasks.put(("detect", seq))
+            else:
+                break
+            dispatched = True
+        return dispatched
+
+    def _head_ready(self):
+        if not self.order:
+            return False
+        head = self.order[0]
+        return head in self.predicted if self.waiting is not None else head in self.done
+
+    def collect(self, timeout=0.0):
+        """
+        Gather worker results and return the frames now complete in order,
+        as (seq, [(box, name, confidence, known)], latency in seconds).
+        With a timeout, waits until the oldest frame is complete or the
+        held frames have all gone to workers.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                wait = max(0.0, deadline - time.monotonic())
+                kind, index, seq, payload = self.results.get(timeout=wait) if wait else \
+                    self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "failed":
+                raise RuntimeError(f"Recognition worker {index} failed to restart: {payload}")
+            if kind == "ready":
+                continue
+            self.assigned.discard(("predict" if kind == "predicted" else "detect", seq))
+            if seq in self.in_flight:
+                if kind == "predicted":
+                    self.predicted[seq] = payload
+                else:
+                    self.done[seq] = (kind, payload)
+            dispatched = self._dispatch()
+            if timeout and (self._head_ready() or (dispatched and not self.held)):
+                break
+        return self._emit()
+
+    def _emit(self):
+        ordered = []
+        now = time.monotonic()
+        while self.order:
+            seq = self.order[0]
+            if self.waiting is not None:
+                if seq not in self.predicted and now - self.waiting[4] < RESULT_TIMEOUT:
+                    break
+                self.assigned.discard(("predict", seq))
+                # Lost predictions are skipped; those tracks stay due and are scored next frame
+                _, captured_at, tracks, pending, _ = self.waiting
+                for track, (label, confidence) in zip(pending, self.predicted.pop(seq, [])):
+                    self.tracker.add_prediction(track, label, confidence)
+                self.waiting = None
+            else:
+                if seq not in self.done:
+                    # A worker that died mid-frame must not stall the stream forever
+                    if seq in self.held or now - self.in_flight[seq] < RESULT_TIMEOUT:
+                        break
+                    self.assigned.discard(("detect", seq))
+                    self.done[seq] = ("dropped", None)
+                kind, payload = self.done.pop(seq)
+                if kind != "detected":
+                    self.order.popleft()
+                    del self.in_flight[seq]
+                    self.dropped += 1
+                    continue
+                captured_at, boxes, crops = payload
+                # Same tracking as RecognitionPipeline: only new and refresh-due tracks are scored
+                tracks = self.tracker.update(boxes)
+                due = [(track, crop) for track, crop in zip(tracks, crops) if self.tracker.needs_prediction(track)]
+                if due:
+                    self.held_predictions.append((seq, [crop for _, crop in due]))
+                    self._dispatch()
+                    self.predictions += len(due)
+                    self.waiting = (seq, captured_at, tracks, [track for track, _ in due], now)
+                    continue
+            self.order.popleft()
+            del self.in_flight[seq]
+            self.frames += 1
+            labels = self.model.labels
+            results = [(track.box, labels.get(track.label_id, "Unknown"), track.confidence, track.known)
+                       for track in tracks]
+            ordered.append((seq, results, time.monotonic() - captured_at))
+        return ordered
+
+    def record_latency(self, latency):
+        self.latencies.append(latency)
+        if len(self.latencies) > 1000:
+            del self.latencies[0]
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "workers": self.workers,
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "predictions": self.predictions,
+            "restarts": self.restarts,
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+            "p50_latency_ms": lat[len(lat) // 2] * 1000 if lat else 0.0,
+            "p95_latency_ms": lat[int(len(lat) * 0.95)] * 1000 if lat else 0.0,
+            "max_latency_ms": lat[-1] * 1000 if lat else 0.0,
+        }
+
+    def close(self):
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+
+
+def start_capture(source="0", fps=30, name=camera_service.SHM_NAME, zero_copy=False):
+    """
+    Subscribe to the running camera service, or start a capture process that
+    publishes `source`. Returns (subscriber, process or None).
+    """
+    subscriber = camera_service.subscribe(name=name, zero_copy=zero_copy)
+    if subscriber is not None:
+        return subscriber, None
+    process = multiprocessing.get_context("spawn").Process(
+        target=camera_service.serve, kwargs={"source": source, "fps": fps, "name": name},
+        name="camera-capture", daemon=True)
+    process.start()
+    deadline = time.monotonic() + SERVICE_START_TIMEOUT
+    while time.monotonic() < deadline and process.is_alive():
+        subscriber = camera_service.subscribe(name=name, zero_copy=zero_copy)
+        if subscriber is not None:
+            return subscriber, process
+        time.sleep(0.05)
+    process.terminate()
+    raise IOError(f"Camera capture from {source} did not start")
+
+
+def stop_capture(subscriber, process):
+    subscriber.release()
+    if process is not None:
+        process.terminate()       # SIGTERM: serve() unlinks the shared memory
+        process.join(timeout=2.0)
+
+
+def run(recognizer, subscriber, stop_event=None, on_result=None, max_frames=None):
+    """
+    Dispatch the newest frames to the pool until `stop_event` is set (or
+    `max_frames` results), calling on_result(seq, results) in frame order.
+    """
+    emitted = 0
+    while (stop_event is None or not stop_event.is_set()) and (max_frames is None or emitted < max_frames):
+        recognizer.check_workers()
+        if len(recognizer.in_flight) < recognizer.capacity and not recognizer.held:
+            ret, _ = subscriber.read(timeout=0.5)
+            if ret:
+                recognizer.submit(subscriber.last_seq)
+            else:
+                if not subscriber.alive():
+                    print("Camera service stopped.")
+                    break
+                continue
+            ordered = recognizer.collect()
+        else:
+            # Every worker busy: wait for a result instead of spinning
+            ordered = recognizer.collect(timeout=0.05)
+        for seq, results, latency in ordered:
+            recognizer.record_latency(latency)
+            emitted += 1
+            if on_result is not None:
+                on_result(seq, results)
+    return emitted
+
+
+def recognize_parallel(workers=WORKERS, stop_event=None, headless=face_rec.HEADLESS, preview=None,
+                       source="0"):
+    """
+    recognize_loop on `workers` processes: same announcements, same
+    windows (unless headless) and preview, frames from the shared ring.
+    """
+    stop_event = stop_event or threading.Event()
+    # Only the frame's sequence number is used here; pixels are read with read_seq()
+    subscriber, capture = start_capture(source, zero_copy=True)
+    try:
+        recognizer = ParallelRecognizer(workers).start()
+    except (FileNotFoundError, RuntimeError) as e:
+        print(str(e))
+        stop_capture(subscriber, capture)
+        return
+    get_default_cache().prewarm_async(list(recognizer.model.labels.values()) + ["Unknown"])
+    announcer = AnnouncementScheduler(face_rec.start_speaking, face_rec.stop_speaking,
+                                      cooldown=face_rec.ANNOUNCE_COOLDOWN).start()
+    announcer.announce("Recognition started." if headless else "Recognition started. Press escape to stop.",
+                       urgent=True)
+
+    def on_result(seq, results):
+        for _, name, _, known in results:
+            name = name if known else "Unknown"
+            announcer.announce(name, key=name)
+        want_preview = preview is not None and preview.due()
+        if headless and not want_preview:
+            return
+        # The frame may already have been overwritten; then there is nothing to show
+        frame = subscriber.read_seq(seq)[0]
+        if frame is None:
+            return
+        face_rec.draw_results(frame, results)
+        if want_preview:
+            preview.publish(frame if headless else frame.copy())
+        if not headless:
+            cv2.imshow("Recognizing...", frame)
+            if cv2.waitKey(1) & 0xFF == 27:  # ESC to exit
+                stop_event.set()
+
+    try:
+        run(recognizer, subscriber, stop_event, on_result)
+    except RuntimeError as e:
+        print(str(e))
+    finally:
+        print("Parallel recognition stats:", recognizer.stats())
+        print("Announcer stats:", announcer.stats())
+        announcer.stop()
+        recognizer.close()
+        stop_capture(subscriber, capture)
+        if not headless:
+            cv2.destroyAllWindows()
+        face_rec.speak_google("Recognition stopped.")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+"""
+Throttled MJPEG preview for headless field debugging.
+
+The recognition loop offers annotated frames with publish(); at most
+MAX_FPS of them are kept, and only while a client is connected, so an
+unwatched preview costs one time check per frame. Frames are JPEG-encoded
+by the HTTP handler threads, once per published frame, never in the loop.
+
+  GET /            a small page showing the stream
+  GET /stream      multipart/x-mixed-replace MJPEG stream
+  GET /snapshot    the latest frame as one JPEG
+
+Binds to localhost by default; use an SSH tunnel to watch from a laptop.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+HOST = "127.0.0.1"
+PORT = 8090
+MAX_FPS = 2.0             # Preview frames per second, at most
+JPEG_QUALITY = 60
+BOUNDARY = "netraframe"
+PAGE = b"<html><body style='margin:0;background:#000'><img src='/stream' style='width:100%'></body></html>"
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        preview = self.server.preview
+        if self.path == "/":
+            self._send(200, "text/html", PAGE)
+        elif self.path == "/snapshot":
+            # Frames are only published while someone is watching; wait for a fresh one
+            preview.add_client()
+            try:
+                data = preview.wait_jpeg(preview.seq, timeout=5.0)[1]
+            finally:
+                preview.remove_client()
+            if data is None:
+                self._send(503, "text/plain", b"no frame yet")
+            else:
+                self._send(200, "image/jpeg", data)
+        elif self.path == "/stream":
+            self._stream(preview)
+        else:
+            self._send(404, "text/plain", b"not found")
+
+    def _send(self, status, content_type, data):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, preview):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        preview.add_client()
+        try:
+            seq = 0
+            while preview.running:
+                seq, data = preview.wait_jpeg(seq, timeout=1.0)
+                if data is None:
+                    continue
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(data)}\r\n\r\n".encode("ascii"))
+                self.wfile.write(data + b"\r\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            preview.remove_client()
+
+
+class PreviewServer:
+    """
+    Holds the latest published frame and serves it over HTTP.
+    """
+
+    def __init__(self, host=HOST, port=PORT, max_fps=MAX_FPS, quality=JPEG_QUALITY):
+        self.interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.quality = quality
+        self.cond = threading.Condition()
+        self.frame = None
+        self.seq = 0
+        self.jpeg = None
+        self.jpeg_seq = 0
+        self.clients = 0
+        self.last_publish = 0.0
+        self.published = 0
+        self.encoded = 0
+        self.running = True
+        self.httpd = ThreadingHTTPServer((host, port), PreviewHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.preview = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="preview-http", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def due(self):
+        """
+        True if a frame published now would be kept. Check before annotating
+        so unwatched or throttled frames cost nothing.
+        """
+        return self.clients > 0 and time.monotonic() - self.last_publish >= self.interval
+
+    def publish(self, frame):
+        """
+        Offer a BGR frame; it is kept (not copied) if due(). The caller must
+        not modify it afterwards.
+        """
+        if not self.due():
+            return False
+        with self.cond:
+            self.frame = frame
+            self.seq += 1
+            self.last_publish = time.monotonic()
+            self.published += 1
+            self.cond.notify_all()
+        return True
+
+    def wait_jpeg(self, after_seq, timeout=None):
+        """
+        Wait for a frame newer than `after_seq`. Returns (seq, JPEG bytes),
+        or (after_seq, None) on timeout.
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > after_seq or not self.running, timeout):
+                return after_seq, None
+            if self.frame is None:
+                return after_seq, None
+            if self.jpeg_seq != self.seq:
+                ok, buf = cv2.imencode(".jpg", self.frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+                self.jpeg = buf.tobytes() if ok else None
+                self.jpeg_seq = self.seq
+                self.encoded += 1
+            return self.seq, self.jpeg
+
+    def add_client(self):
+        with self.cond:
+            self.clients += 1
+
+    def remove_client(self):
+        with self.cond:
+            self.clients -= 1
+
+    def stats(self):
+        return {"clients": self.clients, "published": self.published, "encoded": self.encoded}
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""
+Simulated RPi.GPIO backend.
+
+Implements the subset of the RPi.GPIO module API that final.py and
+button_input.py use, so `import sim_gpio as GPIO` works on any Linux box.
+Pin levels are driven by scripted sequences: replay() applies
+(time_offset_s, pin, level) steps on a background thread and fires edge
+callbacks like RPi.GPIO's callback thread. press() builds the steps for one
+press, including contact bounce.
+"""
+
+import json
+import threading
+import time
+
+BCM = 11
+BOARD = 10
+IN = 1
+OUT = 0
+PUD_UP = 22
+PUD_DOWN = 21
+PUD_OFF = 20
+LOW = 0
+HIGH = 1
+RISING = 31
+FALLING = 32
+BOTH = 33
+
+_lock = threading.Lock()
+_levels = {}
+_callbacks = {}
+_edge_times = []      # (monotonic time, pin, level) of every applied change
+
+
+def setmode(mode):
+    pass
+
+
+def setwarnings(flag):
+    pass
+
+
+def setup(pin, direction, pull_up_down=PUD_OFF, initial=None):
+    with _lock:
+        if initial is not None:
+            _levels[pin] = initial
+        else:
+            _levels[pin] = HIGH if pull_up_down == PUD_UP else LOW
+
+
+def input(pin):
+    with _lock:
+        return _levels.get(pin, LOW)
+
+
+def output(pin, level):
+    set_level(pin, level)
+
+
+def add_event_detect(pin, edge, callback=None, bouncetime=None):
+    with _lock:
+        _callbacks[pin] = (edge, callback)
+
+
+def add_event_callback(pin, callback):
+    with _lock:
+        edge, _ = _callbacks.get(pin, (BOTH, None))
+        _callbacks[pin] = (edge, callback)
+
+
+def remove_event_detect(pin):
+    with _lock:
+        _callbacks.pop(pin, None)
+
+
+def cleanup(pins=None):
+    with _lock:
+        for pin in (pins if pins is not None else list(_levels)):
+            _levels.pop(pin, None)
+            _callbacks.pop(pin, None)
+
+
+def set_level(pin, level):
+    """
+    Change a pin level and fire its edge callback, if one matches.
+    """
+    with _lock:
+        previous = _levels.get(pin, HIGH)
+        _levels[pin] = level
+        edge, callback = _callbacks.get(pin, (None, None))
+        _edge_times.append((time.monotonic(), pin, level))
+    if previous == level or callback is None:
+        return
+    rising = level == HIGH
+    if edge == BOTH or (edge == RISING and rising) or (edge == FALLING and not rising):
+        callback(pin)
+
+
+def press(pin, at, duration, bounces=3, bounce_interval=0.002):
+    """
+    Steps for one active-low press starting at `at` seconds and held for
+    `duration`, with `bounces` chattering edges on press and on release.
+    """
+    steps = []
+    for edge_at, settled in ((at, LOW), (at + duration, HIGH)):
+        t = edge_at
+        for _ in range(bounces):
+            steps.append((t, pin, settled))
+            steps.append((t + bounce_interval / 2, pin, HIGH if settled == LOW else LOW))
+            t += bounce_interval
+        steps.append((t, pin, settled))
+    return steps
+
+
+def load_script(path):
+    """
+    Load steps from JSON: a list of [time_offset_s, pin, level] or of
+    {"press": pin, "at": s, "duration": s} entries.
+    """
+    with open(path, "r") as f:
+        entries = json.load(f)
+    steps = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            steps += press(entry["press"], entry["at"], entry["duration"],
+                           entry.get("bounces", 3))
+        else:
+            steps.append(tuple(entry))
+    return steps
+
+
+def replay(steps, wait=False):
+    """
+    Apply steps at their time offsets on a background thread.
+    Returns the thread; with wait=True, blocks until the script is done.
+    """
+    steps = sorted(steps, key=lambda step: step[0])
+
+    def run():
+        start = time.monotonic()
+        for offset, pin, level in steps:
+            delay = start + offset - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            set_level(pin, level)
+
+    thread = threading.Thread(target=run, name="sim-gpio-replay", daemon=True)
+    thread.start()
+    if wait:
+        thread.join()
+    return thread
+
+
+def edge_log():
+    """
+    Every level change applied so far, as (monotonic time, pin, level).
+    """
+    with _lock:
+        return list(_edge_times)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+"""
+Sentence-by-sentence speech for streamed text.
+
+Text fragments (e.g. from GeminiClient.describe_stream) are fed in as they
+arrive and split into sentences, and long sentences into clauses. The
+chunks are synthesized concurrently on a small thread pool and handed to
+playback strictly in order as each one completes, so the first words are
+heard as soon as the first chunk is synthesized rather than after the
+whole description is generated, synthesized and queued. Synthesis goes
+through tts_backends, which falls back to a local engine when gTTS is slow.
+"""
+
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import audio_engine
+import tracing
+from tts_backends import get_default_synthesizer
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+LOOKAHEAD = 3             # Chunks synthesized ahead of the one playing
+SYNTH_WORKERS = 3         # Chunks synthesized concurrently
+MIN_SENTENCE_CHARS = 20   # Shorter sentences are joined with the next one
+CLAUSE_CHARS = 90         # Longer sentences are split at clause boundaries
+MAX_SENTENCE_CHARS = 200  # Force a break (at a comma or space) beyond this
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+_CLAUSE_BREAK = re.compile(r"[,;:]\s+")
+
+
+class SentenceSplitter:
+    """
+    Incremental sentence splitter: feed() fragments, get back the
+    chunks completed so far; flush() returns whatever is left. Sentences
+    longer than `clause_chars` are split further at commas, semicolons
+    and colons.
+    """
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS, max_chars=MAX_SENTENCE_CHARS,
+                 clause_chars=CLAUSE_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.clause_chars = clause_chars
+        self.buffer = ""
+
+    def feed(self, text):
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self.buffer):
+            if match.end() - start < self.min_chars:
+                continue
+            sentences += self._clauses(self.buffer[start:match.end()].strip())
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        # Very long run-on text: break at the last clause or word boundary
+        while len(self.buffer) > self.max_chars:
+            head = self.buffer[:self.max_chars]
+            breaks = [m.end() for m in _CLAUSE_BREAK.finditer(head)]
+            cut = breaks[-1] if breaks else (head.rfind(" ") + 1 or self.max_chars)
+            sentences.append(self.buffer[:cut].strip())
+            self.buffer = self.buffer[cut:]
+        return [s for s in sentences if s]
+
+    def _clauses(self, sentence):
+        if self.clause_chars is None or len(sentence) <= self.clause_chars:
+            return [sentence]
+        chunks = []
+        start = 0
+        for match in _CLAUSE_BREAK.finditer(sentence):
+            # Keep clauses long enough to sound natural on their own
+            if match.end() - start >= self.min_chars and len(sentence) - match.end() >= self.min_chars:
+                chunks.append(sentence[start:match.end()].strip())
+                start = match.end()
+        chunks.append(sentence[start:].strip())
+        return chunks
+
+    def flush(self):
+        rest, self.buffer = self.buffer.strip(), ""
+        return self._clauses(rest) if rest else []
+
+
+def play_file(path):
+    """
+    Queue one audio file on the audio engine and return its Playback once it
+    has started, so the next sentence is chained gaplessly behind it.
+    """
+    playback = audio_engine.get_engine().play(path)
+    playback.wait_started()
+    return playback
+
+
+class SpeechPipeline:
+    """
+    Two-stage pipeline: synthesize(chunk) -> audio, then play(audio).
+    play() either blocks until the audio is done or returns a handle with
+    wait() (as play_file does) once playback has started.
+
+    Up to `workers` chunks are synthesized at once, and at most `lookahead`
+    chunks are in flight ahead of playback; audio is always played in text
+    order. Both stages are injectable so the pipeline can be driven by
+    stand-ins.
+    """
+
+    def __init__(self, synthesize=None, play=play_file, lookahead=LOOKAHEAD, workers=SYNTH_WORKERS):
+        self.synthesize = synthesize or get_default_synthesizer()
+        self.play = play
+        self.splitter = SentenceSplitter()
+        self.sentences = queue.Queue()
+        self.audio = queue.Queue(max(1, lookahead))     # futures, in text order
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="speech-synth")
+        self.started_at = None
+        self.first_text_at = None
+        self.first_audio_at = None
+        self.finished_at = None
+        self.spoken = 0
+        self.failed = 0
+        self.last_playback = None
+        # Pool threads don't see the caller's trace; spans are attached explicitly
+        self.trace = tracing.current()
+        self.threads = [
+            threading.Thread(target=self._dispatch_loop, name="speech-dispatch", daemon=True),
+            threading.Thread(target=self._play_loop, name="speech-play", daemon=True),
+        ]
+
+    def start(self):
+        self.started_at = time.monotonic()
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def feed(self, text):
+        """
+        Add a fragment of text; complete sentences are queued for speech.
+        """
+        if self.first_text_at is None:
+            self.first_text_at = time.monotonic()
+            tracing.mark("first_text", context=self.trace)
+        for sentence in self.splitter.feed(text):
+            self.sentences.put(sentence)
+
+    def finish(self, timeout=None):
+        """
+        Queue the remaining text and wait until everything has been spoken.
+        """
+        for sentence in self.splitter.flush():
+            self.sentences.put(sentence)
+        self.sentences.put(None)
+        for thread in self.threads:
+            thread.join(timeout)
+        # play() may return as soon as the clip starts; wait for the last one
+        if self.last_playback is not None:
+            self.last_playback.wait(timeout)
+        self.pool.shutdown(wait=False)
+        self.finished_at = time.monotonic()
+
+    def _synthesize(self, chunk):
+        try:
+            with tracing.span("tts", context=self.trace, chars=len(chunk)):
+                return self.synthesize(chunk)
+        except Exception as e:
+            print(f"Speech synthesis failed: {str(e)}")
+            return None
+
+    def _dispatch_loop(self):
+        while True:
+            sentence = self.sentences.get()
+            if sentence is None:
+                self.audio.put(None)
+                return
+            # Blocks once `lookahead` chunks are waiting, which bounds the work in flight
+            self.audio.put(self.pool.submit(self._synthesize, sentence))
+
+    def _play_loop(self):
+        while True:
+            future = self.audio.get()
+            if future is None:
+                return
+            audio = future.result()
+            if audio is None:
+                self.failed += 1
+                continue
+            if self.first_audio_at is None:
+                self.first_audio_at = time.monotonic()
+            try:
+                self.last_playback = self.play(audio)
+                if self.spoken == 0:
+                    tracing.mark("first_audio", context=self.trace)
+                self.spoken += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Speech playback failed: {str(e)}")
+
+    def stats(self):
+        def since_start(t):
+            return (t - self.started_at) * 1000 if t is not None and self.started_at else None
+        return {
+            "sentences_spoken": self.spoken,
+            "failed": self.failed,
+            "first_text_ms": since_start(self.first_text_at),
+            "first_audio_ms": since_start(self.first_audio_at),
+            "total_ms": since_start(self.finished_at),
+        }
+
+
+def speak_stream(fragments, synthesize=None, play=play_file, lookahead=LOOKAHEAD, workers=SYNTH_WORKERS):
+    """
+    Speak an iterable of text fragments as they arrive.
+    Returns (full text, pipeline stats).
+    """
+    pipeline = SpeechPipeline(synthesize, play, lookahead, workers).start()
+    text = []
+    try:
+        for fragment in fragments:
+            text.append(fragment)
+            pipeline.feed(fragment)
+    finally:
+        pipeline.finish()
+    return "".join(text), pipeline.stats()
+
+
+def speak_text(text, synthesize=None, play=play_file, lookahead=LOOKAHEAD, workers=SYNTH_WORKERS):
+    """
+    Speak a complete text chunk by chunk. Returns the pipeline stats.
+    """
+    return speak_stream([text], synthesize, play, lookahead, workers)[1]
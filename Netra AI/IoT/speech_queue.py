@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+"""
+Non-blocking announcement scheduler.
+
+The vision loop calls announce() and carries on; a worker thread does the
+slow part (TTS synthesis and playback). Duplicate pending announcements are
+coalesced, each identity has a cooldown, and urgent messages jump the queue
+and cut off a routine announcement that is already playing.
+"""
+
+import threading
+import time
+from collections import deque
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+ANNOUNCE_COOLDOWN = 10.0   # Seconds before the same identity is announced again
+MAX_QUEUE_DEPTH = 8        # Routine announcements kept; the oldest is dropped beyond this
+
+
+class _Announcement:
+    def __init__(self, text, key, urgent):
+        self.text = text
+        self.key = key
+        self.urgent = urgent
+        self.enqueued_at = time.monotonic()
+
+
+class AnnouncementScheduler:
+    """
+    Queue of spoken announcements served by one worker thread.
+
+    speak_fn(text) either speaks and blocks, or starts playback and returns
+    a handle with wait() and started_at (an audio_engine.Playback), which the
+    worker then waits on. With a handle, latency runs from announce() to the
+    first sample, and stop_fn(handle), if given, cuts off this scheduler's own
+    routine clip when an urgent message preempts it.
+    """
+
+    def __init__(self, speak_fn, stop_fn=None, cooldown=ANNOUNCE_COOLDOWN,
+                 max_depth=MAX_QUEUE_DEPTH):
+        self.speak_fn = speak_fn
+        self.stop_fn = stop_fn
+        self.cooldown = cooldown
+        self.max_depth = max_depth
+        self.urgent = deque()
+        self.routine = deque()
+        self.pending = {}            # key -> _Announcement waiting in a queue
+        self.last_spoken = {}        # key -> monotonic time playback started
+        self.current = None
+        self.playback = None         # handle of the announcement playing, if speak_fn returns one
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.spoken = 0
+        self.coalesced = 0
+        self.suppressed = 0
+        self.dropped = 0
+        self.preempted = 0
+        self.timed = 0               # announcements that reached playback
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, name="announcer", daemon=True)
+        self.thread.start()
+        return self
+
+    def announce(self, text, key=None, urgent=False):
+        """
+        Queue `text` for speech without blocking. `key` identifies the
+        announcement for coalescing and cooldown (defaults to the text).
+        Returns True if a new announcement was queued.
+        """
+        if not text:
+            return False
+        key = key or text
+        now = time.monotonic()
+        with self.cond:
+            queued = self.pending.get(key)
+            if queued is not None:
+                self.coalesced += 1
+                queued.text = text
+                if urgent and not queued.urgent:
+                    self.routine.remove(queued)
+                    queued.urgent = True
+                    self.urgent.append(queued)
+                    self._preempt_routine()
+                return False
+
+            last = self.last_spoken.get(key)
+            if not urgent and last is not None and now - last < self.cooldown:
+                self.suppressed += 1
+                return False
+
+            item = _Announcement(text, key, urgent)
+            if urgent:
+                self.urgent.append(item)
+                self._preempt_routine()
+            else:
+                if len(self.routine) >= self.max_depth:
+                    oldest = self.routine.popleft()
+                    del self.pending[oldest.key]
+                    self.dropped += 1
+                self.routine.append(item)
+            self.pending[key] = item
+            self.cond.notify()
+            return True
+
+    def _preempt_routine(self):
+        # Called with the lock held; only our own clip is stopped
+        if (self.current is not None and not self.current.urgent and self.playback is not None
+                and self.stop_fn is not None):
+            self.preempted += 1
+            self.stop_fn(self.playback)
+            self.playback = None
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while self.running and not self.urgent and not self.routine:
+                    self.cond.wait()
+                if not self.running and not self.urgent and not self.routine:
+                    return
+                item = self.urgent.popleft() if self.urgent else self.routine.popleft()
+                del self.pending[item.key]
+                started = time.monotonic()
+                self.last_spoken[item.key] = started
+                self.current = item
+
+            self.spoken += 1
+            try:
+                playback = self.speak_fn(item.text)
+                if playback is not None and hasattr(playback, "wait"):
+                    with self.cond:
+                        self.playback = playback
+                        # An urgent message may have arrived before we had the handle
+                        if self.urgent:
+                            self._preempt_routine()
+                    playback.wait()
+                    started = playback.started_at
+            except Exception as e:
+                print(f"Error in announcement: {str(e)}")
+            if started is not None:
+                latency = started - item.enqueued_at
+                self.last_latency = latency
+                self.max_latency = max(self.max_latency, latency)
+                self.total_latency += latency
+                self.timed += 1
+            with self.cond:
+                self.current = None
+                self.playback = None
+
+    def depth(self):
+        with self.cond:
+            return len(self.urgent) + len(self.routine)
+
+    def stats(self):
+        """
+        Queue depth, counters, and enqueue-to-first-sample latency in seconds.
+        """
+        return {
+            "depth": self.depth(),
+            "spoken": self.spoken,
+            "coalesced": self.coalesced,
+            "suppressed": self.suppressed,
+            "dropped": self.dropped,
+            "preempted": self.preempted,
+            "last_latency": self.last_latency,
+            "max_latency": self.max_latency,
+            "mean_latency": self.total_latency / self.timed if self.timed else 0.0,
+        }
+
+    def stop(self, drain=False):
+        """
+        Stop the worker. With drain=True, pending announcements are spoken first.
+        """
+        with self.cond:
+            if not drain:
+                self.urgent.clear()
+                self.routine.clear()
+                self.pending.clear()
+            self.running = False
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+gemini_client.GeminiClient against the local stand-in server
+(mock_gemini_server.py): connection reuse, retries with backoff, the read
+timeout and a missing API key.
+
+Usage: python -m unittest discover tests   (from the IoT directory)
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gemini_client  # noqa: E402
+from gemini_client import GeminiClient, GeminiError  # noqa: E402
+from mock_gemini_server import Faults, start_background  # noqa: E402
+
+PROMPT = "Describe this image in short"
+PAYLOAD = "A" * 40000    # ~30 KB of base64, about one budgeted JPEG
+
+
+class GeminiClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_background(Faults())
+        self.faults = self.server.faults
+        self.client = GeminiClient(api_key="test", base_url=self.server.base_url)
+        # Keep the jittered backoff short; Retry-After is still honoured
+        patcher = mock.patch.object(gemini_client, "BACKOFF_BASE", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def describe(self, client=None):
+        return (client or self.client).describe(PROMPT, "image/jpeg", PAYLOAD)
+
+    def test_requests_reuse_one_connection(self):
+        latencies = []
+        for _ in range(10):
+            start = time.perf_counter()
+            self.assertIn("image/jpeg", self.describe())
+            latencies.append(time.perf_counter() - start)
+        self.assertEqual(self.faults.connections, 1)
+        # No Nagle / delayed-ACK stall (~40 ms) on the reused connection
+        self.assertLess(sorted(latencies)[len(latencies) // 2], 0.03)
+
+    def test_retries_server_errors(self):
+        for status in (500, 503):
+            with self.subTest(status=status):
+                self.faults.requests, self.faults.fail_first, self.faults.fail_status = 0, 2, status
+                retries = self.client.stats()["retries"]
+                self.assertIn("image/jpeg", self.describe())
+                self.assertEqual(self.faults.requests, 3)
+                self.assertEqual(self.client.stats()["retries"], retries + 2)
+
+    def test_429_waits_for_retry_after(self):
+        self.faults.fail_first, self.faults.fail_status, self.faults.retry_after = 1, 429, 0.3
+        start = time.monotonic()
+        self.assertIn("image/jpeg", self.describe())
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+        self.assertEqual(self.faults.requests, 2)
+
+    def test_gives_up_after_max_retries(self):
+        self.faults.fail_first, self.faults.fail_status = 10, 503
+        client = GeminiClient(api_key="test", base_url=self.server.base_url, max_retries=2)
+        try:
+            with self.assertRaises(GeminiError) as caught:
+                self.describe(client)
+        finally:
+            client.close()
+        self.assertEqual(caught.exception.status, 503)
+        self.assertEqual(self.faults.requests, 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.faults.fail_first, self.faults.fail_status = 1, 400
+        with self.assertRaises(GeminiError) as caught:
+            self.describe()
+        self.assertEqual(caught.exception.status, 400)
+        self.assertEqual(self.faults.requests, 1)
+
+    def test_read_timeout_cuts_off_stalled_server(self):
+        self.faults.delay = 2.0
+        client = GeminiClient(api_key="test", base_url=self.server.base_url, read_timeout=0.2, max_retries=1)
+        start = time.monotonic()
+        try:
+            with self.assertRaises(GeminiError):
+                self.describe(client)
+        finally:
+            client.close()
+        # Two attempts of 0.2 s plus a short backoff, far below the server delay
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_missing_key_fails_without_a_request(self):
+        with mock.patch.dict(os.environ, {gemini_client.API_KEY_ENV: ""}):
+            client = GeminiClient(api_key="", base_url=self.server.base_url)
+        try:
+            with self.assertRaises(GeminiError) as caught:
+                self.describe(client)
+        finally:
+            client.close()
+        self.assertIn(gemini_client.API_KEY_ENV, str(caught.exception))
+        self.assertEqual(self.faults.requests, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+"""
+Lightweight latency tracing for the button-to-speech pipeline.
+
+A trace starts at a button press (final.py) and collects named spans from
+every process that works on it: the worker daemon receives the trace
+context with each command, and spawned scripts receive it through
+environment variables (child_env()), so face_rec.py and the describers
+record their spans into the same trace. Timestamps are time.monotonic(),
+which on Linux is one clock for all processes, so spans from different
+processes line up; a wall-clock time is stored alongside for reading.
+
+Spans are appended as JSON lines to TRACE_PATH, rotated at MAX_BYTES.
+Every process appends whole lines with a single O_APPEND write, so
+concurrent writers do not interleave. Set NETRA_TRACE=0 to turn it off.
+
+    with tracing.trace("button_c", start=event.fired_at):
+        with tracing.span("capture"):
+            ...
+        tracing.mark("first_audio")
+
+python tracing.py [trace files...] prints p50/p95/p99 per stage.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+TRACE_PATH = "netra_trace.jsonl"
+MAX_BYTES = 5 * 1024 * 1024   # Rotate the trace file beyond this size
+BACKUPS = 3                   # Rotated files kept (netra_trace.jsonl.1 ... .3)
+ENABLE_ENV = "NETRA_TRACE"    # "0" disables tracing
+TRACE_ENV = "NETRA_TRACE_ID"
+PARENT_ENV = "NETRA_TRACE_PARENT"
+START_ENV = "NETRA_TRACE_START"     # monotonic start of the trace's root span
+SPAWN_ENV = "NETRA_TRACE_SPAWNED"   # monotonic time the parent spawned this process
+
+PROCESS = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+
+
+class SpanContext:
+    """
+    Where new spans attach: the trace, the parent span and when the trace began.
+    """
+
+    def __init__(self, trace_id, span_id=None, trace_start=None):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.trace_start = trace_start
+
+    def to_json(self):
+        return {"trace": self.trace_id, "span": self.span_id, "start": self.trace_start}
+
+    @classmethod
+    def from_json(cls, data):
+        if not data or not data.get("trace"):
+            return None
+        return cls(data["trace"], data.get("span"), data.get("start"))
+
+
+class TraceWriter:
+    """
+    Appends span records to a JSONL file, rotating it by size.
+    """
+
+    def __init__(self, path=TRACE_PATH, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.lock = threading.Lock()
+        self.written = 0
+        self.errors = 0
+
+    def write(self, record):
+        line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+        with self.lock:
+            try:
+                self._rotate_if_full()
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+                self.written += 1
+            except OSError as e:
+                # Tracing must never break the pipeline it observes
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"Trace write failed: {str(e)}")
+
+    def _rotate_if_full(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        # Another process may rotate at the same moment; losing a backup is acceptable
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+_local = threading.local()
+_writer = None
+_writer_lock = threading.Lock()
+_inherited = None
+
+
+def enabled():
+    return os.environ.get(ENABLE_ENV, "1") != "0"
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TraceWriter()
+        return _writer
+
+
+def _inherited_context():
+    # The trace this process was spawned into, if any
+    global _inherited
+    if _inherited is None:
+        trace_id = os.environ.get(TRACE_ENV)
+        start = os.environ.get(START_ENV)
+        _inherited = SpanContext(trace_id, os.environ.get(PARENT_ENV) or None,
+                                 float(start) if start else None) if trace_id else False
+    return _inherited or None
+
+
+def current():
+    """
+    The active SpanContext of this thread (or the inherited one), or None.
+    """
+    stack = getattr(_local, "stack", None)
+    if stack:
+        return stack[-1]
+    return _inherited_context()
+
+
+def current_json():
+    """
+    The active context as a dict, for passing to another process.
+    """
+    context = current()
+    return context.to_json() if context is not None and enabled() else None
+
+
+@contextmanager
+def activated(context):
+    """
+    Make `context` (a SpanContext, its dict form or None) current in this
+    thread, e.g. in a worker thread or after receiving it over a socket.
+    """
+    if isinstance(context, dict):
+        context = SpanContext.from_json(context)
+    if context is None:
+        yield None
+        return
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(context)
+    try:
+        yield context
+    finally:
+        stack.pop()
+
+
+def _record(name, context, span_id, start, end, attrs, error=None, instant=False):
+    record = {
+        "trace": context.trace_id,
+        "span": span_id,
+        "parent": context.span_id,
+        "name": name,
+        "process": PROCESS,
+        "pid": os.getpid(),
+        "start": start,
+        "end": end,
+        "ms": (end - start) * 1000,
+        "wall": time.time() - (time.monotonic() - start),
+    }
+    if context.trace_start is not None:
+        record["since_trace_ms"] = (end - context.trace_start) * 1000
+    if instant:
+        record["mark"] = True
+    if attrs:
+        record["attrs"] = attrs
+    if error is not None:
+        record["error"] = error
+    get_writer().write(record)
+
+
+@contextmanager
+def span(name, context=None, start=None, **attrs):
+    """
+    Time the enclosed block as a span under `context` (default: the current
+    one; a new trace if there is none). `start` backdates the span to an
+    earlier monotonic time. Yields the span's attrs dict, which may be
+    filled in before the block ends.
+    """
+    if not enabled():
+        yield attrs
+        return
+    parent = context or current()
+    start = start if start is not None else time.monotonic()
+    if parent is None:
+        parent = SpanContext(uuid.uuid4().hex, None, start)
+    span_id = uuid.uuid4().hex[:16]
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(SpanContext(parent.trace_id, span_id, parent.trace_start))
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        stack.pop()
+        _record(name, parent, span_id, start, time.monotonic(), attrs, error)
+
+
+@contextmanager
+def trace(name, start=None, **attrs):
+    """
+    Start a new trace whose root span is `name` (e.g. one button press).
+    """
+    if not enabled():
+        yield attrs
+        return
+    start = start if start is not None else time.monotonic()
+    root = SpanContext(uuid.uuid4().hex, None, start)
+    with span(name, context=root, start=start, **attrs) as span_attrs:
+        yield span_attrs
+
+
+def record_span(name, start, end=None, context=None, **attrs):
+    """
+    Record a span after the fact, from monotonic `start` to `end` (default: now).
+    """
+    if not enabled():
+        return
+    parent = context or current()
+    if parent is None:
+        parent = SpanContext(uuid.uuid4().hex, None, start)
+    end = end if end is not None else time.monotonic()
+    _record(name, parent, uuid.uuid4().hex[:16], start, end, attrs)
+
+
+def mark(name, context=None, **attrs):
+    """
+    Record an instant (a zero-length span), e.g. the first audio sample.
+    """
+    if not enabled():
+        return
+    parent = context or current()
+    if parent is None:
+        return
+    now = time.monotonic()
+    _record(name, parent, uuid.uuid4().hex[:16], now, now, attrs, instant=True)
+
+
+def child_env(env=None):
+    """
+    Environment for a subprocess that should join the current trace.
+    """
+    env = dict(os.environ if env is None else env)
+    context = current()
+    if context is not None and enabled():
+        env[TRACE_ENV] = context.trace_id
+        env[PARENT_ENV] = context.span_id or ""
+        if context.trace_start is not None:
+            env[START_ENV] = repr(context.trace_start)
+        env[SPAWN_ENV] = repr(time.monotonic())
+    return env
+
+
+def record_spawn():
+    """
+    Called first thing in a spawned script's main(): records a "spawn" span
+    from the parent's Popen to here (interpreter start plus imports).
+    """
+    spawned = os.environ.get(SPAWN_ENV)
+    context = _inherited_context()
+    if spawned and context is not None and enabled():
+        _record("spawn", context, uuid.uuid4().hex[:16], float(spawned), time.monotonic(), {"script": PROCESS})
+
+
+##################################
+# SUMMARY
+##################################
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def load_records(paths):
+    records = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue        # a line cut short by a crash
+        except FileNotFoundError:
+            continue
+    return records
+
+
+def summarize(records):
+    """
+    Per stage: count, p50/p95/p99/max duration in ms; for marks (instants),
+    the same statistics of their offset from the start of the trace.
+    Returns {name: {...}}, slowest p50 first.
+    """
+    durations = {}
+    for record in records:
+        if record.get("mark") and "since_trace_ms" in record:
+            value = record["since_trace_ms"]    # instant: when, not how long
+        else:
+            value = record["ms"]
+        durations.setdefault(record["name"], []).append(value)
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "p99": _percentile(values, 0.99),
+            "max": values[-1],
+        }
+    return dict(sorted(summary.items(), key=lambda item: -item[1]["p50"]))
+
+
+def main():
+    paths = sys.argv[1:] or [TRACE_PATH] + [f"{TRACE_PATH}.{i}" for i in range(1, BACKUPS + 1)]
+    records = load_records(paths)
+    if not records:
+        print("No trace records in", ", ".join(paths))
+        return
+    traces = len({record["trace"] for record in records})
+    print(f"{len(records)} spans in {traces} traces")
+    print(f"{'stage':24} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, s in summarize(records).items():
+        print(f"{name:24} {s['count']:>6} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f} {s['max']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
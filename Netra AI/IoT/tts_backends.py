@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""
+Speech synthesis backends for the speech pipeline.
+
+The remote backend is gTTS through the TTS cache. FallbackSynthesizer
+gives it a deadline: if a chunk is not synthesized in time (or the uplink
+is down), the chunk is spoken by a local engine instead. The remote call
+carries on in the background, so its audio lands in the cache for next time.
+Local engines are plain callables text -> audio (a file path or encoded
+bytes the audio engine can play). EspeakTTS wraps espeak-ng / espeak.
+"""
+
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from tts_cache import get_default_cache
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+REMOTE_DEADLINE = 1.5     # Seconds to wait for gTTS before speaking a chunk locally
+REMOTE_WORKERS = 4        # Remote calls allowed in flight (including abandoned ones)
+ESPEAK_COMMANDS = ("espeak-ng", "espeak")
+ESPEAK_VOICE = "en"
+ESPEAK_SPEED = 160        # Words per minute
+ESPEAK_TIMEOUT = 10
+
+
+class EspeakTTS:
+    """
+    Local synthesis with espeak-ng (or espeak). Returns WAV bytes.
+    """
+
+    def __init__(self, voice=ESPEAK_VOICE, speed=ESPEAK_SPEED, command=None):
+        self.command = command or next((c for c in ESPEAK_COMMANDS if shutil.which(c)), None)
+        self.voice = voice
+        self.speed = speed
+
+    def available(self):
+        return self.command is not None
+
+    def __call__(self, text):
+        if not self.command:
+            return None
+        result = subprocess.run([self.command, "-v", self.voice, "-s", str(self.speed), "--stdout", text],
+                                capture_output=True, timeout=ESPEAK_TIMEOUT)
+        if result.returncode != 0 or not result.stdout:
+            return None
+        return result.stdout
+
+
+class FallbackSynthesizer:
+    """
+    remote(text) with a deadline, local(text) when it is missed or fails.
+    Either may return None for "no audio".
+    """
+
+    def __init__(self, remote, local=None, deadline=REMOTE_DEADLINE, workers=REMOTE_WORKERS):
+        self.remote = remote
+        self.local = local
+        self.deadline = deadline
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-remote")
+        self.lock = threading.Lock()
+        self.remote_used = 0
+        self.local_used = 0
+        self.late = 0
+
+    def __call__(self, text):
+        if self.local is None:
+            return self._count_remote(self.remote(text))
+        future = self.pool.submit(self.remote, text)
+        try:
+            audio = future.result(timeout=self.deadline)
+        except TimeoutError:
+            with self.lock:
+                self.late += 1
+            audio = None
+        except Exception as e:
+            print(f"Remote TTS failed: {str(e)}")
+            audio = None
+        if audio is not None:
+            return self._count_remote(audio)
+        with self.lock:
+            self.local_used += 1
+        return self.local(text)
+
+    def _count_remote(self, audio):
+        if audio is not None:
+            with self.lock:
+                self.remote_used += 1
+        return audio
+
+    def stats(self):
+        return {"remote": self.remote_used, "local": self.local_used, "remote_late": self.late}
+
+
+_default_synthesizer = None
+
+
+def get_default_synthesizer():
+    """
+    gTTS through the cache, with espeak as the local fallback when installed.
+    """
+    global _default_synthesizer
+    if _default_synthesizer is None:
+        local = EspeakTTS()
+        _default_synthesizer = FallbackSynthesizer(get_default_cache().get,
+                                                   local if local.available() else None)
+    return _default_synthesizer
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+"""
+On-disk cache of synthesized speech.
+
+Audio is stored content-addressed (hash of language + text) so the fixed
+system prompts and enrolled names are synthesized by gTTS once and then
+played straight from disk. The cache is bounded in size with LRU eviction,
+and while the uplink is down, misses fail fast instead of stalling callers.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from gtts import gTTS
+from model_bundle import BUNDLE_PATH, read_labels
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+TTS_CACHE_DIR = "tts_cache"                 # Where synthesized MP3s are kept
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024      # Evict least recently used audio beyond this
+TTS_TIMEOUT = 5                             # Seconds before a gTTS request is abandoned
+OFFLINE_RETRY_AFTER = 30                    # Seconds to skip synthesis after a failure
+LABEL_MAP_PATH = "label_map.txt"
+
+# Fixed phrases spoken by the Netra scripts, synthesized ahead of time
+SYSTEM_PROMPTS = [
+    "Netra AI system initialized",
+    "System shutting down",
+    "Starting face capture and training",
+    "Capture complete. Starting training.",
+    "Training completed successfully",
+    "Starting real time recognition",
+    "Recognition ended",
+    "Recognition started. Press escape to stop.",
+    "Recognition started.",
+    "Recognition stopped.",
+    "Please say your name after the beep.",
+    "Capturing image for analysis",
+    "Image analysis complete",
+    "Recording video for analysis",
+    "Video analysis finished",
+    "Emergency alert triggered",
+    "Emergency message sent successfully",
+    "Emergency alert already raised",
+    "Emergency service unavailable. Still trying.",
+    "Unknown",
+]
+
+
+class TTSCache:
+    """
+    Size-bounded, content-addressed cache of gTTS MP3 files.
+    """
+
+    def __init__(self, cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES,
+                 timeout=TTS_TIMEOUT):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()   # path -> size, least recently used first
+        self.total_bytes = 0
+        self.offline_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """
+        Rebuild the LRU index from the files on disk, oldest access first.
+        """
+        files = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".mp3"):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, path, st.st_size))
+        for _, path, size in sorted(files):
+            self.entries[path] = size
+            self.total_bytes += size
+
+    def path_for(self, text, lang="en"):
+        digest = hashlib.sha1(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.mp3")
+
+    def lookup(self, text, lang="en"):
+        """
+        Return the cached file for `text` without synthesizing, or None.
+        Files written by another process since our scan are adopted.
+        """
+        path = self.path_for(text, lang)
+        with self.lock:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                self.total_bytes -= self.entries.pop(path, 0)
+                return None
+            if path in self.entries:
+                self.entries.move_to_end(path)
+            else:
+                self.entries[path] = size
+                self.total_bytes += size
+                self._evict()
+            self.hits += 1
+            try:
+                os.utime(path)  # keeps LRU order across restarts
+            except OSError:
+                pass
+            return path
+
+    def get(self, text, lang="en"):
+        """
+        Return a local MP3 path for `text`, synthesizing it on a miss.
+        Returns None if the audio is not cached and gTTS is unreachable.
+        """
+        if not text:
+            return None
+        path = self.lookup(text, lang)
+        if path:
+            return path
+
+        self.misses += 1
+        if time.monotonic() < self.offline_until:
+            return None
+        tmp_path = f"{self.path_for(text, lang)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            gTTS(text, lang=lang, timeout=self.timeout).save(tmp_path)
+        except Exception as e:
+            self.failures += 1
+            self.offline_until = time.monotonic() + OFFLINE_RETRY_AFTER
+            print(f"TTS synthesis failed: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        self.offline_until = 0.0
+        return self._add(tmp_path, self.path_for(text, lang))
+
+    def _add(self, tmp_path, path):
+        # Atomic rename so other processes never see a partial file
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        with self.lock:
+            self.total_bytes -= self.entries.pop(path, 0)
+            self.entries[path] = size
+            self.total_bytes += size
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Called with the lock held; never evicts the entry just added
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            old_path, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def prewarm(self, texts, lang="en"):
+        """
+        Synthesize any of `texts` that are not cached yet.
+        Returns the number of phrases available locally afterwards.
+        """
+        ready = 0
+        for text in texts:
+            if self.get(text, lang):
+                ready += 1
+        return ready
+
+    def prewarm_async(self, texts, lang="en"):
+        thread = threading.Thread(target=self.prewarm, args=(list(texts), lang),
+                                  name="tts-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+
+
+def load_names(label_map_path=LABEL_MAP_PATH):
+    """
+    Names of enrolled people from the model bundle, or from a legacy
+    label_map.txt ("<id>:<name>" per line).
+    """
+    labels = read_labels(BUNDLE_PATH)
+    if labels:
+        return list(labels.values())
+    names = []
+    if not os.path.exists(label_map_path):
+        return names
+    with open(label_map_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if ":" in line:
+                names.append(line.split(":", 1)[1])
+    return names
+
+
+def startup_phrases():
+    """
+    Everything worth having cached on startup: system prompts and all names.
+    """
+    return SYSTEM_PROMPTS + load_names()
+
+
+_default_cache = None
+
+def get_default_cache():
+    """
+    Shared TTSCache for the current process.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TTSCache()
+    return _default_cache
+
+
+if __name__ == "__main__":
+    # python tts_cache.py  -> pre-synthesize prompts and names, then print stats
+    cache = get_default_cache()
+    phrases = startup_phrases() + sys.argv[1:]
+    ready = cache.prewarm(phrases)
+    print(f"{ready}/{len(phrases)} phrases cached:", cache.stats())
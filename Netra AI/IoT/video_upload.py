@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+"""
+Record and upload a clip at the same time, for clips too long to send inline.
+
+Frames go straight from the camera into an ffmpeg subprocess that writes
+fragmented MP4 to its stdout, so the container is produced incrementally
+with nothing on disk. A reader thread collects that output and sends it to
+the Gemini File API resumable upload in granularity-sized chunks while
+recording continues. Memory stays at about one chunk however long
+the clip is. The finalized file is then referenced with fileData in the
+generate request.
+"""
+
+import subprocess
+import threading
+import time
+
+import cv2
+
+from gemini_client import GeminiError
+
+##################################
+# CONFIGURABLE PARAMETERS
+##################################
+FFMPEG = "ffmpeg"
+CHUNK_SIZE = 1024 * 1024  # Target upload chunk; rounded down to the server's granularity
+READ_SIZE = 64 * 1024     # Bytes read from ffmpeg at a time
+MIME_TYPE = "video/mp4"
+
+
+def ffmpeg_command(width, height, fps):
+    """
+    Raw BGR frames on stdin -> H.264 fragmented MP4 on stdout.
+    """
+    return [
+        FFMPEG, "-hide_banner", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        "-c:v", "libx264", "-preset", "ultrafast", "-tune", "zerolatency", "-pix_fmt", "yuv420p",
+        # A keyframe every second: fragments start at keyframes, and x264's default
+        # interval (250 frames) would hold back all output of a short clip until the end
+        "-g", str(max(1, int(round(fps)))),
+        # Fragmented MP4 needs no seek back to write the moov atom, so it can stream
+        "-movflags", "frag_keyframe+empty_moov+default_base_moof",
+        "-frag_duration", "1000000",
+        "-f", "mp4", "-",
+    ]
+
+
+class ChunkedUploader:
+    """
+    Buffers bytes and sends them to a resumable upload in whole chunks.
+    """
+
+    def __init__(self, client, mime_type=MIME_TYPE, chunk_size=CHUNK_SIZE, display_name=None):
+        self.client = client
+        self.mime_type = mime_type
+        self.upload_url, self.granularity = client.start_upload(mime_type, display_name)
+        self.chunk_size = max(self.granularity, chunk_size // self.granularity * self.granularity)
+        self.buffer = bytearray()
+        self.offset = 0
+        self.chunks = 0
+        self.sent_at = []         # monotonic time of each chunk sent before finish()
+        self.peak_buffer = 0
+
+    def feed(self, data):
+        self.buffer += data
+        self.peak_buffer = max(self.peak_buffer, len(self.buffer))
+        while len(self.buffer) >= self.chunk_size:
+            chunk = bytes(self.buffer[:self.chunk_size])
+            del self.buffer[:self.chunk_size]
+            self.client.upload_chunk(self.upload_url, self.offset, chunk)
+            self.offset += len(chunk)
+            self.chunks += 1
+            self.sent_at.append(time.monotonic())
+
+    def finish(self):
+        """
+        Send the remainder and finalize. Returns the uploaded file resource.
+        """
+        uploaded = self.client.upload_chunk(self.upload_url, self.offset, bytes(self.buffer), finalize=True)
+        self.offset += len(self.buffer)
+        self.chunks += 1
+        self.buffer = bytearray()
+        return uploaded
+
+
+class StreamingClipUpload:
+    """
+    One clip: feed frames with write(), then finish() to get the file resource.
+    """
+
+    def __init__(self, client, width=640, height=480, fps=20, chunk_size=CHUNK_SIZE):
+        self.width = width
+        self.height = height
+        self.uploader = ChunkedUploader(client, chunk_size=chunk_size,
+                                        display_name=f"netra-clip-{int(time.time())}")
+        self.process = subprocess.Popen(ffmpeg_command(width, height, fps),
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.error = None
+        self.frames = 0
+        self.reader = threading.Thread(target=self._upload_loop, name="clip-upload", daemon=True)
+        self.reader.start()
+
+    def _upload_loop(self):
+        try:
+            while True:
+                data = self.process.stdout.read1(READ_SIZE)
+                if not data:
+                    return
+                self.uploader.feed(data)
+        except Exception as e:
+            # Keep draining so ffmpeg never blocks on a full pipe
+            self.error = e
+            while self.process.stdout.read1(READ_SIZE):
+                pass
+
+    def write(self, frame):
+        if frame.shape[1] != self.width or frame.shape[0] != self.height:
+            frame = cv2.resize(frame, (self.width, self.height))
+        self.process.stdin.write(frame.tobytes() if not frame.flags.c_contiguous else frame.data)
+        self.frames += 1
+
+    def finish(self):
+        """
+        Close the encoder, wait for the last fragment to be sent and finalize.
+        Returns the uploaded file resource; raises GeminiError on failure.
+        """
+        self.process.stdin.close()
+        self.reader.join()
+        self.process.wait()
+        if self.error is not None:
+            raise self.error if isinstance(self.error, GeminiError) else GeminiError(str(self.error))
+        if self.process.returncode != 0:
+            raise GeminiError(f"ffmpeg exited with status {self.process.returncode}")
+        return self.uploader.finish()
+
+    def abort(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.reader.join(timeout=1.0)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "bytes": self.uploader.offset,
+            "chunks": self.uploader.chunks,
+            "chunk_size": self.uploader.chunk_size,
+            "peak_buffer": self.uploader.peak_buffer,
+        }
+
+
+def record_and_upload(cap, duration, client, width=640, height=480, fps=20):
+    """
+    Record `duration` seconds from an open camera while uploading them.
+    Returns (ACTIVE file resource, upload stats).
+    """
+    upload = StreamingClipUpload(client, width, height, fps)
+    start_time = time.monotonic()
+    try:
+        while (time.monotonic() - start_time) < duration:
+            ret, frame = cap.read()
+            if not ret:
+                print("Error: Failed to capture video frame.")
+                break
+            upload.write(frame)
+        recorded_at = time.monotonic()
+        uploaded = upload.finish()
+    except BaseException:
+        upload.abort()
+        raise
+    stats = upload.stats()
+    # Upload overlapping capture is the point of this path; these show whether it did
+    sent_at = upload.uploader.sent_at
+    stats["first_chunk_ms"] = (sent_at[0] - start_time) * 1000 if sent_at else None
+    stats["chunks_while_recording"] = sum(1 for t in sent_at if t < recorded_at)
+    stats["upload_tail_ms"] = (time.monotonic() - recorded_at) * 1000   # upload time left after recording
+    resource = client.wait_for_file(uploaded)
+    stats["ready_ms"] = (time.monotonic() - recorded_at) * 1000
+    return resource, stats
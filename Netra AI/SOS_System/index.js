@@ -12,15 +12,44 @@ const defaultMessage = process.env.DEFAULT_MESSAGE ||
 const client = new twilio(accountSid, authToken);
 const app = express();
 
-app.post('/data', (req, res) => {
-    client.messages.create({
+// The device retries an alert until it gets a 2xx, with the alert id as
+// Idempotency-Key. One SMS per key: a retry of an alert whose SMS is being
+// sent waits for that send, and a retry of a sent one gets the same answer.
+// Failed sends are forgotten so the next retry tries again.
+const IDEMPOTENCY_TTL_MS = 24 * 60 * 60 * 1000;
+const sends = new Map();   // Idempotency-Key -> { promise, at }
+
+function sendOnce(key) {
+    const now = Date.now();
+    for (const [k, entry] of sends) {
+        if (now - entry.at > IDEMPOTENCY_TTL_MS) sends.delete(k);
+    }
+    const existing = key && sends.get(key);
+    if (existing) {
+        return existing.promise.then((smsResponse) => ({ smsResponse, duplicate: true }));
+    }
+    const promise = client.messages.create({
         body: defaultMessage,
-        to: toNumber,       
-        from: fromNumber    
-    })
-    .then((smsResponse) => {
-        console.log(`Message sent with SID: ${smsResponse.sid}`);
-        res.status(200).json({ message: 'Emergency SMS sent successfully.', sid: smsResponse.sid });
+        to: toNumber,
+        from: fromNumber
+    });
+    if (key) {
+        sends.set(key, { promise, at: now });
+        promise.catch(() => sends.delete(key));
+    }
+    return promise.then((smsResponse) => ({ smsResponse, duplicate: false }));
+}
+
+app.post('/data', (req, res) => {
+    const key = req.get('Idempotency-Key');
+    sendOnce(key)
+    .then(({ smsResponse, duplicate }) => {
+        if (duplicate) {
+            console.log(`Duplicate delivery of alert ${key}; SMS ${smsResponse.sid} already sent`);
+        } else {
+            console.log(`Message sent with SID: ${smsResponse.sid}`);
+        }
+        res.status(200).json({ message: 'Emergency SMS sent successfully.', sid: smsResponse.sid, duplicate });
     })
     .catch((error) => {
         console.error('Error sending SMS:', error);